@@ -0,0 +1,430 @@
+"""Benchmarks for graph operations.
+
+Run with: python benchmark.py [--suite SUITE] [--sizes N,...] [--output PATH]
+
+The graph_util suite times the core operations on seeded synthetic graphs
+(see graph_generators) of each requested size. The comparisons suite times
+optimized code paths against their baselines. Pass --output to also write
+the results as JSON, e.g. to compare them between commits.
+"""
+import argparse
+import gc
+import io
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+import timeit
+
+import basic_graph
+import compact_graph
+import csr_graph
+import graph
+import graph_cache
+import graph_file
+import graph_generators
+import graph_parallel
+import graph_util
+import reachability
+
+
+def _random_graph(factory, num_nodes, num_edges, seed=0):
+    """Returns a graph with num_edges random edges between num_nodes nodes."""
+    rng = random.Random(seed)
+    builder = graph.Builder(factory)
+    for i in range(num_nodes):
+        builder.node('n%d' % i)
+    for _ in range(num_edges):
+        builder.edge('n%d' % rng.randrange(num_nodes),
+                     'n%d' % rng.randrange(num_nodes))
+    return builder.build()
+
+
+# Results reported by the benchmarks run so far.
+_results = []
+
+
+def _report(name, seconds, count=1, **params):
+    """Prints a timing and records it for the JSON output.
+
+    :param name: name of the timed operation.
+    :param seconds: wall time of count operations.
+    :param count: number of operations timed.
+    :param params: parameters of the benchmark (e.g. graph size).
+    """
+    print('%-48s %10.6fs total %12.3fus each' % (
+        name, seconds, 1e6 * seconds / count))
+    result = {'name': name, 'seconds': seconds, 'count': count}
+    result.update(params)
+    _results.append(result)
+
+
+def bench_reachability(num_nodes=2000, num_edges=3000, num_queries=200):
+    g = _random_graph(basic_graph.Factory(), num_nodes, num_edges)
+    rng = random.Random(1)
+    queries = [('n%d' % rng.randrange(num_nodes),
+                'n%d' % rng.randrange(num_nodes))
+               for _ in range(num_queries)]
+
+    for directed in [True, False]:
+        suffix = '(directed=%s)' % directed
+
+        start = timeit.default_timer()
+        expected = [graph_util.is_connected(g, s, e, directed=directed)
+                    for s, e in queries]
+        _report('graph_util.is_connected %s' % suffix,
+                timeit.default_timer() - start, num_queries)
+
+        start = timeit.default_timer()
+        index = reachability.ReachabilityIndex(g, directed=directed)
+        _report('ReachabilityIndex build %s' % suffix,
+                timeit.default_timer() - start)
+
+        start = timeit.default_timer()
+        actual = [index.is_connected(s, e) for s, e in queries]
+        _report('ReachabilityIndex.is_connected %s' % suffix,
+                timeit.default_timer() - start, num_queries)
+        assert expected == actual
+
+
+def bench_markov_blankets(num_nodes=1000, num_edges=3000):
+    g = _random_graph(basic_graph.Factory(), num_nodes, num_edges)
+    node_ids = [n.id() for n in g.nodes()]
+
+    start = timeit.default_timer()
+    expected = {node_id: sorted(graph_util.markov_blanket(g, node_id))
+                for node_id in node_ids}
+    _report('graph_util.markov_blanket (all nodes)',
+            timeit.default_timer() - start)
+
+    start = timeit.default_timer()
+    actual = graph_util.markov_blankets(g)
+    _report('graph_util.markov_blankets',
+            timeit.default_timer() - start)
+    assert expected == {k: sorted(v) for k, v in actual.items()}
+
+    start = timeit.default_timer()
+    graph_util.markov_blankets(g, bitsets=True)
+    _report('graph_util.markov_blankets (bitsets=True)',
+            timeit.default_timer() - start)
+
+
+def _split_from_string(factory, str_graph):
+    """graph.from_string as implemented before the streaming tokenizer."""
+    builder = graph.Builder(factory)
+    node_sequences = [s.split('->') for s in str_graph.split(",")]
+
+    for seq in node_sequences:
+        last_id = None
+        for s in seq:
+            node_id = s.strip()
+            builder.node(node_id)
+            if last_id is not None:
+                builder.edge(last_id, node_id)
+            last_id = node_id
+
+    return builder.build()
+
+
+def _best_time(fn, repeat=3):
+    """Returns (best wall time of repeat calls to fn, result of fn).
+
+    The garbage collector is disabled while fn runs so that objects left by
+    earlier benchmarks do not skew the timings.
+    """
+    best = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        gc.disable()
+        try:
+            start = timeit.default_timer()
+            result = fn()
+            seconds = timeit.default_timer() - start
+        finally:
+            gc.enable()
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def bench_parser(num_nodes=20000, num_edges=100000):
+    rng = random.Random(0)
+    spec = ', '.join('n%d->n%d->n%d' % (rng.randrange(num_nodes),
+                                        rng.randrange(num_nodes),
+                                        rng.randrange(num_nodes))
+                     for _ in range(num_edges // 2))
+    data = spec.encode('utf-8')
+    megabytes = len(data) / 1e6
+    factory = basic_graph.Factory()
+
+    parsers = [
+        ('split parser', lambda: _split_from_string(factory, spec)),
+        ('graph.from_string', lambda: graph.from_string(factory, spec)),
+        ('graph.from_file', lambda: graph.from_file(factory,
+                                                    io.BytesIO(data))),
+    ]
+    expected = None
+    for name, parse in parsers:
+        seconds, result = _best_time(parse)
+        _report('%s (%.2f MB/s)' % (name, megabytes / seconds), seconds)
+        assert expected is None or expected == result
+        expected = result
+
+
+def bench_builder(num_nodes=20000, num_edges=200000):
+    rng = random.Random(0)
+    pairs = [(rng.randrange(num_nodes), rng.randrange(num_nodes))
+             for _ in range(num_edges)]
+    factory = basic_graph.Factory()
+
+    def per_edge():
+        builder = graph.Builder(factory)
+        for start_id, end_id in pairs:
+            builder.edge(start_id, end_id)
+        return builder
+
+    def bulk():
+        builder = graph.Builder(factory)
+        builder.add_edges(pairs)
+        return builder
+
+    seconds, expected = _best_time(per_edge)
+    _report('Builder.edge', seconds, num_edges)
+    seconds, actual = _best_time(bulk)
+    _report('Builder.add_edges', seconds, num_edges)
+    assert expected.build() == actual.build()
+
+
+def bench_components(num_nodes=5000, num_edges=50000):
+    rng = random.Random(0)
+    pairs = set(('n%d' % rng.randrange(num_nodes),
+                 'n%d' % rng.randrange(num_nodes))
+                for _ in range(num_edges))
+    num_edges = len(pairs)
+
+    for name, factory in [('basic_graph', basic_graph.Factory()),
+                          ('compact_graph', compact_graph.Factory())]:
+        builder = graph.Builder(factory)
+        builder.add_edges(pairs)
+        nodes = list(builder._nodes.values())
+        edges = list(builder._edges.values())
+
+        seconds, g = _best_time(lambda: factory.create_graph(nodes, edges))
+        _report('%s create_graph (per edge)' % name, seconds, num_edges)
+        seconds, _ = _best_time(lambda: sorted(edges))
+        _report('%s sort edges (per edge)' % name, seconds, num_edges)
+        other = factory.create_graph(nodes, edges)
+        seconds, _ = _best_time(lambda: g == other)
+        _report('%s GraphType.__eq__ (per edge)' % name, seconds,
+                num_edges)
+        seconds, _ = _best_time(g._compute_digest)
+        _report('%s GraphType.digest (per edge)' % name, seconds,
+                num_edges)
+        # Same sizes, one edge replaced by a self-loop.
+        loop = factory.create_edge(nodes[0], nodes[0])
+        different = factory.create_graph(nodes, edges[1:] + [loop])
+        seconds, _ = _best_time(lambda: g == different)
+        _report('%s __eq__ different graph (per edge)' % name, seconds,
+                num_edges)
+
+
+def bench_graph_file(num_nodes=100000, num_edges=1000000):
+    rng = random.Random(0)
+    pairs = [('n%d' % rng.randrange(num_nodes),
+              'n%d' % rng.randrange(num_nodes))
+             for _ in range(num_edges)]
+    g = csr_graph.from_edges([], pairs)
+    spec = ', '.join('%s->%s' % pair for pair in pairs)
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'graph.bin')
+        graph_file.save(g, path)
+
+        seconds, _ = _best_time(lambda: graph.from_string(
+            csr_graph.Factory(), spec), repeat=1)
+        _report('graph.from_string (%d edges)' % len(pairs), seconds)
+        seconds, loaded = _best_time(lambda: graph_file.load(path))
+        _report('graph_file.load (%d edges)' % len(pairs), seconds)
+        seconds, _ = _best_time(lambda: loaded.child_ids('n1'))
+        _report('child_ids on loaded graph', seconds)
+    finally:
+        shutil.rmtree(directory)
+
+
+# Generators of the graph_util suite, taking the approximate node count.
+_GENERATORS = [
+    ('random_dag', lambda factory, n: graph_generators.random_dag(
+        factory, n, 4 * n)),
+    ('erdos_renyi', lambda factory, n: graph_generators.erdos_renyi(
+        factory, n, 4.0 / n)),
+    ('power_law', lambda factory, n: graph_generators.power_law(
+        factory, n, 4)),
+    ('chain', graph_generators.chain),
+    ('grid', lambda factory, n: graph_generators.grid(
+        factory, int(math.sqrt(n)), int(math.sqrt(n)))),
+]
+
+# Largest graph for which the dense list adjacency matrix is timed.
+_MAX_DENSE_NODES = 5000
+
+
+def bench_parallel(num_nodes=20000, edges_per_node=3):
+    g = graph_generators.power_law(csr_graph.Factory(), num_nodes,
+                                   edges_per_node)
+    sources = ['n%d' % i for i in range(0, num_nodes, 20)]
+    runs = [
+        ('all_descendants',
+         lambda p: graph_parallel.all_descendants(g, sources, processes=p)),
+        ('markov_blankets',
+         lambda p: graph_parallel.markov_blankets(g, processes=p)),
+        ('connected_components',
+         lambda p: graph_parallel.connected_components(g, processes=p)),
+    ]
+    cpus = multiprocessing.cpu_count()
+    # Two processes are always run to measure the cost of the pool.
+    counts = sorted(set([1, 2, cpus]))
+    for name, run in runs:
+        baseline = None
+        for processes in counts:
+            seconds, _ = _best_time(lambda: run(processes), repeat=1)
+            baseline = baseline or seconds
+            _report('graph_parallel.%s (processes=%d, %.2fx)' % (
+                name, processes, baseline / seconds), seconds,
+                processes=processes, cpus=cpus, speedup=baseline / seconds)
+
+
+def bench_approx_reach_counts(num_nodes=20000, num_edges=60000):
+    g = graph_generators.random_dag(csr_graph.Factory(), num_nodes,
+                                    num_edges)
+    node_ids = [n.id() for n in g.nodes()]
+
+    start = timeit.default_timer()
+    exact = {node_id: len(graph_util.descendants(g, node_id))
+             for node_id in node_ids}
+    _report('graph_util.descendants (all nodes)',
+            timeit.default_timer() - start)
+
+    for precision in [6, 10, 14]:
+        start = timeit.default_timer()
+        counts = reachability.approx_reach_counts(g, precision=precision)
+        seconds = timeit.default_timer() - start
+        errors = [abs(counts[node_id] - count) / float(count)
+                  for node_id, count in exact.items() if count]
+        error = sum(errors) / len(errors)
+        _report('reachability.approx_reach_counts (precision=%d, %.1f%%)' % (
+            precision, 100 * error), seconds, precision=precision,
+            mean_relative_error=error)
+
+
+def _to_spec(g):
+    """Returns a graph.from_string specifier of g."""
+    parts = ['%s->%s' % tuple(n.id() for n in e.nodes()) for e in g.edges()]
+    parts.extend(n.id() for n in g.nodes())
+    return ', '.join(parts)
+
+
+def bench_graph_util(sizes, repeat=3, num_queries=100):
+    factory = basic_graph.Factory()
+    for generator_name, generate in _GENERATORS:
+        for size in sizes:
+            g = generate(factory, size)
+            num_nodes = len(g.nodes())
+            params = {'generator': generator_name, 'nodes': num_nodes,
+                      'edges': len(g.edges())}
+            print('%s: %d nodes, %d edges' % (generator_name, num_nodes,
+                                              len(g.edges())))
+            rng = random.Random(0)
+            node_ids = sorted(n.id() for n in g.nodes())
+            sample = [rng.choice(node_ids) for _ in range(num_queries)]
+            pairs = [(rng.choice(node_ids), rng.choice(node_ids))
+                     for _ in range(num_queries)]
+
+            def uncached(fn):
+                def run():
+                    graph_cache.clear()
+                    return fn()
+                return run
+
+            spec = _to_spec(g)
+            seconds, _ = _best_time(
+                lambda: graph.from_string(factory, spec), repeat)
+            _report('graph.from_string', seconds, **params)
+
+            builder = graph.Builder(factory)
+            builder.add_nodes(node_ids)
+            builder.add_edges([n.id() for n in e.nodes()]
+                              for e in g.edges())
+            seconds, _ = _best_time(builder.build, repeat)
+            _report('Builder.build', seconds, **params)
+
+            matrix_format = ('list' if num_nodes <= _MAX_DENSE_NODES
+                             else 'csr')
+            seconds, _ = _best_time(uncached(
+                lambda: graph_util.adjacency_matrix(g, format=matrix_format)),
+                repeat)
+            _report('graph_util.adjacency_matrix', seconds,
+                    format=matrix_format, **params)
+
+            seconds, _ = _best_time(uncached(
+                lambda: graph_util.neighbor_map(g)), repeat)
+            _report('graph_util.neighbor_map', seconds, **params)
+
+            seconds, _ = _best_time(uncached(
+                lambda: [graph_util.markov_blanket(g, node_id)
+                         for node_id in sample]), repeat)
+            _report('graph_util.markov_blanket', seconds, num_queries,
+                    **params)
+
+            # The first query builds the (cached) neighbor map.
+            seconds, _ = _best_time(uncached(
+                lambda: [graph_util.is_connected(g, s, e) for s, e in pairs]),
+                repeat)
+            _report('graph_util.is_connected', seconds, num_queries,
+                    **params)
+
+
+def bench_comparisons():
+    bench_reachability()
+    bench_markov_blankets()
+    bench_parser()
+    bench_builder()
+    bench_components()
+    bench_graph_file()
+    bench_parallel()
+    bench_approx_reach_counts()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--suite', default='graph_util',
+                        choices=['graph_util', 'comparisons', 'all'],
+                        help='benchmarks to run')
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='comma-separated node counts of generated graphs')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timing repetitions (best is reported)')
+    parser.add_argument('--output', help='path of JSON file to write')
+    args = parser.parse_args(argv)
+
+    if args.suite in ['graph_util', 'all']:
+        bench_graph_util([int(size) for size in args.sizes.split(',')],
+                         repeat=args.repeat)
+    if args.suite in ['comparisons', 'all']:
+        bench_comparisons()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': platform.python_version(),
+                       'platform': platform.platform(),
+                       'time': time.time(),
+                       'results': _results}, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
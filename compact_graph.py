@@ -0,0 +1,77 @@
+"""Defines compact graph components with precomputed hashes.
+
+Nodes and edges use __slots__ and compute their hash once on construction.
+Comparisons between them use their ids (or tuple of ids) directly instead of
+calling id() and nodes(). Equality and hashing match basic_graph, so compact
+and basic components can be mixed freely.
+"""
+import basic_graph
+import graph_types
+
+
+class Node(graph_types.NodeType):
+    __slots__ = ('_id', '_hash')
+
+    def __init__(self, node_id):
+        self._id = node_id
+        self._hash = hash(node_id)
+
+    # @Override
+    def id(self):
+        return self._id
+
+    def __eq__(self, other):
+        if other.__class__ is Node:
+            return self._id == other._id
+        return self._id == other.id()
+
+    def __lt__(self, other):
+        if other.__class__ is Node:
+            return self._id < other._id
+        return self._id < other.id()
+
+    def __hash__(self):
+        return self._hash
+
+
+class Edge(graph_types.EdgeType):
+    __slots__ = ('_start', '_end', '_key', '_hash')
+
+    def __init__(self, start_node, end_node):
+        self._start = start_node
+        self._end = end_node
+        self._key = (start_node.id(), end_node.id())
+        # Same value as graph_types.EdgeType.__hash__.
+        self._hash = hash(str(list(self._key)))
+
+    # @Override
+    def nodes(self):
+        return [self._start, self._end]
+
+    def key(self):
+        """Returns the (start_id, end_id) tuple of the edge."""
+        return self._key
+
+    def __eq__(self, other):
+        if other.__class__ is Edge:
+            return self._key == other._key
+        return graph_types.EdgeType.__eq__(self, other)
+
+    def __lt__(self, other):
+        if other.__class__ is Edge:
+            return self._key < other._key
+        return graph_types.EdgeType.__lt__(self, other)
+
+    def __hash__(self):
+        return self._hash
+
+
+class Factory(basic_graph.Factory):
+
+    # @Override
+    def create_node(self, node_id):
+        return Node(node_id)
+
+    # @Override
+    def create_edge(self, start_node, end_node):
+        return Edge(start_node, end_node)
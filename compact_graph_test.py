@@ -0,0 +1,56 @@
+import unittest
+import basic_graph
+import compact_graph
+import graph
+
+
+class CompactGraphTest(unittest.TestCase):
+    def test_node(self):
+        node = compact_graph.Node('abcd')
+        self.assertEqual('abcd', node.id())
+        self.assertEqual(hash(basic_graph.Node('abcd')), hash(node))
+        self.assertEqual(basic_graph.Node('abcd'), node)
+        self.assertEqual(node, basic_graph.Node('abcd'))
+        self.assertLess(node, compact_graph.Node('b'))
+        self.assertLess(node, basic_graph.Node('b'))
+        self.assertFalse(node < compact_graph.Node('abcd'))
+        self.assertRaises(AttributeError, setattr, node, 'data', 1)
+
+    def test_edge(self):
+        def edges(start_id, end_id):
+            return (compact_graph.Edge(compact_graph.Node(start_id),
+                                       compact_graph.Node(end_id)),
+                    basic_graph.Edge(basic_graph.Node(start_id),
+                                     basic_graph.Node(end_id)))
+
+        edge, basic_edge = edges(1, 2)
+        self.assertEqual((1, 2), edge.key())
+        self.assertEqual([compact_graph.Node(1), compact_graph.Node(2)],
+                         edge.nodes())
+        self.assertEqual(hash(basic_edge), hash(edge))
+        self.assertEqual(basic_edge, edge)
+        self.assertEqual(edge, basic_edge)
+        self.assertEqual(1, len(set([edge, basic_edge])))
+
+        pairs = [(1, 2), (1, 1), (2, 1), (0, 3)]
+        compact = [edges(i, j)[0] for i, j in pairs]
+        basic = [edges(i, j)[1] for i, j in pairs]
+        self.assertEqual(sorted(basic), sorted(compact))
+        for a, b in zip(compact, basic):
+            for c, d in zip(compact, basic):
+                self.assertEqual(b < d, a < c)
+                self.assertEqual(b < d, a < d)
+                self.assertEqual(b == d, a == c)
+
+    def test_factory(self):
+        spec = 'x1->x8, x1->x4, x2->x4, x3->x4, x4->x5, x4->x6, x7->x6, x9'
+        g = graph.from_string(compact_graph.Factory(), spec)
+        self.assertTrue(all(isinstance(n, compact_graph.Node)
+                            for n in g.nodes()))
+        self.assertTrue(all(isinstance(e, compact_graph.Edge)
+                            for e in g.edges()))
+        self.assertEqual(graph.from_string(basic_graph.Factory(), spec), g)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+"""Defines an array-backed graph stored in compressed sparse row form.
+
+Node ids are interned to dense integers in ascending id order. The edges
+starting at node i are targets[offsets[i]:offsets[i + 1]], and a second
+(reverse) set of arrays indexes the edges ending at each node. Node and Edge
+objects are only materialized when nodes() or edges() is iterated.
+"""
+import array
+import bisect
+import basic_graph
+import graph_types
+
+# Typecode of the index arrays (signed 32-bit).
+INDEX_TYPECODE = 'i'
+
+
+class _NodeView(object):
+    """Lazy collection of the nodes of a csr_graph.Graph."""
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __len__(self):
+        return len(self._graph.ids())
+
+    def __iter__(self):
+        for node_id in self._graph.ids():
+            yield basic_graph.Node(node_id)
+
+    def __contains__(self, node):
+        return self._graph.has_node(node.id())
+
+
+class _EdgeView(object):
+    """Lazy collection of the edges of a csr_graph.Graph."""
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __len__(self):
+        return len(self._graph.csr()[1])
+
+    def __iter__(self):
+        ids = self._graph.ids()
+        offsets, targets = self._graph.csr()
+        nodes = {}
+        for i in range(len(ids)):
+            start, end = offsets[i], offsets[i + 1]
+            if start == end:
+                continue
+            start_node = basic_graph.Node(ids[i])
+            for j in targets[start:end]:
+                end_node = nodes.get(j)
+                if end_node is None:
+                    end_node = basic_graph.Node(ids[j])
+                    nodes[j] = end_node
+                yield basic_graph.Edge(start_node, end_node)
+
+    def __contains__(self, edge):
+        nodes = edge.nodes()
+        return self._graph.has_edge(nodes[0].id(), nodes[-1].id())
+
+
+class Graph(graph_types.IndexedGraphType):
+
+    def __init__(self, ids, offsets, targets, reverse_offsets, sources):
+        """Construct a graph from interned ids and CSR arrays.
+
+        :param ids: sequence mapping node index to node id, sorted ascending.
+        :param offsets: len(ids) + 1 row offsets into targets.
+        :param targets: end node index of each edge, grouped by start node.
+        :param reverse_offsets: len(ids) + 1 row offsets into sources.
+        :param sources: start node index of each edge, grouped by end node.
+        """
+        self._ids = ids
+        self._index = None
+        self._offsets = offsets
+        self._targets = targets
+        self._reverse_offsets = reverse_offsets
+        self._sources = sources
+
+    # @Override
+    def nodes(self):
+        return _NodeView(self)
+
+    # @Override
+    def edges(self):
+        return _EdgeView(self)
+
+    # @Override
+    def parent_ids(self, node_id):
+        return [self._ids[j] for j in self.parent_indices(self.index(node_id))]
+
+    # @Override
+    def child_ids(self, node_id):
+        return [self._ids[j] for j in self.child_indices(self.index(node_id))]
+
+    def ids(self):
+        """Returns the sequence mapping node index to node id."""
+        return self._ids
+
+    def index(self, node_id):
+        """Returns the integer index of node_id or -1 if it is not a node."""
+        if self._index is not None:
+            return self._index.get(node_id, -1)
+
+        # No interning map (e.g. a memory-mapped graph). Binary search the
+        # sorted ids instead of building one.
+        try:
+            i = bisect.bisect_left(self._ids, node_id)
+        except TypeError:
+            return -1
+        if i < len(self._ids) and self._ids[i] == node_id:
+            return i
+        return -1
+
+    def has_node(self, node_id):
+        return self.index(node_id) >= 0
+
+    def has_edge(self, start_id, end_id):
+        i = self.index(start_id)
+        j = self.index(end_id)
+        return i >= 0 and j >= 0 and j in self.child_indices(i)
+
+    def child_indices(self, i):
+        """Returns the indices of the children of the node at index i."""
+        if i < 0:
+            return ()
+        return self._targets[self._offsets[i]:self._offsets[i + 1]]
+
+    def parent_indices(self, i):
+        """Returns the indices of the parents of the node at index i."""
+        if i < 0:
+            return ()
+        return self._sources[self._reverse_offsets[i]:
+                             self._reverse_offsets[i + 1]]
+
+    def csr(self):
+        """Returns the (offsets, targets) arrays of the forward index."""
+        return self._offsets, self._targets
+
+    def reverse_csr(self):
+        """Returns the (offsets, sources) arrays of the reverse index."""
+        return self._reverse_offsets, self._sources
+
+
+def _compress(num_nodes, pairs):
+    """Returns (offsets, values) for index pairs sorted by first element."""
+    offsets = array.array(INDEX_TYPECODE, [0]) * (num_nodes + 1)
+    values = array.array(INDEX_TYPECODE)
+    for i, j in pairs:
+        offsets[i + 1] += 1
+        values.append(j)
+    for i in range(num_nodes):
+        offsets[i + 1] += offsets[i]
+    return offsets, values
+
+
+def from_edges(node_ids, edge_pairs):
+    """Construct a csr_graph.Graph from node ids and edges.
+
+    :param node_ids: iterable of node ids. Nodes of edge_pairs are added.
+    :param edge_pairs: iterable of (start_id, end_id) pairs. Duplicates are
+    ignored.
+    :return: a csr_graph.Graph.
+    """
+    pairs = set((start_id, end_id) for start_id, end_id in edge_pairs)
+    ids = set(node_ids)
+    for start_id, end_id in pairs:
+        ids.add(start_id)
+        ids.add(end_id)
+    ids = sorted(ids)
+
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    encoded = sorted((index[s], index[e]) for s, e in pairs)
+    offsets, targets = _compress(len(ids), encoded)
+    encoded.sort(key=lambda pair: (pair[1], pair[0]))
+    reverse_offsets, sources = _compress(
+        len(ids), ((j, i) for i, j in encoded))
+
+    g = Graph(ids, offsets, targets, reverse_offsets, sources)
+    g._index = index
+    return g
+
+
+class Factory(basic_graph.Factory):
+
+    # @Override
+    def create_graph(self, nodes, edges):
+        edge_nodes = [e.nodes() for e in edges]
+        return from_edges([n.id() for n in nodes],
+                          [(l[0].id(), l[-1].id()) for l in edge_nodes])
@@ -0,0 +1,54 @@
+import unittest
+import basic_graph
+import csr_graph
+import graph
+import graph_util
+
+
+class CsrGraphTest(unittest.TestCase):
+    def test_from_edges(self):
+        g = csr_graph.from_edges(['D', 'A'], [('C', 'B'), ('A', 'B'),
+                                              ('A', 'C'), ('A', 'B')])
+        self.assertEqual(['A', 'B', 'C', 'D'], list(g.ids()))
+        self.assertEqual(2, g.index('C'))
+        self.assertEqual(-1, g.index('missing'))
+
+        offsets, targets = g.csr()
+        self.assertEqual([0, 2, 2, 3, 3], list(offsets))
+        self.assertEqual([1, 2, 1], list(targets))
+
+        reverse_offsets, sources = g.reverse_csr()
+        self.assertEqual([0, 0, 2, 3, 3], list(reverse_offsets))
+        self.assertEqual([0, 2, 0], list(sources))
+
+        self.assertEqual(['B', 'C'], g.child_ids('A'))
+        self.assertEqual(['A', 'C'], g.parent_ids('B'))
+        self.assertEqual([], g.child_ids('missing'))
+        self.assertTrue(g.has_edge('C', 'B'))
+        self.assertFalse(g.has_edge('B', 'C'))
+        self.assertFalse(g.has_edge('A', 'missing'))
+
+    def test_views(self):
+        g = csr_graph.from_edges(['D'], [('A', 'B'), ('B', 'B')])
+        self.assertEqual(3, len(g.nodes()))
+        self.assertEqual(2, len(g.edges()))
+        self.assertTrue(basic_graph.Node('D') in g.nodes())
+        self.assertFalse(basic_graph.Node('E') in g.nodes())
+
+        edge = basic_graph.Edge(basic_graph.Node('B'), basic_graph.Node('B'))
+        self.assertTrue(edge in g.edges())
+        self.assertEqual([edge, basic_graph.Edge(basic_graph.Node('A'),
+                                                 basic_graph.Node('B'))],
+                         sorted(g.edges(), reverse=True))
+
+    def test_factory(self):
+        spec = 'x1->x8, x1->x4, x2->x4, x3->x4, x4->x5, x4->x6, x7->x6, x9'
+        g = graph.from_string(csr_graph.Factory(), spec)
+        self.assertIsInstance(g, csr_graph.Graph)
+        self.assertEqual(graph.from_string(basic_graph.Factory(), spec), g)
+        self.assertEqual(['x1', 'x2', 'x3', 'x5', 'x6', 'x7'],
+                         sorted(graph_util.markov_blanket(g, 'x4')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,8 @@
+import codecs
+import mmap
+import os
+import re
+
 import graph_types
 
 
@@ -14,6 +19,7 @@ class Builder(graph_types.BuilderType):
         self._factory = factory
         self._nodes = {}
         self._edges = {}
+        self._weights = {}
 
     # @Override
     def node(self, node_id):
@@ -25,8 +31,11 @@ class Builder(graph_types.BuilderType):
         return node
 
     # @Override
-    def edge(self, start_node_id, end_node_id):
+    def edge(self, start_node_id, end_node_id, weight=None):
         key = (start_node_id, end_node_id)
+        if weight is not None:
+            _check_weighted(self._factory)
+            self._weights[key] = weight
         if key in self._edges:
             return self._edges[key]
 
@@ -36,32 +45,211 @@ class Builder(graph_types.BuilderType):
         self._edges[key] = edge
         return edge
 
+    # @Override
+    def add_nodes(self, node_ids):
+        nodes = self._nodes
+        create_node = self._factory.create_node
+        for node_id in _to_list(node_ids):
+            if node_id not in nodes:
+                nodes[node_id] = create_node(node_id)
+
+    # @Override
+    def add_edges(self, edge_pairs):
+        """Adds an edge for each of the specified (start, end) id pairs.
+
+        :param edge_pairs: iterable of (start_node_id, end_node_id) pairs or
+        a numpy array of shape (E, 2).
+        """
+        # Same result as calling edge() per pair, with the method calls and
+        # repeated attribute lookups hoisted out of the loop.
+        nodes = self._nodes
+        edges = self._edges
+        create_node = self._factory.create_node
+        create_edge = self._factory.create_edge
+        for start_node_id, end_node_id in _to_list(edge_pairs):
+            key = (start_node_id, end_node_id)
+            if key in edges:
+                continue
+
+            start_node = nodes.get(start_node_id)
+            if start_node is None:
+                start_node = nodes[start_node_id] = create_node(start_node_id)
+            end_node = nodes.get(end_node_id)
+            if end_node is None:
+                end_node = nodes[end_node_id] = create_node(end_node_id)
+            edges[key] = create_edge(start_node, end_node)
+
     # @Override
     def build(self):
         nodes = self._nodes.values()
         edges = self._edges.values()
+        if self._weights:
+            return self._factory.create_graph(nodes, edges,
+                                              weights=self._weights)
         return self._factory.create_graph(nodes, edges)
 
 
-def from_string(factory, str_graph):
+def _check_weighted(factory):
+    """Raises ValueError if factory cannot create graphs with edge weights."""
+    if not isinstance(factory, graph_types.WeightedFactoryType):
+        raise ValueError('%s does not support edge weights.' %
+                         factory.__class__.__name__)
+
+
+def _to_list(values):
+    """Returns values, converting numpy arrays to lists of Python values."""
+    if hasattr(values, 'tolist'):
+        return values.tolist()
+    return values
+
+
+# Number of characters (or bytes) read from a file per chunk.
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+# Weight at the end of a node token followed by '->' (e.g. 'A-3' in 'A-3->B').
+_WEIGHT_SUFFIX = re.compile(
+    r'^(.+?)\s*-\s*([0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)$')
+
+
+def from_string(factory, str_graph, weighted=False):
     """Construct a graph from a string specifier.
     "A->B->C, B->C, D -> E, E -> F, G, H"
 
+    With weighted=True, a node followed by '-<number>' before an arrow gives
+    the weight of that edge: "A-3->B-0.5->C, B->D" has edges A->B (3), B->C
+    (0.5) and B->D (no weight).
     :param factory graph factory instance to use to construct graph.
     :param str_graph string describing graph to construct.
+    :param weighted whether to parse edge weights. Weights require a
+    graph_types.WeightedFactoryType (e.g. weighted_graph.Factory()), otherwise
+    ValueError is raised.
+    :return: a graph.
+    """
+    return _from_chunks(factory, _slices(str_graph, DEFAULT_CHUNK_SIZE),
+                        weighted)
+
+
+def _slices(text, size):
+    """Yields consecutive slices of text with at most size characters."""
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+def from_file(factory, fileobj, chunk_size=DEFAULT_CHUNK_SIZE,
+              encoding='utf-8', weighted=False):
+    """Construct a graph from a string specifier read from a file.
+
+    The specifier is read and parsed in chunks, so only the graph being built
+    is held in memory.
+    :param factory graph factory instance to use to construct graph.
+    :param fileobj file-like object with a read(size) method (e.g. an open
+    file or an mmap.mmap) containing the specifier.
+    :param chunk_size number of characters or bytes to read at a time.
+    :param encoding encoding used to decode bytes read from fileobj.
+    :param weighted whether to parse edge weights (see from_string).
+    :return: a graph.
+    """
+    return _from_chunks(factory, _read_chunks(fileobj, chunk_size, encoding),
+                        weighted)
+
+
+def from_path(factory, path, chunk_size=DEFAULT_CHUNK_SIZE, encoding='utf-8',
+              weighted=False):
+    """Construct a graph from a string specifier stored in a file.
+
+    The file is memory-mapped and parsed in chunks.
+    :param factory graph factory instance to use to construct graph.
+    :param path path of the file containing the specifier.
+    :param chunk_size number of bytes to parse at a time.
+    :param encoding encoding of the file.
+    :param weighted whether to parse edge weights (see from_string).
     :return: a graph.
     """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return from_string(factory, '')
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return from_file(factory, mapped, chunk_size, encoding,
+                             weighted)
+        finally:
+            mapped.close()
 
+
+def _read_chunks(fileobj, chunk_size, encoding):
+    """Yields text chunks read from fileobj, decoding bytes if needed."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        yield chunk
+    yield decoder.decode(b'', True)
+
+
+def _from_chunks(factory, chunks, weighted=False):
+    if weighted:
+        _check_weighted(factory)
     builder = Builder(factory)
-    node_sequences = [s.split('->') for s in str_graph.split(",")]
+    last_id = None
+    weight = None
+    pending = ''
+    for chunk in chunks:
+        pending += chunk
+        # Parse everything up to the last separator. The rest may be part of
+        # a node id or separator continued in the next chunk.
+        cut = max(pending.rfind(','), pending.rfind('->'))
+        if cut < 0:
+            continue
+        is_arrow = pending[cut] == '-'
+        last_id, weight = _add_sequences(builder, pending[:cut], last_id,
+                                         weight, weighted)
+        if not is_arrow:
+            _check_no_weight(last_id, weight)
+            last_id = None
+        pending = pending[cut + (2 if is_arrow else 1):]
+    _check_no_weight(*_add_sequences(builder, pending, last_id, weight,
+                                     weighted))
+
+    return builder.build()
 
-    for seq in node_sequences:
-        last_id = None
-        for s in seq:
+
+def _add_sequences(builder, text, last_id, weight=None, weighted=False):
+    """Adds the nodes and edges of the comma-separated sequences in text.
+
+    :param builder builder to add nodes and edges to.
+    :param text part of a specifier ending at a separator or at its end.
+    :param last_id id of the node preceding text if text continues a
+    sequence (i.e. the previous part ended with '->'), otherwise None.
+    :param weight weight of the edge from last_id, or None.
+    :param weighted whether node tokens may end with an edge weight.
+    :return: (id of the last node in text, weight following it or None).
+    """
+    for k, seq in enumerate(text.split(',')):
+        if k > 0:
+            _check_no_weight(last_id, weight)
+            last_id = None
+        for s in seq.split('->'):
             node_id = s.strip()
+            next_weight = None
+            if weighted:
+                match = _WEIGHT_SUFFIX.match(node_id)
+                if match is not None:
+                    node_id = match.group(1)
+                    next_weight = float(match.group(2))
             builder.node(node_id)
             if last_id is not None:
-                builder.edge(last_id, node_id)
+                builder.edge(last_id, node_id, weight)
             last_id = node_id
+            weight = next_weight
+    return last_id, weight
 
-    return builder.build()
+
+def _check_no_weight(last_id, weight):
+    """Raises ValueError if a weight is not followed by an edge."""
+    if weight is not None:
+        raise ValueError('Weight after %s is not followed by an edge.' %
+                         last_id)
@@ -0,0 +1,126 @@
+"""Per-graph cache of derived structures such as neighbor maps.
+
+Graphs built by graph.Builder are immutable, so structures derived from them
+can be computed once and reused. Entries are keyed by graph identity and held
+through weak references: they are dropped when the graph is garbage
+collected, when the least recently used graph is evicted, or when
+invalidate() is called. Graph types that can change after construction must
+call invalidate() whenever they do.
+
+Values small enough to store on the graph itself, such as
+graph_types.GraphType.digest, are reset by invalidate() too, and are
+checked against generation() so that clear() drops them as well.
+"""
+import collections
+import weakref
+
+import graph_stats
+
+# Default number of graphs with cached structures.
+DEFAULT_MAX_GRAPHS = 64
+
+
+class GraphCache(object):
+    """LRU cache of derived values keyed by graph and value key."""
+
+    def __init__(self, max_graphs=DEFAULT_MAX_GRAPHS):
+        """Construct a graph cache.
+
+        :param max_graphs: maximum number of graphs to hold values for.
+        """
+        self._max_graphs = max_graphs
+        self._entries = collections.OrderedDict()
+
+    def get(self, graph, key, compute):
+        """Returns the value cached for key on graph, computing it if needed.
+
+        :param graph: a graph_types.GraphType the value is derived from.
+        :param key: hashable key identifying the derived value.
+        :param compute: function with no arguments computing the value.
+        :return: the cached or newly computed value.
+        """
+        graph_key = id(graph)
+        entry = self._entries.pop(graph_key, None)
+        if entry is None or entry[0]() is not graph:
+            try:
+                ref = weakref.ref(graph, self._remover(graph_key))
+            except TypeError:
+                # Graph does not support weak references. Do not cache.
+                if graph_stats.enabled:
+                    graph_stats.count('cache_misses')
+                return compute()
+            entry = (ref, {})
+        self._entries[graph_key] = entry
+
+        values = entry[1]
+        if key not in values:
+            if graph_stats.enabled:
+                graph_stats.count('cache_misses')
+            values[key] = compute()
+            while len(self._entries) > self._max_graphs:
+                self._entries.popitem(last=False)
+        elif graph_stats.enabled:
+            graph_stats.count('cache_hits')
+        return values[key]
+
+    def invalidate(self, graph):
+        """Drops every value cached for graph."""
+        entry = self._entries.get(id(graph))
+        if entry is not None and entry[0]() is graph:
+            del self._entries[id(graph)]
+
+    def clear(self):
+        """Drops every cached value."""
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remover(self, graph_key):
+        entries = self._entries
+
+        def remove(ref):
+            entry = entries.get(graph_key)
+            if entry is not None and entry[0] is ref:
+                del entries[graph_key]
+        return remove
+
+
+_cache = GraphCache()
+
+# Incremented by clear(). See generation().
+_generation = 0
+
+
+def get(graph, key, compute):
+    """Returns the value cached for key on graph in the shared cache."""
+    return _cache.get(graph, key, compute)
+
+
+def invalidate(graph):
+    """Drops every value cached for graph in the shared cache.
+
+    Must be called after modifying a mutable graph_types.GraphType. Also
+    resets the values stored on the graph itself (see
+    graph_types.GraphType.digest).
+    """
+    _cache.invalidate(graph)
+    reset_digest = getattr(graph, '_reset_digest', None)
+    if reset_digest is not None:
+        reset_digest()
+
+
+def clear():
+    """Drops every value in the shared cache and on graphs themselves."""
+    global _generation
+    _cache.clear()
+    _generation += 1
+
+
+def generation():
+    """Returns a number that changes whenever clear() is called.
+
+    Values stored on a graph instead of in the shared cache record the
+    generation they were computed in and are recomputed once it changes.
+    """
+    return _generation
@@ -0,0 +1,98 @@
+import gc
+import unittest
+import basic_graph
+import graph
+import graph_cache
+
+
+class Counter(object):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+class GraphCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.factory = basic_graph.Factory()
+
+    def test_get(self):
+        cache = graph_cache.GraphCache()
+        g1 = graph.from_string(self.factory, 'A->B')
+        g2 = graph.from_string(self.factory, 'A->B')
+        compute = Counter()
+
+        self.assertEqual(1, cache.get(g1, 'key', compute))
+        self.assertEqual(1, cache.get(g1, 'key', compute))
+        self.assertEqual(2, cache.get(g1, 'other', compute))
+        self.assertEqual(3, cache.get(g2, 'key', compute))
+        self.assertEqual(3, compute.calls)
+        self.assertEqual(2, len(cache))
+
+    def test_invalidate(self):
+        cache = graph_cache.GraphCache()
+        g = graph.from_string(self.factory, 'A->B')
+        compute = Counter()
+
+        cache.get(g, 'key', compute)
+        cache.invalidate(g)
+        self.assertEqual(2, cache.get(g, 'key', compute))
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+    def test_invalidate_digest(self):
+        g = graph.from_string(self.factory, 'A->B, B->C, C->C')
+        h = graph.from_string(self.factory, 'A->B, B->C, C->A')
+        self.assertNotEqual(g, h)
+
+        # Mutating a graph and invalidating it resets its stored digest.
+        g.edges().clear()
+        g.edges().update(h.edges())
+        graph_cache.invalidate(g)
+        self.assertEqual(h, g)
+        self.assertEqual(hash(h), hash(g))
+
+        g.edges().pop()
+        graph_cache.clear()
+        self.assertNotEqual(h, g)
+        self.assertEqual(g.digest(), graph.from_string(
+            self.factory, ', '.join(
+                '%s->%s' % tuple(n.id() for n in e.nodes())
+                for e in g.edges())).digest())
+
+    def test_lru_eviction(self):
+        cache = graph_cache.GraphCache(max_graphs=2)
+        graphs = [graph.from_string(self.factory, 'A->B') for _ in range(3)]
+        compute = Counter()
+
+        cache.get(graphs[0], 'key', compute)
+        cache.get(graphs[1], 'key', compute)
+        cache.get(graphs[0], 'key', compute)
+        cache.get(graphs[2], 'key', compute)
+        self.assertEqual(2, len(cache))
+
+        # graphs[1] was least recently used.
+        self.assertEqual(1, cache.get(graphs[0], 'key', compute))
+        self.assertEqual(4, cache.get(graphs[1], 'key', compute))
+
+    def test_garbage_collected(self):
+        cache = graph_cache.GraphCache()
+        g = graph.from_string(self.factory, 'A->B')
+        cache.get(g, 'key', Counter())
+        del g
+        gc.collect()
+        self.assertEqual(0, len(cache))
+
+    def test_not_weak_referenceable(self):
+        cache = graph_cache.GraphCache()
+        compute = Counter()
+        cache.get((), 'key', compute)
+        cache.get((), 'key', compute)
+        self.assertEqual(2, compute.calls)
+        self.assertEqual(0, len(cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,298 @@
+"""Computes the difference between two graphs and applies it incrementally.
+
+diff compares two versions of a graph by node id and by (start id, end id)
+edge keys. The apply_delta functions patch structures derived from the old
+graph (see graph_util) in place so they match the new graph, at a cost that
+depends on the size of the delta rather than on the size of the graph:
+
+    delta = graph_delta.diff(old_graph, new_graph)
+    graph_delta.apply_delta_matrix(matrix, order, delta)
+    graph_delta.apply_delta_neighbor_map(neighbors, delta)
+    graph_delta.apply_delta_components(labels, delta, new_graph)
+"""
+import bisect
+
+import graph_util
+
+
+class Delta(object):
+    """The nodes and edges added and removed between two graphs."""
+
+    def __init__(self, added_nodes, removed_nodes, added_edges,
+                 removed_edges):
+        """Construct a delta.
+
+        :param added_nodes: list of the ids of the nodes only in the new graph.
+        :param removed_nodes: list of the ids of the nodes only in the old
+        graph.
+        :param added_edges: list of the (start id, end id) pairs of the edges
+        only in the new graph.
+        :param removed_edges: list of the (start id, end id) pairs of the
+        edges only in the old graph.
+        """
+        self.added_nodes = added_nodes
+        self.removed_nodes = removed_nodes
+        self.added_edges = added_edges
+        self.removed_edges = removed_edges
+
+    def __eq__(self, other):
+        return (self.added_nodes == other.added_nodes and
+                self.removed_nodes == other.removed_nodes and
+                self.added_edges == other.added_edges and
+                self.removed_edges == other.removed_edges)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return ('[Delta: +nodes=%s, -nodes=%s, +edges=%s, -edges=%s]' %
+                (self.added_nodes, self.removed_nodes, self.added_edges,
+                 self.removed_edges))
+
+    def __len__(self):
+        return (len(self.added_nodes) + len(self.removed_nodes) +
+                len(self.added_edges) + len(self.removed_edges))
+
+
+def _edge_keys(graph):
+    result = set()
+    for e in graph.edges():
+        nodes = e.nodes()
+        result.add((nodes[0].id(), nodes[-1].id()))
+    return result
+
+
+def diff(old_graph, new_graph):
+    """Returns the nodes and edges added and removed between two graphs.
+
+    Nodes are compared by id and edges by their (start id, end id) pair, so
+    the graphs may use different graph classes. Runs in O(N+E).
+
+    :param old_graph: a graph_types.GraphType.
+    :param new_graph: a graph_types.GraphType.
+    :return: a Delta whose lists are sorted in ascending order. Edges of a
+    removed node are listed in removed_edges and edges of an added node in
+    added_edges.
+    """
+    old_nodes = set(n.id() for n in old_graph.nodes())
+    new_nodes = set(n.id() for n in new_graph.nodes())
+    old_edges = _edge_keys(old_graph)
+    new_edges = _edge_keys(new_graph)
+    return Delta(sorted(new_nodes - old_nodes), sorted(old_nodes - new_nodes),
+                 sorted(new_edges - old_edges), sorted(old_edges - new_edges))
+
+
+def apply_delta_matrix(matrix, order, delta, format='list'):
+    """Patches an adjacency matrix in place to apply a delta.
+
+    Rows and columns of added nodes are inserted at the position that keeps
+    order sorted, so a matrix built with the default order of
+    graph_util.adjacency_matrix stays equal to the adjacency matrix of the
+    new graph.
+
+    :param matrix: adjacency matrix of the old graph in 'list', 'bits' or
+    'numpy' format (see graph_util.adjacency_matrix).
+    :param order: list of the node ids of the rows of matrix. Updated in
+    place with the node changes of delta.
+    :param delta: a Delta from the graph of matrix to the new graph.
+    :param format: optional argument (default 'list') giving the format of
+    matrix. A 'numpy' matrix cannot be resized, so only edge changes can be
+    applied to it.
+    """
+    if format not in ('list', 'bits', 'numpy'):
+        raise ValueError('Cannot patch adjacency matrix format: %s' % format)
+    if format == 'numpy' and (delta.added_nodes or delta.removed_nodes):
+        raise ValueError('Cannot add or remove nodes of a numpy matrix.')
+
+    index_map = {node_id: i for i, node_id in enumerate(order)}
+    for from_id, to_id in delta.removed_edges:
+        i = index_map.get(from_id)
+        j = index_map.get(to_id)
+        if i is None or j is None:
+            continue
+        if format == 'bits':
+            matrix[i] &= ~(1 << j)
+        else:
+            matrix[i][j] = 0
+
+    if delta.added_nodes or delta.removed_nodes:
+        for node_id in delta.removed_nodes:
+            j = bisect.bisect_left(order, node_id)
+            if j == len(order) or order[j] != node_id:
+                j = order.index(node_id)
+            _delete_index(matrix, j, format)
+            del order[j]
+        for node_id in delta.added_nodes:
+            j = bisect.bisect_left(order, node_id)
+            _insert_index(matrix, j, format)
+            order.insert(j, node_id)
+        index_map = {node_id: i for i, node_id in enumerate(order)}
+
+    for from_id, to_id in delta.added_edges:
+        i = index_map[from_id]
+        j = index_map[to_id]
+        if format == 'bits':
+            matrix[i] |= 1 << j
+        else:
+            matrix[i][j] = 1
+
+
+def _delete_index(matrix, j, format):
+    """Removes row and column j of a 'list' or 'bits' matrix."""
+    del matrix[j]
+    if format == 'bits':
+        low = (1 << j) - 1
+        for i, row in enumerate(matrix):
+            matrix[i] = (row & low) | ((row >> (j + 1)) << j)
+    else:
+        for row in matrix:
+            del row[j]
+
+
+def _insert_index(matrix, j, format):
+    """Inserts an empty row and column j into a 'list' or 'bits' matrix."""
+    if format == 'bits':
+        low = (1 << j) - 1
+        for i, row in enumerate(matrix):
+            matrix[i] = (row & low) | ((row >> j) << (j + 1))
+        matrix.insert(j, 0)
+    else:
+        for row in matrix:
+            row.insert(j, 0)
+        matrix.insert(j, [0]*(len(matrix) + 1))
+
+
+def apply_delta_neighbor_map(neighbors, delta, directed=True):
+    """Patches a neighbor map in place to apply a delta.
+
+    Takes O(D) time for a delta of D nodes and edges, plus the degree of the
+    endpoints of each removed edge.
+
+    :param neighbors: dictionary mapping node ids to lists of neighboring
+    node ids of the old graph, as returned by graph_util.neighbor_map.
+    :param delta: a Delta from the graph of neighbors to the new graph.
+    :param directed: optional argument (default True) that specifies whether
+    neighbors was built with directed edges.
+    """
+    for from_id, to_id in delta.removed_edges:
+        _remove_neighbor(neighbors, from_id, to_id)
+        if not directed and from_id != to_id:
+            _remove_neighbor(neighbors, to_id, from_id)
+    for node_id in delta.removed_nodes:
+        neighbors.pop(node_id, None)
+    for from_id, to_id in delta.added_edges:
+        neighbors.setdefault(from_id, []).append(to_id)
+        if not directed and from_id != to_id:
+            neighbors.setdefault(to_id, []).append(from_id)
+
+
+def _remove_neighbor(neighbors, node_id, neighbor_id):
+    node_neighbors = neighbors.get(node_id)
+    if node_neighbors is None:
+        return
+    try:
+        node_neighbors.remove(neighbor_id)
+    except ValueError:
+        return
+    if not node_neighbors:
+        del neighbors[node_id]
+
+
+def apply_delta_components(labels, delta, new_graph):
+    """Patches connected component labels in place to apply a delta.
+
+    Added edges merge components by relabeling the smaller one. A component
+    that lost a node, or an edge whose ends are no longer connected (see
+    graph_util.is_connected), may have split, so it is searched again in
+    new_graph, once no matter how many of its nodes and edges were removed.
+    The connectivity check of an edge usually stops after a short search
+    around its ends. The searches read adjacency one node at a time on
+    indexed graphs. Component ids stay consecutive integers starting at 0,
+    but a component may get a different id than
+    graph_util.connected_components would give it.
+
+    :param labels: dictionary mapping each node id of the old graph to a
+    component id, as returned by graph_util.connected_components with
+    directed=False.
+    :param delta: a Delta from the graph of labels to new_graph.
+    :param new_graph: the graph_types.GraphType that delta leads to.
+    """
+    members = {}
+    for node_id, label in labels.items():
+        members.setdefault(label, set()).add(node_id)
+
+    # Components that may have split. A component that only lost edges is
+    # still connected if the ends of each lost edge are still connected, so
+    # it is searched again only once one of those checks fails, and then
+    # only once however many of its edges were removed.
+    changed = set()
+    removed_nodes = set(delta.removed_nodes)
+    for from_id, to_id in delta.removed_edges:
+        if (from_id == to_id or from_id in removed_nodes or
+                to_id in removed_nodes or labels[from_id] in changed):
+            continue
+        if not graph_util.is_connected(new_graph, from_id, to_id,
+                                       directed=False):
+            changed.add(labels[from_id])
+    for node_id in delta.removed_nodes:
+        label = labels.pop(node_id, None)
+        if label is not None:
+            members[label].discard(node_id)
+            changed.add(label)
+
+    free = []
+    num_labels = [len(members)]
+
+    def new_label():
+        if free:
+            return free.pop()
+        num_labels[0] += 1
+        return num_labels[0] - 1
+
+    for node_id in delta.added_nodes:
+        label = new_label()
+        labels[node_id] = label
+        members[label] = set([node_id])
+
+    for from_id, to_id in delta.added_edges:
+        a = labels[from_id]
+        b = labels[to_id]
+        if a == b:
+            continue
+        if len(members[a]) < len(members[b]):
+            a, b = b, a
+        for node_id in members[b]:
+            labels[node_id] = a
+        members[a].update(members.pop(b))
+        free.append(b)
+        if b in changed:
+            changed.discard(b)
+            changed.add(a)
+
+    for label in changed:
+        remaining = members[label]
+        if not remaining:
+            del members[label]
+            free.append(label)
+            continue
+        members[label] = set(graph_util.bfs(new_graph, next(iter(remaining)),
+                                            directed=False))
+        remaining -= members[label]
+        while remaining:
+            component = set(graph_util.bfs(new_graph, next(iter(remaining)),
+                                           directed=False))
+            remaining -= component
+            split_label = new_label()
+            members[split_label] = component
+            for node_id in component:
+                labels[node_id] = split_label
+
+    # Move the components with the highest ids into the unused lower ids.
+    holes = sorted(set(range(num_labels[0])) - set(members), reverse=True)
+    highest = sorted(members)
+    while holes and highest and holes[-1] < highest[-1]:
+        hole = holes.pop()
+        label = highest.pop()
+        for node_id in members[label]:
+            labels[node_id] = hole
+        members[hole] = members.pop(label)
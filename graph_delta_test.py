@@ -0,0 +1,143 @@
+import random
+import unittest
+import basic_graph
+import csr_graph
+import graph
+import graph_delta
+import graph_generators
+import graph_util
+import indexed_graph
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FACTORIES = [basic_graph.Factory(), indexed_graph.Factory(),
+             csr_graph.Factory()]
+
+
+def partition(labels):
+    """Returns the groups of node ids with the same label, sorted."""
+    groups = {}
+    for node_id, label in labels.items():
+        groups.setdefault(label, []).append(node_id)
+    return sorted(sorted(group) for group in groups.values())
+
+
+def create(factory, node_ids, edge_keys):
+    nodes = {node_id: factory.create_node(node_id) for node_id in node_ids}
+    return factory.create_graph(
+        nodes.values(),
+        [factory.create_edge(nodes[s], nodes[e]) for s, e in edge_keys])
+
+
+def mutate(g, seed, factory):
+    """Returns a copy of g with random nodes and edges added and removed."""
+    rng = random.Random(seed)
+    node_ids = set(n.id() for n in g.nodes())
+    edge_keys = set((e.nodes()[0].id(), e.nodes()[-1].id())
+                    for e in g.edges())
+    for node_id in rng.sample(sorted(node_ids), 3):
+        node_ids.discard(node_id)
+    node_ids.update(['x%d' % i for i in range(3)] + ['a', 'n1a'])
+    edge_keys = set((s, e) for s, e in edge_keys
+                    if s in node_ids and e in node_ids)
+    for key in rng.sample(sorted(edge_keys), len(edge_keys) // 10):
+        edge_keys.discard(key)
+    ordered = sorted(node_ids)
+    for _ in range(len(edge_keys) // 10):
+        edge_keys.add((rng.choice(ordered), rng.choice(ordered)))
+    return create(factory, node_ids, edge_keys)
+
+
+class GraphDeltaTest(unittest.TestCase):
+    def setUp(self):
+        self.pairs = []
+        for seed, factory in enumerate(FACTORIES):
+            old = graph_generators.erdos_renyi(factory, 60, 0.03, seed=seed)
+            self.pairs.append((old, mutate(old, seed, factory)))
+
+    def test_diff(self):
+        old = graph.from_string(basic_graph.Factory(), 'A->B->C, D, C->C')
+        new = graph.from_string(indexed_graph.Factory(), 'A->B, C->C, B->E')
+        self.assertEqual(
+            graph_delta.Delta(['E'], ['D'], [('B', 'E')], [('B', 'C')]),
+            graph_delta.diff(old, new))
+        self.assertEqual(0, len(graph_delta.diff(old, old)))
+        self.assertEqual(4, len(graph_delta.diff(new, old)))
+
+    def test_apply_delta_matrix(self):
+        for old, new in self.pairs:
+            delta = graph_delta.diff(old, new)
+            for format in ['list', 'bits']:
+                matrix = graph_util.adjacency_matrix(old, format=format)
+                order = [n.id() for n in sorted(old.nodes())]
+                graph_delta.apply_delta_matrix(matrix, order, delta,
+                                               format=format)
+                self.assertEqual([n.id() for n in sorted(new.nodes())],
+                                 order)
+                self.assertEqual(
+                    graph_util.adjacency_matrix(new, format=format), matrix)
+
+        old, new = self.pairs[0]
+        matrix = graph_util.adjacency_matrix(old)
+        self.assertRaises(ValueError, graph_delta.apply_delta_matrix, matrix,
+                          [], graph_delta.diff(old, new), format='csr')
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_apply_delta_matrix_numpy(self):
+        old = graph.from_string(basic_graph.Factory(), 'A->B->C, C->A, D')
+        new = graph.from_string(basic_graph.Factory(), 'A->B, B->D, C->A, D')
+        matrix = graph_util.adjacency_matrix(old, format='numpy')
+        graph_delta.apply_delta_matrix(matrix, ['A', 'B', 'C', 'D'],
+                                       graph_delta.diff(old, new),
+                                       format='numpy')
+        self.assertTrue(numpy.array_equal(
+            graph_util.adjacency_matrix(new, format='numpy'), matrix))
+        self.assertRaises(
+            ValueError, graph_delta.apply_delta_matrix, matrix,
+            ['A', 'B', 'C', 'D'],
+            graph_delta.diff(new, graph.from_string(basic_graph.Factory(),
+                                                    'A->B')),
+            format='numpy')
+
+    def test_apply_delta_neighbor_map(self):
+        for old, new in self.pairs:
+            delta = graph_delta.diff(old, new)
+            for directed in [True, False]:
+                neighbors = graph_util.neighbor_map(old, directed=directed)
+                graph_delta.apply_delta_neighbor_map(neighbors, delta,
+                                                     directed=directed)
+                expected = graph_util.neighbor_map(new, directed=directed)
+                self.assertEqual(sorted(expected), sorted(neighbors))
+                for node_id in expected:
+                    self.assertEqual(sorted(expected[node_id]),
+                                     sorted(neighbors[node_id]))
+
+    def test_apply_delta_components(self):
+        pairs = list(self.pairs)
+        # Splits a component in two and merges two others.
+        pairs.append((
+            graph.from_string(basic_graph.Factory(), 'A->B->C->D, E, F, G'),
+            graph.from_string(basic_graph.Factory(), 'A->B, C->D, E->F, G')))
+        # One component loses many edges and splits into three.
+        ring = [('r%d' % i, 'r%d' % ((i + 1) % 30)) for i in range(30)]
+        chords = [('r%d' % i, 'r%d' % (i + 15)) for i in range(15)]
+        pairs.append((
+            create(indexed_graph.Factory(), [s for s, _ in ring],
+                   ring + chords),
+            create(indexed_graph.Factory(), [s for s, _ in ring],
+                   ring[:9] + ring[10:19] + ring[20:29])))
+        for old, new in pairs:
+            labels = graph_util.connected_components(old)
+            graph_delta.apply_delta_components(
+                labels, graph_delta.diff(old, new), new)
+            expected = partition(graph_util.connected_components(new))
+            self.assertEqual(expected, partition(labels))
+            self.assertEqual(list(range(len(expected))),
+                             sorted(set(labels.values())))
+
+
+if __name__ == '__main__':
+    unittest.main()
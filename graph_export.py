@@ -0,0 +1,266 @@
+"""Writes graphs to text formats in bounded-size chunks.
+
+Each format has a generator yielding the text in chunks of about chunk_size
+characters and a function writing those chunks to a file object, so the
+text of a large graph is never held in memory at once:
+  spec: the graph.from_string grammar. Paths are written as chains
+    ("A->B->C"), and the output reads back with graph.from_file.
+  csv: one "start,end" row per edge, or "start,end,weight" when weighted.
+    A node without edges is written as a row with only its id.
+  dot: a Graphviz digraph.
+
+Nodes are written in the order of graph.nodes(). Apart from the output
+chunks, writing a graph_types.IndexedGraphType keeps O(N) memory: one flag
+per node and one chain of at most MAX_CHAIN_LENGTH nodes. Other graphs are
+read through graph_util's neighbor maps, which take O(N+E) memory and are
+kept in graph_cache (see graph_cache.invalidate).
+"""
+import csv
+import re
+
+import graph
+import graph_types
+import graph_util
+
+# Maximum number of nodes in a chain. Longer paths are split into chains
+# that share their end nodes, so a path does not have to fit in memory.
+MAX_CHAIN_LENGTH = 1024
+
+_NUMBER = re.compile(r'^[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?$')
+
+
+def _chains(g, weighted):
+    """Yields the nodes and edges of a graph as chains covering every edge.
+
+    :return: generator of (node_ids, weights) pairs where node_ids is a list
+    of node ids with an edge between each consecutive pair and weights is
+    the list of the weights of those edges (None if not weighted). A node
+    without edges is yielded as a chain of one node.
+    """
+    if weighted:
+        if not isinstance(g, graph_types.WeightedGraphType):
+            raise ValueError('Cannot write weights of a %s.' %
+                             g.__class__.__name__)
+        children_of = g.weighted_child_ids
+    else:
+        child_ids = graph_util.neighbor_function(g, True)
+        children_of = lambda node_id: [(c, None) for c in child_ids(node_id)]
+    parents_of = graph_util.neighbor_function(g, True, reverse=True)
+
+    # Nodes whose first edge was already written. A chain only continues
+    # through the first edge of a node, so one flag per node is enough.
+    first_used = set()
+    # Chains start from nodes without parents first, so that paths are not
+    # cut where the node order happens to start them.
+    for from_sources in (True, False):
+        for n in g.nodes():
+            node_id = n.id()
+            if bool(parents_of(node_id)) == from_sources:
+                continue
+            children = children_of(node_id)
+            if not children:
+                if from_sources:
+                    yield [node_id], []
+                continue
+
+            if node_id in first_used:
+                children = children[1:]
+            else:
+                first_used.add(node_id)
+            for child_id, weight in children:
+                node_ids = [node_id, child_id]
+                weights = [weight]
+                current = child_id
+                while current not in first_used:
+                    next_children = children_of(current)
+                    if not next_children:
+                        break
+                    first_used.add(current)
+                    current, weight = next_children[0]
+                    if len(node_ids) == MAX_CHAIN_LENGTH:
+                        yield node_ids, weights
+                        node_ids = [node_ids[-1]]
+                        weights = []
+                    node_ids.append(current)
+                    weights.append(weight)
+                yield node_ids, weights
+
+
+def _join_chunks(parts, chunk_size):
+    """Concatenates strings into chunks of at least chunk_size characters."""
+    pending = []
+    size = 0
+    for part in parts:
+        pending.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield ''.join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield ''.join(pending)
+
+
+def _write(chunks, fileobj):
+    for chunk in chunks:
+        fileobj.write(chunk)
+
+
+def _check_spec_id(node_id, weighted):
+    """Raises ValueError if node_id would not read back from a spec."""
+    if (not isinstance(node_id, str) and
+            not isinstance(node_id, type(u''))):
+        raise ValueError('Spec node ids must be strings, got %r.' %
+                         (node_id,))
+    if (not node_id or node_id != node_id.strip() or ',' in node_id or
+            '->' in node_id):
+        raise ValueError('Node id cannot be written to a spec: %r' %
+                         (node_id,))
+    if weighted and graph._WEIGHT_SUFFIX.match(node_id):
+        raise ValueError('Node id would be read as a weight: %r' %
+                         (node_id,))
+
+
+def _format_weight(weight):
+    text = repr(float(weight))
+    if not _NUMBER.match(text):
+        raise ValueError('Weight cannot be written to a spec: %s' % text)
+    return text
+
+
+def _spec_parts(g, weighted):
+    first = True
+    for node_ids, weights in _chains(g, weighted):
+        for node_id in node_ids:
+            _check_spec_id(node_id, weighted)
+        if not first:
+            yield ', '
+        first = False
+        if not weighted:
+            yield '->'.join(node_ids)
+            continue
+        for node_id, weight in zip(node_ids, weights):
+            yield '%s-%s->' % (node_id, _format_weight(weight))
+        yield node_ids[-1]
+
+
+def iter_spec(g, weighted=False, chunk_size=graph.DEFAULT_CHUNK_SIZE):
+    """Yields the graph.from_string specifier of a graph in chunks.
+
+    An empty graph is written as an empty string, which graph.from_string
+    reads as a graph with one node with id ''.
+    :param g: a graph_types.GraphType whose node ids are non-empty strings
+    without ',', '->' or surrounding whitespace.
+    :param weighted: whether to write edge weights (see graph.from_string).
+    Requires a graph_types.WeightedGraphType with non-negative weights.
+    :param chunk_size: approximate number of characters per chunk.
+    :return: generator of strings whose concatenation is the specifier.
+    :raises ValueError: if a node id or weight cannot be written.
+    """
+    return _join_chunks(_spec_parts(g, weighted), chunk_size)
+
+
+def write_spec(g, fileobj, weighted=False,
+               chunk_size=graph.DEFAULT_CHUNK_SIZE):
+    """Writes the graph.from_string specifier of a graph to a file.
+
+    :param g: a graph_types.GraphType (see iter_spec).
+    :param fileobj: file-like object opened for writing text.
+    :param weighted: whether to write edge weights (see iter_spec).
+    :param chunk_size: approximate number of characters written at a time.
+    """
+    _write(iter_spec(g, weighted, chunk_size), fileobj)
+
+
+class _Rows(object):
+    """File-like object collecting the rows formatted by a csv.writer."""
+
+    def __init__(self):
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+
+
+def _csv_parts(g, weighted):
+    rows = _Rows()
+    writer = csv.writer(rows, lineterminator='\n')
+    for node_ids, weights in _chains(g, weighted):
+        if not weights:
+            writer.writerow(node_ids)
+        for i, weight in enumerate(weights):
+            if weighted:
+                writer.writerow([node_ids[i], node_ids[i + 1], weight])
+            else:
+                writer.writerow(node_ids[i:i + 2])
+        for row in rows.rows:
+            yield row
+        del rows.rows[:]
+
+
+def iter_csv(g, weighted=False, chunk_size=graph.DEFAULT_CHUNK_SIZE):
+    """Yields the edge list of a graph as CSV in chunks.
+
+    :param g: a graph_types.GraphType.
+    :param weighted: whether to write the weight of each edge as a third
+    column. Requires a graph_types.WeightedGraphType.
+    :param chunk_size: approximate number of characters per chunk.
+    :return: generator of strings whose concatenation is the CSV text.
+    """
+    return _join_chunks(_csv_parts(g, weighted), chunk_size)
+
+
+def write_csv(g, fileobj, weighted=False,
+              chunk_size=graph.DEFAULT_CHUNK_SIZE):
+    """Writes the edge list of a graph as CSV to a file.
+
+    :param g: a graph_types.GraphType (see iter_csv).
+    :param fileobj: file-like object opened for writing text.
+    :param weighted: whether to write edge weights (see iter_csv).
+    :param chunk_size: approximate number of characters written at a time.
+    """
+    _write(iter_csv(g, weighted, chunk_size), fileobj)
+
+
+def _dot_id(node_id):
+    text = '%s' % (node_id,)
+    return '"%s"' % text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _dot_parts(g, weighted):
+    yield 'digraph {\n'
+    for node_ids, weights in _chains(g, weighted):
+        if not weighted:
+            yield '  %s;\n' % ' -> '.join(_dot_id(n) for n in node_ids)
+            continue
+        if not weights:
+            yield '  %s;\n' % _dot_id(node_ids[0])
+        for i, weight in enumerate(weights):
+            yield '  %s -> %s [weight=%r];\n' % (
+                _dot_id(node_ids[i]), _dot_id(node_ids[i + 1]),
+                float(weight))
+    yield '}\n'
+
+
+def iter_dot(g, weighted=False, chunk_size=graph.DEFAULT_CHUNK_SIZE):
+    """Yields a graph in the Graphviz DOT language in chunks.
+
+    :param g: a graph_types.GraphType.
+    :param weighted: whether to write edge weights as weight attributes.
+    Requires a graph_types.WeightedGraphType.
+    :param chunk_size: approximate number of characters per chunk.
+    :return: generator of strings whose concatenation is a DOT digraph.
+    """
+    return _join_chunks(_dot_parts(g, weighted), chunk_size)
+
+
+def write_dot(g, fileobj, weighted=False,
+              chunk_size=graph.DEFAULT_CHUNK_SIZE):
+    """Writes a graph in the Graphviz DOT language to a file.
+
+    :param g: a graph_types.GraphType.
+    :param fileobj: file-like object opened for writing text.
+    :param weighted: whether to write edge weights (see iter_dot).
+    :param chunk_size: approximate number of characters written at a time.
+    """
+    _write(iter_dot(g, weighted, chunk_size), fileobj)
@@ -0,0 +1,130 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+import basic_graph
+import csr_graph
+import graph
+import graph_export
+import graph_generators
+import indexed_graph
+import weighted_graph
+
+FACTORIES = [basic_graph.Factory(), indexed_graph.Factory(),
+             csr_graph.Factory()]
+
+SPEC = 'A->B->C->A, C->D, E, B->B, F->G->H, G->D'
+
+
+class GraphExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'graph.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def graphs(self, factory):
+        return [graph.from_string(factory, SPEC),
+                graph_generators.erdos_renyi(factory, 80, 0.03, seed=4),
+                graph_generators.power_law(factory, 100, 2, seed=5),
+                graph_generators.chain(factory, 3000)]
+
+    def test_spec_round_trip(self):
+        for factory in FACTORIES:
+            for g in self.graphs(factory):
+                chunks = list(graph_export.iter_spec(g, chunk_size=64))
+                self.assertEqual(''.join(graph_export.iter_spec(g)),
+                                 ''.join(chunks))
+                self.assertEqual(g, graph.from_string(factory,
+                                                      ''.join(chunks)))
+
+                with open(self.path, 'w') as f:
+                    graph_export.write_spec(g, f, chunk_size=100)
+                self.assertEqual(g, graph.from_path(factory, self.path,
+                                                    chunk_size=7))
+
+    def test_spec_chains(self):
+        for factory in FACTORIES:
+            self.assertEqual(
+                'n0->n1->n2->n3->n4',
+                ''.join(graph_export.iter_spec(
+                    graph_generators.chain(factory, 5))))
+            g = graph_generators.chain(factory, 2 * 1024 + 1)
+            chunks = list(graph_export.iter_spec(g, chunk_size=1000))
+            self.assertTrue(len(chunks) > 1)
+            spec = ''.join(chunks)
+            self.assertEqual(3, len(spec.split(', ')))
+            self.assertEqual(2 * 1024, spec.count('->'))
+
+    def test_spec_weighted(self):
+        spec = 'A-3.0->B-0.5->C, B-1e-07->D, C-2.0->A, E, F-1.0->F'
+        g = graph.from_string(weighted_graph.Factory(), spec, weighted=True)
+        text = ''.join(graph_export.iter_spec(g, weighted=True,
+                                              chunk_size=4))
+        result = graph.from_string(weighted_graph.Factory(), text,
+                                   weighted=True)
+        self.assertEqual(g, result)
+        for e in g.edges():
+            start, end = [n.id() for n in e.nodes()]
+            self.assertEqual(g.weight(start, end), result.weight(start, end))
+
+        self.assertRaises(ValueError, list, graph_export.iter_spec(
+            graph.from_string(basic_graph.Factory(), 'A->B'), weighted=True))
+        self.assertRaises(ValueError, list, graph_export.iter_spec(
+            graph.from_string(weighted_graph.Factory(), 'A-2->B-1'),
+            weighted=True))
+
+    def test_spec_invalid_ids(self):
+        for node_ids in [['A', 'B,C'], ['A->B'], [' A'], [''], [1, 2]]:
+            g = basic_graph.Graph([basic_graph.Node(n) for n in node_ids],
+                                  [])
+            self.assertRaises(ValueError, list, graph_export.iter_spec(g))
+
+    def test_csv(self):
+        for factory in FACTORIES:
+            for g in self.graphs(factory):
+                with open(self.path, 'w') as f:
+                    graph_export.write_csv(g, f, chunk_size=50)
+                builder = graph.Builder(factory)
+                with open(self.path) as f:
+                    for row in csv.reader(f):
+                        if len(row) == 1:
+                            builder.node(row[0])
+                        else:
+                            builder.edge(row[0], row[1])
+                self.assertEqual(g, builder.build())
+
+        g = basic_graph.Graph([basic_graph.Node('C,D')], [])
+        self.assertEqual('"C,D"\n', ''.join(graph_export.iter_csv(g)))
+        g = graph.from_string(weighted_graph.Factory(), 'A-2.5->B, C',
+                              weighted=True)
+        rows = list(csv.reader(
+            ''.join(graph_export.iter_csv(g, weighted=True)).splitlines()))
+        self.assertEqual([['A', 'B', '2.5'], ['C']], sorted(rows))
+
+    def test_dot(self):
+        g = graph.from_string(csr_graph.Factory(), 'A->B->C, "D, C->C')
+        self.assertEqual(
+            'digraph {\n'
+            '  "\\"D";\n'
+            '  "A" -> "B" -> "C" -> "C";\n'
+            '}\n', ''.join(graph_export.iter_dot(g, chunk_size=1)))
+
+        g = graph.from_string(weighted_graph.Factory(), 'A-2->B-0.5->C, D',
+                              weighted=True)
+        with open(self.path, 'w') as f:
+            graph_export.write_dot(g, f, weighted=True)
+        with open(self.path) as f:
+            text = f.read()
+        self.assertEqual(
+            'digraph {\n'
+            '  "A" -> "B" [weight=2.0];\n'
+            '  "B" -> "C" [weight=0.5];\n'
+            '  "D";\n'
+            '}\n', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+"""Compact binary graph files that load by memory-mapping.
+
+A graph file stores a csr_graph.Graph: a header, a table of utf-8 encoded node
+ids and the forward and reverse CSR arrays. load() maps the file read-only and
+wraps the arrays without copying them, so loading takes constant time and
+every process loading the same file shares its pages.
+
+File layout (arrays are in native byte order, each section starts at a
+multiple of 8 bytes):
+  header: magic, byte order, node count, edge count, id data size.
+  id offsets: node count + 1 int32 offsets into the id data.
+  id data: utf-8 encoded node ids, in ascending id order.
+  offsets, targets, reverse offsets, sources: int32 csr_graph arrays.
+"""
+import array
+import mmap
+import struct
+import sys
+
+import csr_graph
+
+_MAGIC = b'GRAPHLIB'
+_HEADER = struct.Struct('<8sQQQQ')
+_BYTE_ORDERS = {'little': 0, 'big': 1}
+_ITEM_SIZE = array.array(csr_graph.INDEX_TYPECODE).itemsize
+_TEXT_TYPE = type(u'')
+
+
+class _IdTable(object):
+    """Sequence of node ids decoded on access from a graph file."""
+
+    def __init__(self, offsets, data):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('node index out of range')
+        start, end = self._offsets[i], self._offsets[i + 1]
+        return self._data[start:end].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def save(graph, path):
+    """Write a graph to a graph file.
+
+    :param graph: a graph_types.GraphType whose node ids are strings.
+    :param path: path of the file to write.
+    """
+    if not isinstance(graph, csr_graph.Graph):
+        edge_nodes = [e.nodes() for e in graph.edges()]
+        graph = csr_graph.from_edges(
+            [n.id() for n in graph.nodes()],
+            [(l[0].id(), l[-1].id()) for l in edge_nodes])
+
+    id_offsets = array.array(csr_graph.INDEX_TYPECODE, [0])
+    id_data = []
+    for node_id in graph.ids():
+        if isinstance(node_id, _TEXT_TYPE):
+            encoded = node_id.encode('utf-8')
+        elif isinstance(node_id, str):
+            # Python 2 byte string.
+            encoded = node_id
+        else:
+            raise ValueError('Graph files require string node ids, got %r.'
+                             % (node_id,))
+        id_data.append(encoded)
+        id_offsets.append(id_offsets[-1] + len(encoded))
+    id_data = b''.join(id_data)
+
+    offsets, targets = graph.csr()
+    reverse_offsets, sources = graph.reverse_csr()
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _BYTE_ORDERS[sys.byteorder],
+                             len(graph.ids()), len(targets), len(id_data)))
+        for section in [id_offsets, id_data, offsets, targets,
+                        reverse_offsets, sources]:
+            _write_section(f, section)
+
+
+def load(path):
+    """Load a graph file by memory-mapping it read-only.
+
+    :param path: path of a file written by save().
+    :return: a csr_graph.Graph backed by the mapped file.
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, byte_order, num_nodes, num_edges, id_size = _HEADER.unpack(
+        mapped[:_HEADER.size])
+    if magic != _MAGIC:
+        raise ValueError('%s is not a graph file.' % path)
+    if byte_order != _BYTE_ORDERS[sys.byteorder]:
+        raise ValueError('%s was written with a different byte order.' % path)
+
+    position = [_HEADER.size]
+
+    def section(size):
+        start = position[0]
+        position[0] = _aligned(start + size)
+        return _view(mapped, start, start + size)
+
+    def int_section(count):
+        return _int_array(section(count * _ITEM_SIZE))
+
+    id_offsets = int_section(num_nodes + 1)
+    id_data = section(id_size)
+    offsets = int_section(num_nodes + 1)
+    targets = int_section(num_edges)
+    reverse_offsets = int_section(num_nodes + 1)
+    sources = int_section(num_edges)
+    return csr_graph.Graph(_IdTable(id_offsets, id_data), offsets, targets,
+                           reverse_offsets, sources)
+
+
+def _aligned(size):
+    return (size + 7) & ~7
+
+
+def _write_section(f, data):
+    if not isinstance(data, bytes):
+        # array.array has no tobytes() on Python 2.
+        data = data.tobytes() if hasattr(data, 'tobytes') else data.tostring()
+    f.write(data)
+    f.write(b'\0' * (_aligned(len(data)) - len(data)))
+
+
+def _view(mapped, start, end):
+    """Returns a view of mapped[start:end], without copying if possible."""
+    try:
+        return memoryview(mapped)[start:end]
+    except TypeError:
+        # Python 2 mmap objects do not export buffers. Copy the bytes instead.
+        return memoryview(mapped[start:end])
+
+
+def _int_array(view):
+    """Returns the int32 values in view, without copying if possible."""
+    try:
+        return view.cast(csr_graph.INDEX_TYPECODE)
+    except AttributeError:
+        # Python 2 memoryviews cannot be cast. Copy the values instead.
+        values = array.array(csr_graph.INDEX_TYPECODE)
+        values.fromstring(view.tobytes())
+        return values
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+import basic_graph
+import csr_graph
+import graph
+import graph_file
+import graph_util
+
+
+class GraphFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'graph.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_save_load(self):
+        spec = (u'x1->x8, x1->x4, x2->x4, x3->x4, x4->x5, x4->x6, x7->x6, '
+                u'x9, \u00e9->\u4e2d->x1')
+        g = graph.from_string(basic_graph.Factory(), spec)
+        graph_file.save(g, self.path)
+        loaded = graph_file.load(self.path)
+
+        self.assertIsInstance(loaded, csr_graph.Graph)
+        self.assertEqual(g, loaded)
+        self.assertEqual(11, len(loaded.nodes()))
+        self.assertEqual(u'\u4e2d', loaded.ids()[-1])
+        self.assertEqual(['x1', 'x2', 'x3', 'x5', 'x6', 'x7'],
+                         sorted(graph_util.markov_blanket(loaded, 'x4')))
+        self.assertEqual([u'\u4e2d'], loaded.parent_ids('x1'))
+        self.assertEqual(-1, loaded.index('x0'))
+        self.assertEqual(-1, loaded.index('x99'))
+        self.assertEqual(-1, loaded.index(1))
+
+        # A loaded graph can be saved again.
+        other_path = os.path.join(self.directory, 'other.bin')
+        graph_file.save(loaded, other_path)
+        self.assertEqual(g, graph_file.load(other_path))
+
+    def test_empty_graph(self):
+        g = basic_graph.Graph([], [])
+        graph_file.save(g, self.path)
+        self.assertEqual(g, graph_file.load(self.path))
+
+    def test_invalid(self):
+        builder = graph.Builder(basic_graph.Factory())
+        builder.edge(1, 2)
+        self.assertRaises(ValueError, graph_file.save, builder.build(),
+                          self.path)
+
+        with open(self.path, 'wb') as f:
+            f.write(b'\0' * 64)
+        self.assertRaises(ValueError, graph_file.load, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
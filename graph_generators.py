@@ -0,0 +1,139 @@
+"""Seeded generators of synthetic graphs for tests and benchmarks.
+
+Every generator takes the factory used to build the graph and returns the
+graph. Node ids are the strings 'n0', 'n1', ... so generated graphs can be
+written in the graph.from_string grammar. Generators taking a seed return the
+same graph for the same arguments.
+"""
+import math
+import random
+
+import graph
+
+
+def _node_id(i):
+    return 'n%d' % i
+
+
+def _build(factory, num_nodes, edge_pairs):
+    builder = graph.Builder(factory)
+    builder.add_nodes(_node_id(i) for i in range(num_nodes))
+    builder.add_edges((_node_id(i), _node_id(j)) for i, j in edge_pairs)
+    return builder.build()
+
+
+def random_dag(factory, num_nodes, num_edges, seed=0):
+    """Returns a directed acyclic graph with edges chosen uniformly at random.
+
+    Nodes are ordered by a random permutation and every edge goes from an
+    earlier to a later node, so node ids do not reveal a topological order.
+    :param factory: graph factory instance to use to construct graph.
+    :param num_nodes: number of nodes.
+    :param num_edges: number of distinct edges. At most
+    num_nodes * (num_nodes - 1) / 2.
+    :param seed: random seed.
+    :return: a graph.
+    """
+    if num_edges > num_nodes * (num_nodes - 1) // 2:
+        raise ValueError('A DAG with %d nodes has at most %d edges.' % (
+            num_nodes, num_nodes * (num_nodes - 1) // 2))
+
+    rng = random.Random(seed)
+    position = list(range(num_nodes))
+    rng.shuffle(position)
+    edges = set()
+    while len(edges) < num_edges:
+        i = rng.randrange(num_nodes)
+        j = rng.randrange(num_nodes)
+        if i != j:
+            edges.add((position[min(i, j)], position[max(i, j)]))
+    return _build(factory, num_nodes, edges)
+
+
+def erdos_renyi(factory, num_nodes, p, seed=0):
+    """Returns a directed G(n, p) random graph without self-loops.
+
+    Each of the num_nodes * (num_nodes - 1) possible edges is present with
+    probability p. Runs in O(N + E) by skipping over absent edges with
+    geometrically distributed steps.
+    :param factory: graph factory instance to use to construct graph.
+    :param num_nodes: number of nodes.
+    :param p: probability of each edge.
+    :param seed: random seed.
+    :return: a graph.
+    """
+    rng = random.Random(seed)
+    edges = []
+    if p >= 1:
+        edges = [(i, j) for i in range(num_nodes) for j in range(num_nodes)
+                 if i != j]
+    elif p > 0:
+        log_q = math.log(1.0 - p)
+        slot = -1
+        while True:
+            slot += 1 + int(math.log(1.0 - rng.random()) / log_q)
+            if slot >= num_nodes * num_nodes:
+                break
+            i, j = divmod(slot, num_nodes)
+            if i != j:
+                edges.append((i, j))
+    return _build(factory, num_nodes, edges)
+
+
+def power_law(factory, num_nodes, edges_per_node=2, seed=0):
+    """Returns a preferential attachment (Barabasi-Albert) graph.
+
+    Nodes are added one at a time, each with edges to edges_per_node distinct
+    earlier nodes chosen with probability proportional to their degree. The
+    degree distribution follows a power law and the graph is acyclic.
+    :param factory: graph factory instance to use to construct graph.
+    :param num_nodes: number of nodes.
+    :param edges_per_node: number of edges added with each node.
+    :param seed: random seed.
+    :return: a graph.
+    """
+    rng = random.Random(seed)
+    edges = []
+    # Each node appears once per incident edge, plus once so that nodes
+    # without edges can be chosen.
+    weighted_nodes = []
+    for i in range(num_nodes):
+        targets = set()
+        while len(targets) < min(edges_per_node, i):
+            targets.add(rng.choice(weighted_nodes))
+        for j in targets:
+            edges.append((i, j))
+            weighted_nodes.append(j)
+        weighted_nodes.extend([i] * (len(targets) + 1))
+    return _build(factory, num_nodes, edges)
+
+
+def chain(factory, num_nodes):
+    """Returns the path n0->n1->...->n(num_nodes - 1).
+
+    :param factory: graph factory instance to use to construct graph.
+    :param num_nodes: number of nodes.
+    :return: a graph.
+    """
+    return _build(factory, num_nodes,
+                  [(i, i + 1) for i in range(num_nodes - 1)])
+
+
+def grid(factory, rows, cols):
+    """Returns a rows x cols grid with edges to the right and downwards.
+
+    Node n(r * cols + c) is at row r and column c.
+    :param factory: graph factory instance to use to construct graph.
+    :param rows: number of rows.
+    :param cols: number of columns.
+    :return: a graph.
+    """
+    edges = []
+    for r in range(rows):
+        for c in range(cols):
+            i = r * cols + c
+            if c + 1 < cols:
+                edges.append((i, i + 1))
+            if r + 1 < rows:
+                edges.append((i, i + cols))
+    return _build(factory, rows * cols, edges)
@@ -0,0 +1,69 @@
+import unittest
+import basic_graph
+import graph
+import graph_generators
+import graph_util
+
+
+class GraphGeneratorsTest(unittest.TestCase):
+    def setUp(self):
+        self.factory = basic_graph.Factory()
+
+    def assert_acyclic(self, g):
+        components = graph_util.strongly_connected_components(g)
+        self.assertEqual(len(g.nodes()), len(set(components.values())))
+        for e in g.edges():
+            self.assertNotEqual(e.nodes()[0], e.nodes()[1])
+
+    def test_random_dag(self):
+        g = graph_generators.random_dag(self.factory, 50, 200, seed=1)
+        self.assertEqual(50, len(g.nodes()))
+        self.assertEqual(200, len(g.edges()))
+        self.assert_acyclic(g)
+        self.assertEqual(g, graph_generators.random_dag(self.factory, 50,
+                                                        200, seed=1))
+        self.assertNotEqual(g, graph_generators.random_dag(self.factory, 50,
+                                                           200, seed=2))
+        self.assertEqual(6, len(graph_generators.random_dag(
+            self.factory, 4, 6).edges()))
+        self.assertRaises(ValueError, graph_generators.random_dag,
+                          self.factory, 4, 7)
+
+    def test_erdos_renyi(self):
+        g = graph_generators.erdos_renyi(self.factory, 200, 0.05, seed=1)
+        self.assertEqual(200, len(g.nodes()))
+        # Expected 200 * 199 * 0.05 = 1990 edges.
+        self.assertTrue(1800 < len(g.edges()) < 2200, len(g.edges()))
+        self.assertEqual(g, graph_generators.erdos_renyi(self.factory, 200,
+                                                         0.05, seed=1))
+        self.assertEqual(0, len(graph_generators.erdos_renyi(
+            self.factory, 10, 0).edges()))
+        self.assertEqual(90, len(graph_generators.erdos_renyi(
+            self.factory, 10, 1).edges()))
+
+    def test_power_law(self):
+        g = graph_generators.power_law(self.factory, 500, 3, seed=1)
+        self.assertEqual(500, len(g.nodes()))
+        self.assertEqual(1 + 2 + 497 * 3, len(g.edges()))
+        self.assert_acyclic(g)
+        in_degrees = sorted(len(graph_util.parents(g, n.id()))
+                            for n in g.nodes())
+        # Heavy tail: the best connected node has far more than the mean.
+        self.assertTrue(in_degrees[-1] > 10 * 3, in_degrees[-1])
+
+    def test_chain(self):
+        self.assertEqual(
+            graph.from_string(self.factory, 'n0->n1->n2->n3'),
+            graph_generators.chain(self.factory, 4))
+        self.assertEqual(graph.from_string(self.factory, 'n0'),
+                         graph_generators.chain(self.factory, 1))
+
+    def test_grid(self):
+        self.assertEqual(
+            graph.from_string(self.factory, 'n0->n1->n2, n3->n4->n5, '
+                                            'n0->n3, n1->n4, n2->n5'),
+            graph_generators.grid(self.factory, 2, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,256 @@
+"""Runs graph algorithms on a pool of worker processes.
+
+The graph is converted to compressed sparse row arrays (see csr_graph) that
+are copied once into shared memory and handed to the workers by the pool
+initializer, so Graph objects are never pickled. Nodes are partitioned into
+contiguous ranges of node indices, one task per range, and only node indices
+are sent between processes.
+
+Each function takes a processes argument. With processes=1 the tasks run in
+the calling process without a pool, which avoids the cost of starting
+workers for small graphs.
+"""
+import multiprocessing
+from multiprocessing import sharedctypes
+
+import csr_graph
+
+# Number of tasks per worker process. More tasks balance uneven ranges.
+TASKS_PER_PROCESS = 4
+
+# (offsets, targets, reverse_offsets, sources) of the graph being processed,
+# set by _init_worker in each worker.
+_adjacency = None
+
+
+def _init_worker(adjacency):
+    global _adjacency
+    _adjacency = tuple(_fast_view(values) for values in adjacency)
+
+
+def _fast_view(values):
+    """Returns a view of a shared array that is fast to index."""
+    try:
+        # memoryview of a ctypes array has an explicit byte order ('<i'),
+        # which it cannot index. Recast it to the native format.
+        return memoryview(values).cast('B').cast(csr_graph.INDEX_TYPECODE)
+    except (AttributeError, TypeError):
+        # Python 2 memoryviews cannot be cast.
+        return values
+
+
+def _shared_array(values):
+    """Copies an array of node indices into shared memory."""
+    result = sharedctypes.RawArray(csr_graph.INDEX_TYPECODE, len(values))
+    result[:] = values
+    return result
+
+
+def _to_csr(graph):
+    """Returns graph as a csr_graph.Graph, converting it if needed."""
+    if isinstance(graph, csr_graph.Graph):
+        return graph
+    return csr_graph.Factory().create_graph(graph.nodes(), graph.edges())
+
+
+def _chunks(indices, num_chunks):
+    """Splits a list of node indices into at most num_chunks ranges."""
+    size = max(1, -(-len(indices) // num_chunks))
+    return [indices[i:i + size] for i in range(0, len(indices), size)]
+
+
+def _run(g, task, indices, processes):
+    """Applies task to ranges of indices in parallel.
+
+    :param g: a csr_graph.Graph.
+    :param task: module-level function taking a list of node indices.
+    :param indices: list of node indices to process.
+    :param processes: number of worker processes. If None, one per CPU.
+    :return: the results of task for each range, in order.
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    offsets, targets = g.csr()
+    reverse_offsets, sources = g.reverse_csr()
+    adjacency = (offsets, targets, reverse_offsets, sources)
+
+    global _adjacency
+    if processes <= 1:
+        previous = _adjacency
+        _adjacency = adjacency
+        try:
+            return [task(indices)]
+        finally:
+            _adjacency = previous
+
+    shared = tuple(_shared_array(values) for values in adjacency)
+    pool = multiprocessing.Pool(processes, _init_worker, (shared,))
+    try:
+        return pool.map(task,
+                        _chunks(indices, processes * TASKS_PER_PROCESS))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _indices(g, node_ids):
+    """Returns the node indices of node_ids (all nodes if None).
+
+    :raises KeyError: if a node id is not in the graph. Checked here so the
+    error is raised before any worker starts.
+    """
+    if node_ids is None:
+        return list(range(len(g.ids())))
+    result = []
+    for node_id in node_ids:
+        i = g.index(node_id)
+        if i < 0:
+            raise KeyError(node_id)
+        result.append(i)
+    return result
+
+
+def all_descendants(graph, node_ids=None, processes=None):
+    """Returns the descendants of many nodes, one breadth-first search each.
+
+    :param graph: a graph_types.GraphType to search.
+    :param node_ids: optional iterable of the ids of the nodes to start from.
+    If None, every node of the graph is used.
+    :param processes: optional number of worker processes (default one per
+    CPU).
+    :return: a dictionary mapping each start node id to the ids of the nodes
+    reachable from it in ascending order (see graph_util.descendants).
+    :raises KeyError: if a node id is not in the graph.
+    """
+    g = _to_csr(graph)
+    indices = _indices(g, node_ids)
+    ids = g.ids()
+    result = {}
+    for chunk in _run(g, _descendants_task, indices, processes):
+        for i, reached in chunk:
+            result[ids[i]] = [ids[j] for j in reached]
+    return result
+
+
+def _descendants_task(indices):
+    offsets, targets = _adjacency[0], _adjacency[1]
+    result = []
+    for start in indices:
+        visited = set([start])
+        frontier = [start]
+        reached = []
+        while frontier:
+            next_frontier = []
+            for i in frontier:
+                for k in range(offsets[i], offsets[i + 1]):
+                    j = targets[k]
+                    if j == start:
+                        continue
+                    if j not in visited:
+                        visited.add(j)
+                        reached.append(j)
+                        next_frontier.append(j)
+            frontier = next_frontier
+        reached.sort()
+        result.append((start, reached))
+    return result
+
+
+def markov_blankets(graph, node_ids=None, processes=None):
+    """Returns the Markov blankets of many nodes (see graph_util).
+
+    :param graph: a graph_types.GraphType to fetch the markov blankets from.
+    :param node_ids: optional iterable of node ids to get Markov blankets of.
+    If None, the blankets of all nodes in the graph are returned.
+    :param processes: optional number of worker processes (default one per
+    CPU).
+    :return: a dictionary mapping each node id to a list of the node ids in
+    its Markov blanket.
+    :raises KeyError: if a node id is not in the graph.
+    """
+    g = _to_csr(graph)
+    indices = _indices(g, node_ids)
+    ids = g.ids()
+    result = {}
+    for chunk in _run(g, _blankets_task, indices, processes):
+        for i, blanket in chunk:
+            result[ids[i]] = [ids[j] for j in blanket]
+    return result
+
+
+def _blankets_task(indices):
+    offsets, targets, reverse_offsets, sources = _adjacency
+    result = []
+    for i in indices:
+        blanket = set()
+        for k in range(reverse_offsets[i], reverse_offsets[i + 1]):
+            blanket.add(sources[k])
+        for k in range(offsets[i], offsets[i + 1]):
+            c = targets[k]
+            blanket.add(c)
+            if c == i:
+                continue
+            for m in range(reverse_offsets[c], reverse_offsets[c + 1]):
+                blanket.add(sources[m])
+        blanket.discard(i)
+        result.append((i, list(blanket)))
+    return result
+
+
+def connected_components(graph, processes=None):
+    """Labels each node with the id of its connected component.
+
+    Edge direction is ignored. Each worker merges the components of the
+    edges starting in its range of nodes, and the resulting forests are
+    merged in the calling process.
+
+    :param graph: a graph_types.GraphType to find the components of.
+    :param processes: optional number of worker processes (default one per
+    CPU).
+    :return: a dictionary mapping each node id to a component id. Component
+    ids are consecutive integers starting at 0.
+    """
+    g = _to_csr(graph)
+    ids = g.ids()
+    parent = list(range(len(ids)))
+    for forest in _run(g, _components_task, list(range(len(ids))),
+                       processes):
+        for i, root in forest:
+            _union(parent, i, root)
+
+    labels = {}
+    result = {}
+    for i in range(len(ids)):
+        root = _find(parent, i)
+        if root not in labels:
+            labels[root] = len(labels)
+        result[ids[i]] = labels[root]
+    return result
+
+
+def _components_task(indices):
+    offsets, targets = _adjacency[0], _adjacency[1]
+    parent = {}
+    for i in indices:
+        for k in range(offsets[i], offsets[i + 1]):
+            j = targets[k]
+            parent.setdefault(i, i)
+            parent.setdefault(j, j)
+            _union(parent, i, j)
+    return [(i, _find(parent, i)) for i in parent if parent[i] != i]
+
+
+def _find(parent, i):
+    """Returns the root of i in a union-find forest, halving its path."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _union(parent, i, j):
+    """Merges the trees of i and j in a union-find forest."""
+    a = _find(parent, i)
+    b = _find(parent, j)
+    if a != b:
+        parent[max(a, b)] = min(a, b)
@@ -0,0 +1,68 @@
+import unittest
+import basic_graph
+import csr_graph
+import graph_generators
+import graph_parallel
+import graph_util
+
+
+def partition(labels):
+    """Returns the groups of node ids with the same label, sorted."""
+    groups = {}
+    for node_id, label in labels.items():
+        groups.setdefault(label, []).append(node_id)
+    return sorted(sorted(group) for group in groups.values())
+
+
+class GraphParallelTest(unittest.TestCase):
+    def setUp(self):
+        self.graphs = [
+            graph_generators.power_law(basic_graph.Factory(), 200, 2,
+                                       seed=1),
+            graph_generators.erdos_renyi(csr_graph.Factory(), 100, 0.02,
+                                         seed=2),
+        ]
+
+    def test_all_descendants(self):
+        for g in self.graphs:
+            for processes in [1, 2]:
+                result = graph_parallel.all_descendants(g,
+                                                        processes=processes)
+                self.assertEqual(len(g.nodes()), len(result))
+                for n in g.nodes():
+                    self.assertEqual(graph_util.descendants(g, n.id()),
+                                     result[n.id()])
+
+        result = graph_parallel.all_descendants(self.graphs[1], ['n3', 'n7'],
+                                                processes=2)
+        self.assertEqual(['n3', 'n7'], sorted(result))
+        self.assertRaises(KeyError, graph_parallel.all_descendants,
+                          self.graphs[1], ['n3', 'missing'], processes=2)
+
+    def test_markov_blankets(self):
+        for g in self.graphs:
+            expected = graph_util.markov_blankets(g)
+            for processes in [1, 2]:
+                result = graph_parallel.markov_blankets(g,
+                                                        processes=processes)
+                self.assertEqual(sorted(expected), sorted(result))
+                for node_id in expected:
+                    self.assertEqual(sorted(expected[node_id]),
+                                     sorted(result[node_id]))
+
+        self.assertRaises(KeyError, graph_parallel.markov_blankets,
+                          self.graphs[0], ['missing'], processes=1)
+
+    def test_connected_components(self):
+        for g in self.graphs:
+            expected = partition(graph_util.connected_components(g))
+            for processes in [1, 2, 3]:
+                labels = graph_parallel.connected_components(
+                    g, processes=processes)
+                self.assertEqual(expected, partition(labels))
+                self.assertEqual(list(range(len(expected))),
+                                 sorted(set(labels.values())))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Opt-in instrumentation of graph operations.
+
+When enabled, graph operations count the work they do (edges scanned, nodes
+visited, edge hashes computed, graph_cache hits and misses) and graph_util
+functions record their call counts and wall time. When disabled, each
+counting point costs one check of the module-level `enabled` flag and timed
+functions are called directly.
+
+Typical use:
+
+    with graph_util.collect_stats() as collected:
+        graph_util.markov_blanket(g, 'A')
+    print(collected.stats)
+"""
+import functools
+import timeit
+
+# Whether statistics are being collected. Checked inline on hot paths.
+enabled = False
+
+_counters = {}
+_timings = {}
+# (module namespace, function name, function, timing wrapper) of every
+# function decorated with timed().
+_timed_functions = []
+
+
+def enable():
+    """Starts collecting statistics."""
+    _set_enabled(True)
+
+
+def disable():
+    """Stops collecting statistics. Collected values are kept."""
+    _set_enabled(False)
+
+
+def _set_enabled(value):
+    global enabled
+    enabled = value
+    for namespace, name, fn, wrapper in _timed_functions:
+        namespace[name] = wrapper if value else fn
+
+
+def reset():
+    """Discards all collected statistics."""
+    _counters.clear()
+    _timings.clear()
+
+
+def count(name, amount=1):
+    """Adds amount to the named counter. Callers check `enabled` first."""
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+def timed(name):
+    """Decorator recording the calls and wall time of a module function.
+
+    The function is left unwrapped while collection is disabled: enable()
+    rebinds the module attribute to a timing wrapper and disable() restores
+    the function, so disabled timing costs nothing per call. Only calls made
+    through the module attribute (graph_util.parents, not a reference taken
+    with `from graph_util import parents`) are timed.
+    :param name: name to record the timings under.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = timeit.default_timer()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timing = _timings.setdefault(name, [0, 0.0])
+                timing[0] += 1
+                timing[1] += timeit.default_timer() - start
+
+        _timed_functions.append((fn.__globals__, fn.__name__, fn, wrapper))
+        return wrapper if enabled else fn
+    return decorator
+
+
+def stats():
+    """Returns a snapshot of the collected statistics.
+
+    :return: a dictionary {'counters': {name: value}, 'timings': {name:
+    {'calls': number of calls, 'seconds': total wall time}}}.
+    """
+    return {
+        'counters': dict(_counters),
+        'timings': {name: {'calls': calls, 'seconds': seconds}
+                    for name, (calls, seconds) in _timings.items()},
+    }
+
+
+def _difference(end, start):
+    """Returns the statistics collected between two stats() snapshots."""
+    counters = {}
+    for name, value in end['counters'].items():
+        value -= start['counters'].get(name, 0)
+        if value:
+            counters[name] = value
+
+    timings = {}
+    for name, timing in end['timings'].items():
+        before = start['timings'].get(name, {'calls': 0, 'seconds': 0.0})
+        calls = timing['calls'] - before['calls']
+        if calls:
+            timings[name] = {'calls': calls,
+                             'seconds': timing['seconds'] - before['seconds']}
+    return {'counters': counters, 'timings': timings}
+
+
+class collect(object):
+    """Context manager collecting statistics within its scope.
+
+    On exit, the `stats` attribute holds the statistics collected inside the
+    scope, in the format of stats(). Scopes may be nested.
+    """
+
+    def __init__(self):
+        self.stats = None
+        self._was_enabled = False
+        self._start = None
+
+    def __enter__(self):
+        self._was_enabled = enabled
+        self._start = stats()
+        _set_enabled(True)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats = _difference(stats(), self._start)
+        _set_enabled(self._was_enabled)
+        return False
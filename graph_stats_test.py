@@ -0,0 +1,106 @@
+import unittest
+import basic_graph
+import graph
+import graph_cache
+import graph_stats
+import graph_util
+import indexed_graph
+
+
+class GraphStatsTest(unittest.TestCase):
+    def setUp(self):
+        graph_stats.disable()
+        graph_stats.reset()
+        graph_cache.clear()
+        self.factory = basic_graph.Factory()
+
+    def tearDown(self):
+        graph_stats.disable()
+        graph_stats.reset()
+
+    def test_disabled(self):
+        g = graph.from_string(self.factory, 'A->B->C')
+        graph_util.parents(g, 'B')
+        graph_util.is_connected(g, 'A', 'C')
+        self.assertEqual({'counters': {}, 'timings': {}}, graph_util.stats())
+
+    def test_timed_functions_unwrapped_when_disabled(self):
+        parents = graph_util.parents
+        graph_stats.enable()
+        self.assertIsNot(parents, graph_util.parents)
+        self.assertEqual('parents', graph_util.parents.__name__)
+        graph_stats.disable()
+        self.assertIs(parents, graph_util.parents)
+
+    def test_counters(self):
+        g = graph.from_string(self.factory, 'A->B->C, D')
+        graph_stats.enable()
+        self.assertEqual(['A'], graph_util.parents(g, 'B'))
+        self.assertTrue(graph_util.is_connected(g, 'A', 'C'))
+        self.assertTrue(graph_util.is_connected(g, 'A', 'C'))
+        graph_stats.disable()
+        graph_util.parents(g, 'B')
+
+        counters = graph_util.stats()['counters']
+        # parents scans both edges, and so does building the neighbor map.
+        self.assertEqual(4, counters['edges_scanned'])
+        # Each search visits B forward and C backward, then meets at C.
+        self.assertEqual(4, counters['nodes_visited'])
+        # The neighbor and parent maps are built once, the parent map from
+        # the neighbor map.
+        self.assertEqual(2, counters['cache_misses'])
+        self.assertEqual(3, counters['cache_hits'])
+
+        timings = graph_util.stats()['timings']
+        self.assertEqual(1, timings['graph_util.parents']['calls'])
+        self.assertEqual(2, timings['graph_util.is_connected']['calls'])
+        self.assertTrue(timings['graph_util.parents']['seconds'] >= 0)
+
+        graph_util.reset_stats()
+        self.assertEqual({'counters': {}, 'timings': {}}, graph_util.stats())
+
+    def test_indexed_graph(self):
+        g = graph.from_string(indexed_graph.Factory(), 'A->C, B->C')
+        with graph_util.collect_stats() as collected:
+            graph_util.parents(g, 'C')
+        self.assertEqual({'edges_scanned': 2},
+                         collected.stats['counters'])
+
+    def test_edge_hashes(self):
+        a = self.factory.create_node('A')
+        b = self.factory.create_node('B')
+        edge = self.factory.create_edge(a, b)
+        with graph_util.collect_stats() as collected:
+            hash(edge)
+        self.assertEqual(1, collected.stats['counters']['edge_hashes'])
+
+    def test_collect(self):
+        g = graph.from_string(self.factory, 'A->B->C')
+        with graph_util.collect_stats() as outer:
+            graph_util.children(g, 'A')
+            with graph_util.collect_stats() as inner:
+                graph_util.markov_blanket(g, 'B')
+            self.assertTrue(graph_stats.enabled)
+        self.assertFalse(graph_stats.enabled)
+
+        self.assertEqual(
+            {'graph_util.markov_blanket', 'graph_util.parents',
+             'graph_util.children'},
+            set(inner.stats['timings']))
+        self.assertEqual(1, inner.stats['timings']['graph_util.children']
+                         ['calls'])
+        self.assertEqual(2, outer.stats['timings']['graph_util.children']
+                         ['calls'])
+        self.assertEqual(2 + 2 * 2, inner.stats['counters']['edges_scanned'])
+        self.assertEqual(2 + 3 * 2, outer.stats['counters']['edges_scanned'])
+
+    def test_collect_restores_on_error(self):
+        def fail():
+            with graph_util.collect_stats():
+                raise ValueError()
+        self.assertRaises(ValueError, fail)
+        self.assertFalse(graph_stats.enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,17 @@
+import io
+import os
+import shutil
+import tempfile
 import unittest
 import basic_graph
+import csr_graph
 import graph
+import weighted_graph
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class TestGraph(unittest.TestCase):
@@ -8,6 +19,40 @@ class TestGraph(unittest.TestCase):
         # TODO(radford): Add test cases for builder.
         pass
 
+    def test_graph_Builder_bulk(self):
+        factory = basic_graph.Factory()
+        pairs = [('A', 'B'), ('B', 'C'), ['A', 'B'], ('C', 'C')]
+
+        expected_builder = graph.Builder(factory)
+        expected_builder.node('D')
+        for start_id, end_id in pairs:
+            expected_builder.edge(start_id, end_id)
+
+        builder = graph.Builder(factory)
+        builder.add_nodes(['D', 'A', 'D'])
+        builder.add_edges(pairs[:2])
+        builder.add_edges(pairs)
+        self.assertEqual(expected_builder.build(), builder.build())
+
+        # Bulk calls reuse nodes and edges created by per-item calls.
+        self.assertTrue(builder.edge('A', 'B') is builder.edge('A', 'B'))
+        self.assertTrue(builder.node('A') is builder.edge('A', 'B').nodes()[0])
+        self.assertEqual(4, len(builder.build().nodes()))
+        self.assertEqual(3, len(builder.build().edges()))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed.')
+    def test_graph_Builder_bulk_numpy(self):
+        factory = basic_graph.Factory()
+        builder = graph.Builder(factory)
+        builder.add_nodes(numpy.arange(5))
+        builder.add_edges(numpy.array([[0, 1], [1, 2], [0, 1]]))
+        g = builder.build()
+        self.assertEqual([0, 1, 2, 3, 4], sorted(n.id() for n in g.nodes()))
+        self.assertEqual([[0, 1], [1, 2]],
+                         sorted([n.id() for n in e.nodes()]
+                                for e in g.edges()))
+        self.assertTrue(all(type(n.id()) is int for n in g.nodes()))
+
     def test_graph_from_string(self):
         factory = basic_graph.Factory()
         g1 = graph.from_string(factory, "A->B, B->C, C->D, D->B")
@@ -38,6 +83,104 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(sorted(expected_node_list), sorted(nodes))
         self.assertEqual(sorted(expected_edge_list), sorted(edges))
 
+    def test_graph_from_string_empty_ids(self):
+        factory = basic_graph.Factory()
+        g = graph.from_string(factory, 'A->B,')
+        self.assertEqual(['', 'A', 'B'], sorted(n.id() for n in g.nodes()))
+
+    def test_graph_from_string_long(self):
+        # Longer than one chunk, with chains crossing chunk boundaries.
+        factory = basic_graph.Factory()
+        spec = ', '.join('n%d->n%d->n%d' % (i, i + 1, i + 7)
+                         for i in range(10000))
+        self.assertTrue(len(spec) > graph.DEFAULT_CHUNK_SIZE)
+        builder = graph.Builder(factory)
+        for i in range(10000):
+            builder.edge('n%d' % i, 'n%d' % (i + 1))
+            builder.edge('n%d' % (i + 1), 'n%d' % (i + 7))
+        self.assertEqual(builder.build(), graph.from_string(factory, spec))
+
+    def test_graph_from_file(self):
+        factory = basic_graph.Factory()
+        spec = u' A->B-> C -> D->B, E, F-G->H,I->I '
+        expected = graph.from_string(factory, spec)
+        self.assertEqual(8, len(expected.nodes()))
+        self.assertEqual(6, len(expected.edges()))
+
+        # Chunk boundaries fall at every position, including inside '->'.
+        for chunk_size in range(1, 8):
+            self.assertEqual(expected, graph.from_file(
+                factory, io.StringIO(spec), chunk_size=chunk_size))
+            self.assertEqual(expected, graph.from_file(
+                factory, io.BytesIO(spec.encode('utf-8')),
+                chunk_size=chunk_size))
+
+    def test_graph_from_string_weighted(self):
+        factory = weighted_graph.Factory()
+        spec = u'A-3->B - 0.5 -> C, B->D, x-1-2.5e1->y, F-G->H'
+        g = graph.from_string(factory, spec, weighted=True)
+        self.assertEqual(3.0, g.weight('A', 'B'))
+        self.assertEqual(0.5, g.weight('B', 'C'))
+        self.assertEqual(weighted_graph.DEFAULT_WEIGHT, g.weight('B', 'D'))
+        self.assertEqual(25.0, g.weight('x-1', 'y'))
+        self.assertEqual(1.0, g.weight('F-G', 'H'))
+
+        # Without weighted=True the suffix is part of the node id.
+        self.assertTrue(graph.from_string(factory, spec).has_edge(
+            'A-3', 'B - 0.5'))
+
+        for chunk_size in range(1, 8):
+            chunked = graph.from_file(factory, io.StringIO(spec),
+                                      chunk_size=chunk_size, weighted=True)
+            self.assertEqual(g, chunked)
+            self.assertEqual(
+                sorted((e.nodes()[0].id(), e.nodes()[1].id(), e.weight())
+                       for e in g.edges()),
+                sorted((e.nodes()[0].id(), e.nodes()[1].id(), e.weight())
+                       for e in chunked.edges()))
+
+        for spec in ['A-3', 'A-3, B', 'A->B-3']:
+            self.assertRaises(ValueError, graph.from_string, factory, spec,
+                              weighted=True)
+        self.assertRaises(ValueError, graph.from_string,
+                          basic_graph.Factory(), 'A-3->B', weighted=True)
+
+    def test_graph_Builder_weights(self):
+        for factory in [basic_graph.Factory(), csr_graph.Factory()]:
+            self.assertRaises(ValueError, graph.Builder(factory).edge, 'A',
+                              'B', 2)
+        builder = graph.Builder(weighted_graph.Factory())
+        builder.edge('A', 'B', 2)
+        builder.edge('B', 'C')
+        builder.edge('B', 'C', 4.5)
+        g = builder.build()
+        self.assertEqual(2.0, g.weight('A', 'B'))
+        self.assertEqual(4.5, g.weight('B', 'C'))
+
+    def test_graph_from_file_multibyte(self):
+        factory = basic_graph.Factory()
+        spec = u'\u00e9->\u4e2d, \u4e2d->x'
+        g = graph.from_file(factory, io.BytesIO(spec.encode('utf-8')),
+                            chunk_size=1)
+        self.assertEqual(graph.from_string(factory, spec), g)
+
+    def test_graph_from_path(self):
+        factory = basic_graph.Factory()
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'graph.txt')
+            with open(path, 'wb') as f:
+                f.write(b'A->B->C, B->C, D')
+            self.assertEqual(
+                graph.from_string(factory, 'A->B->C, B->C, D'),
+                graph.from_path(factory, path, chunk_size=3))
+
+            open(path, 'wb').close()
+            self.assertEqual(graph.from_string(factory, ''),
+                             graph.from_path(factory, path))
+        finally:
+            shutil.rmtree(directory)
+
 
 if __name__ == '__main__':
     unittest.main()
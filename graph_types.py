@@ -1,8 +1,11 @@
 """Interface for various graph structures."""
+import graph_cache
+import graph_stats
 
 
 class NodeType(object):
     """Represents the node of a graph."""
+    __slots__ = ()
 
     def id(self):
         """Returns the node label."""
@@ -23,6 +26,7 @@ class NodeType(object):
 
 class EdgeType(object):
     """Represents the edge of a graph."""
+    __slots__ = ()
 
     def nodes(self):
         """Returns the pair (start_node, end_node) representing the edge."""
@@ -51,10 +55,37 @@ class EdgeType(object):
         return len(self.nodes()) < len(other_nodes)
 
     def __hash__(self):
+        if graph_stats.enabled:
+            graph_stats.count('edge_hashes')
         key = [n.id() for n in self.nodes()]
         return str(key).__hash__()
 
 
+_HASH_MASK = (1 << 64) - 1
+
+
+def _mix_hash(value):
+    """Scrambles the bits of a hash value (splitmix64 finalizer).
+
+    Summing mixed hashes gives an order-independent digest that does not
+    cancel out the way summing or xor-ing raw hashes can.
+    """
+    value &= _HASH_MASK
+    value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & _HASH_MASK
+    value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & _HASH_MASK
+    return value ^ (value >> 31)
+
+
+def _sizes_differ(items, other_items):
+    """Returns True if both collections have a length and the lengths differ.
+
+    nodes() and edges() only promise an iterable, so collections without
+    __len__ are not compared.
+    """
+    return (hasattr(items, '__len__') and hasattr(other_items, '__len__') and
+            len(items) != len(other_items))
+
+
 class GraphType(object):
     """Interface for a graph which is a collection of nodes and edges."""
 
@@ -77,10 +108,109 @@ class GraphType(object):
             ','.join(sorted(nodes)),
             ','.join(sorted(edges)))
 
+    def digest(self):
+        """Returns an order-independent digest of the nodes and edges.
+
+        Equal graphs have equal digests. The digest is computed in O(N+E) on
+        first use and stored on the graph rather than in graph_cache, so it
+        is not evicted with the cached structures. graph_cache.invalidate()
+        and graph_cache.clear() still reset it, so graph types that can
+        change after construction must call graph_cache.invalidate()
+        whenever they do. Like hash(), it is only stable within one process.
+        """
+        generation = graph_cache.generation()
+        stored = getattr(self, '_digest', None)
+        if stored is not None and stored[0] == generation:
+            return stored[1]
+        result = self._compute_digest()
+        try:
+            self._digest = (generation, result)
+        except AttributeError:
+            # Graph has __slots__ without room for the digest.
+            pass
+        return result
+
+    def _reset_digest(self):
+        """Drops the stored digest after the graph changed."""
+        try:
+            self._digest = None
+        except AttributeError:
+            pass
+
+    def _compute_digest(self):
+        num_nodes = 0
+        node_sum = 0
+        for n in self.nodes():
+            num_nodes += 1
+            node_sum += _mix_hash(hash(n.id()))
+
+        num_edges = 0
+        edge_sum = 0
+        for e in self.edges():
+            num_edges += 1
+            edge_sum += _mix_hash(hash(tuple([n.id() for n in e.nodes()])))
+
+        return hash((num_nodes, num_edges, node_sum & _HASH_MASK,
+                     edge_sum & _HASH_MASK))
+
     def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, GraphType):
+            return NotImplemented
+        if (_sizes_differ(self.nodes(), other.nodes()) or
+                _sizes_differ(self.edges(), other.edges()) or
+                self.digest() != other.digest()):
+            return False
         return (sorted(self.nodes()) == sorted(other.nodes()) and
                 sorted(self.edges()) == sorted(other.edges()))
 
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return self.digest()
+
+
+class IndexedGraphType(GraphType):
+    """Interface for a graph that maintains forward and reverse adjacency.
+
+    graph_util uses these indexes instead of scanning every edge.
+    """
+
+    def parent_ids(self, node_id):
+        """Returns a new list of ids of nodes with edges into node_id."""
+        raise NotImplementedError('parent_ids not implemented.')
+
+    def child_ids(self, node_id):
+        """Returns a new list of ids of nodes with an edge from node_id."""
+        raise NotImplementedError('child_ids not implemented.')
+
+
+class WeightedGraphType(IndexedGraphType):
+    """Interface for an indexed graph with a numeric weight on each edge.
+
+    Weights are not part of graph equality or digest().
+    """
+
+    def weight(self, start_id, end_id):
+        """Returns the weight of the edge from start_id to end_id.
+
+        :raises KeyError: if the graph has no such edge.
+        """
+        raise NotImplementedError('weight not implemented.')
+
+    def weighted_child_ids(self, node_id):
+        """Returns a new list of (child id, edge weight) pairs of node_id."""
+        raise NotImplementedError('weighted_child_ids not implemented.')
+
+    def weighted_parent_ids(self, node_id):
+        """Returns a new list of (parent id, edge weight) pairs of node_id."""
+        raise NotImplementedError('weighted_parent_ids not implemented.')
+
 
 class FactoryType(object):
     """Interface for a graph factory for components of a graph."""
@@ -108,6 +238,20 @@ class FactoryType(object):
         raise NotImplementedError('create_graph not implemented')
 
 
+class WeightedFactoryType(FactoryType):
+    """Interface for a factory of graphs with a weight on each edge."""
+
+    def create_graph(self, nodes, edges, weights=None):
+        """Create a weighted graph with the specified nodes and edges.
+        :param nodes: set of nodes in graph.
+        :param edges: set of edges in graph.
+        :param weights: optional dictionary mapping (start_id, end_id) to the
+        weight of the edge.
+        :return: a graph_types.WeightedGraphType instance.
+        """
+        raise NotImplementedError('create_graph not implemented')
+
+
 class BuilderType(object):
     """Interface for a graph builder."""
 
@@ -120,16 +264,35 @@ class BuilderType(object):
         """
         raise NotImplementedError('node not implemented.')
 
-    def edge(self, start_node_id, end_node_id):
+    def edge(self, start_node_id, end_node_id, weight=None):
         """Returns edge connecting start_node_id to end_node_id.
 
         If no such instance exists, constructs one before returning.
         :param start_node_id: id of starting node of edge.
         :param end_node_id: id of ending node of edge.
+        :param weight: optional weight of the edge. Weights are passed to the
+        factory's create_graph, so they require a factory that supports them
+        (e.g. weighted_graph.Factory()).
         :return: edge associated with start_node_id, end_node_id.
         """
         raise NotImplementedError('node not implemented.')
 
+    def add_nodes(self, node_ids):
+        """Adds a node for each of the specified ids.
+
+        :param node_ids: iterable of node ids.
+        """
+        for node_id in node_ids:
+            self.node(node_id)
+
+    def add_edges(self, edge_pairs):
+        """Adds an edge for each of the specified (start, end) id pairs.
+
+        :param edge_pairs: iterable of (start_node_id, end_node_id) pairs.
+        """
+        for start_node_id, end_node_id in edge_pairs:
+            self.edge(start_node_id, end_node_id)
+
     def build(self):
         """Construct the graph and return constructed graph."""
         raise NotImplementedError('not not implemented.')
@@ -1,3 +1,4 @@
+import graph_cache
 import graph_types
 import unittest
 
@@ -105,6 +106,74 @@ class GraphTypesTest(unittest.TestCase):
 
         # Test out of order
         self.assertEqual(graph_3, graph_4)
+        self.assertFalse(graph_3 != graph_4)
+        self.assertTrue(graph_2 != graph_3)
+        self.assertNotEqual(graph_1, None)
+
+    def test_GraphType_digest(self):
+        def make_graph(node_ids, edge_ids):
+            return TestGraph([TestNode(i) for i in node_ids],
+                             [TestEdge([TestNode(i), TestNode(j)])
+                              for i, j in edge_ids])
+
+        graph_1 = make_graph([1, 2, 3], [[1, 2], [2, 1], [2, 3]])
+        graph_2 = make_graph([3, 2, 1], [[2, 3], [1, 2], [2, 1]])
+        graph_3 = make_graph([1, 2, 3], [[1, 2], [2, 1], [3, 2]])
+        graph_4 = make_graph([1, 2, 3], [[1, 2], [2, 1]])
+
+        self.assertEqual(graph_1.digest(), graph_2.digest())
+        self.assertEqual(hash(graph_1), hash(graph_2))
+        self.assertNotEqual(graph_1.digest(), graph_3.digest())
+        self.assertNotEqual(graph_1.digest(), graph_4.digest())
+        self.assertEqual(graph_1.digest(), graph_1.digest())
+
+        # Graphs can be deduplicated through dictionaries and sets.
+        self.assertEqual(3, len(set([graph_1, graph_2, graph_3, graph_4])))
+        counts = {}
+        for g in [graph_1, graph_2, graph_3]:
+            counts[g] = counts.get(g, 0) + 1
+        self.assertEqual(2, counts[graph_2])
+
+        # Digests are stored on each graph, not in the shared graph_cache.
+        graph_cache.clear()
+        graphs = [make_graph([i], []) for i in range(200)]
+        digests = [g.digest() for g in graphs]
+        self.assertEqual(0, len(graph_cache._cache))
+        self.assertEqual(digests, [g._digest[1] for g in graphs])
+
+    def test_GraphType_eq_iterators(self):
+        class IteratorGraph(graph_types.GraphType):
+            def __init__(self, node_ids, edge_ids):
+                self._node_ids = node_ids
+                self._edge_ids = edge_ids
+
+            def nodes(self):
+                return (TestNode(i) for i in self._node_ids)
+
+            def edges(self):
+                return iter([TestEdge([TestNode(i), TestNode(j)])
+                             for i, j in self._edge_ids])
+
+        graph_1 = IteratorGraph([1, 2, 3], [[1, 2], [2, 3]])
+        graph_2 = TestGraph([TestNode(i) for i in [3, 2, 1]],
+                            [TestEdge([TestNode(2), TestNode(3)]),
+                             TestEdge([TestNode(1), TestNode(2)])])
+        self.assertEqual(graph_1, graph_2)
+        self.assertEqual(graph_2, graph_1)
+        self.assertNotEqual(graph_1, IteratorGraph([1, 2, 3], [[1, 2]]))
+        self.assertEqual(2, len(set([graph_1, graph_2,
+                                     IteratorGraph([1], [])])))
+
+    def test_GraphType_eq_short_circuit(self):
+        class UnsortableNode(TestNode):
+            def __lt__(self, other):
+                raise AssertionError('Full comparison not expected.')
+
+        graph_1 = TestGraph([UnsortableNode(1), UnsortableNode(2)], [])
+        graph_2 = TestGraph([UnsortableNode(1), UnsortableNode(3)], [])
+        graph_3 = TestGraph([UnsortableNode(1)], [])
+        self.assertFalse(graph_1 == graph_2)
+        self.assertFalse(graph_1 == graph_3)
 
 
 if __name__ == '__main__':
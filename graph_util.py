@@ -1,30 +1,131 @@
-def adjacency_matrix(graph, order=None):
+import heapq
+
+import graph_cache
+import graph_stats
+import graph_types
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Instrumentation. graph_stats.enable() or a `with collect_stats():` block
+# turns on collection of the counters and timings returned by stats().
+stats = graph_stats.stats
+reset_stats = graph_stats.reset
+collect_stats = graph_stats.collect
+
+
+@graph_stats.timed('graph_util.adjacency_matrix')
+def adjacency_matrix(graph, order=None, format='list'):
     """Construct an adjacency matrix from a given graph.
 
     :param graph: a graph_types.GraphType to construct adjacency matrix from.
     :param order: array of node ids containing order of adjacency matrix. If
     None, the order is constructed by sorting graph.nodes().
-    :return: an array of arrays containing 0's and 1's where a[i][j] is 1 if
-    an edge exists from node i to node j. Each row and column corresponds
-    to a node where the nodes are sorted by node id in ascending order.
+    :param format: optional argument (default 'list') selecting the
+    representation of the result:
+      'list': an array of arrays containing 0's and 1's where a[i][j] is 1 if
+        an edge exists from node i to node j.
+      'numpy': a dense numpy.ndarray of dtype uint8 with the same contents.
+      'csr': a scipy-style (data, indices, indptr) triple of lists.
+      'coo': a scipy-style (data, row, col) triple of lists.
+      'bits': a list of ints where bit j of a[i] is set if an edge exists
+        from node i to node j.
+    Each row and column corresponds to a node where the nodes are sorted by
+    node id in ascending order.
+    :return: the adjacency matrix in the requested format.
     """
-    if order is None:
-        order = [n.id() for n in sorted(graph.nodes())]
-
-        # Initialize result adjacency matrix.
-    result = [[0]*len(order) for _ in xrange(len(order))]
-    index_map = {node_id: index
-                 for index, node_id in enumerate(order)}
+    if format not in _MATRIX_FORMATS:
+        raise ValueError('Unknown adjacency matrix format: %s' % format)
 
+    if order is None:
+        order = _sorted_ids(graph)
+        index_map = _sorted_index_map(graph)
+    else:
+        index_map = {node_id: index
+                     for index, node_id in enumerate(order)}
+    return _MATRIX_FORMATS[format](_edge_indices(graph, index_map),
+                                   len(order))
+
+
+def _sorted_ids(graph):
+    """Returns the cached list of node ids of graph in ascending order."""
+    return graph_cache.get(
+        graph, 'sorted_ids',
+        lambda: [n.id() for n in sorted(graph.nodes())])
+
+
+def _sorted_index_map(graph):
+    """Returns the cached mapping of node id to its index in _sorted_ids."""
+    return graph_cache.get(
+        graph, 'sorted_index_map',
+        lambda: {node_id: index
+                 for index, node_id in enumerate(_sorted_ids(graph))})
+
+
+def _edge_indices(graph, index_map):
+    """Yields the (row, column) index pair of every edge in graph."""
+    if graph_stats.enabled:
+        graph_stats.count('edges_scanned', len(graph.edges()))
     for e in graph.edges():
         nodes = e.nodes()
-        i = index_map[nodes[0].id()]
-        j = index_map[nodes[-1].id()]
+        yield index_map[nodes[0].id()], index_map[nodes[-1].id()]
+
+
+def _list_matrix(edge_indices, size):
+    result = [[0]*size for _ in range(size)]
+    for i, j in edge_indices:
         result[i][j] = 1
+    return result
+
+
+def _numpy_matrix(edge_indices, size):
+    if numpy is None:
+        raise ImportError('numpy is required for the numpy matrix format.')
+
+    result = numpy.zeros((size, size), dtype=numpy.uint8)
+    pairs = list(edge_indices)
+    if pairs:
+        rows, cols = zip(*pairs)
+        result[list(rows), list(cols)] = 1
+    return result
+
+
+def _coo_matrix(edge_indices, size):
+    pairs = sorted(set(edge_indices))
+    return ([1]*len(pairs),
+            [i for i, _ in pairs],
+            [j for _, j in pairs])
+
 
+def _csr_matrix(edge_indices, size):
+    data, rows, indices = _coo_matrix(edge_indices, size)
+    indptr = [0]*(size + 1)
+    for i in rows:
+        indptr[i + 1] += 1
+    for i in range(size):
+        indptr[i + 1] += indptr[i]
+    return data, indices, indptr
+
+
+def _bits_matrix(edge_indices, size):
+    result = [0]*size
+    for i, j in edge_indices:
+        result[i] |= 1 << j
     return result
 
 
+_MATRIX_FORMATS = {
+    'list': _list_matrix,
+    'numpy': _numpy_matrix,
+    'csr': _csr_matrix,
+    'coo': _coo_matrix,
+    'bits': _bits_matrix,
+}
+
+
+@graph_stats.timed('graph_util.parents')
 def parents(graph, node_id):
     """Returns the parents of the node in the graph.
 
@@ -32,6 +133,14 @@ def parents(graph, node_id):
     :param node_id: id value of the node to get parents of.
     :return: an array of ids corresponding to the parents of the node.
     """
+    if isinstance(graph, graph_types.IndexedGraphType):
+        result = graph.parent_ids(node_id)
+        if graph_stats.enabled:
+            graph_stats.count('edges_scanned', len(result))
+        return result
+
+    if graph_stats.enabled:
+        graph_stats.count('edges_scanned', len(graph.edges()))
     result = set()
     for e in graph.edges():
         nodes = e.nodes()
@@ -40,6 +149,7 @@ def parents(graph, node_id):
     return list(result)
 
 
+@graph_stats.timed('graph_util.children')
 def children(graph, node_id):
     """Returns the children of the node in the graph.
 
@@ -47,6 +157,14 @@ def children(graph, node_id):
     :param node_id: id of the node to get children of.
     :return: an array of ids corresponding to the children of the node.
     """
+    if isinstance(graph, graph_types.IndexedGraphType):
+        result = graph.child_ids(node_id)
+        if graph_stats.enabled:
+            graph_stats.count('edges_scanned', len(result))
+        return result
+
+    if graph_stats.enabled:
+        graph_stats.count('edges_scanned', len(graph.edges()))
     result = set()
     for e in graph.edges():
         nodes = e.nodes()
@@ -55,6 +173,7 @@ def children(graph, node_id):
     return list(result)
 
 
+@graph_stats.timed('graph_util.markov_blanket')
 def markov_blanket(graph, node_id):
     """Returns the Markov blanket of a node.
 
@@ -86,6 +205,172 @@ def markov_blanket(graph, node_id):
     return list(results)
 
 
+@graph_stats.timed('graph_util.markov_blankets')
+def markov_blankets(graph, node_ids=None, bitsets=False, order=None):
+    """Returns the Markov blankets of many nodes at once.
+
+    Parent and child indexes are built once, so the blankets of all nodes are
+    computed in a single pass over the graph instead of one edge scan per
+    markov_blanket call.
+
+    :param graph: a graph_types.GraphType to fetch the markov blankets from.
+    :param node_ids: optional iterable of node ids to get Markov blankets of.
+    If None, the blankets of all nodes in the graph are returned.
+    :param bitsets: optional argument (default False). If True, each blanket
+    is returned as an int where bit i is set if order[i] is in the blanket.
+    :param order: array of node ids assigning bit positions when bitsets is
+    True. If None, the order is constructed by sorting graph.nodes().
+    :return: a dictionary mapping each node id to its Markov blanket, as a
+    list of node ids (same contents as markov_blanket) or as a bitset.
+    """
+    if node_ids is None:
+        node_ids = [n.id() for n in graph.nodes()]
+    if graph_stats.enabled:
+        graph_stats.count('nodes_visited', len(node_ids))
+    child_map = _neighbor_map(graph, True)
+    parent_map = _parent_map(graph)
+
+    if bitsets:
+        return _markov_blanket_bitsets(node_ids, child_map, parent_map,
+                                       order or _sorted_ids(graph))
+
+    result = {}
+    for node_id in node_ids:
+        child_ids = child_map.get(node_id, ())
+        blanket = set(child_ids)
+        blanket.update(parent_map.get(node_id, ()))
+        for c in child_ids:
+            if c != node_id:
+                blanket.update(parent_map[c])
+        blanket.discard(node_id)
+        result[node_id] = list(blanket)
+    return result
+
+
+def _markov_blanket_bitsets(node_ids, child_map, parent_map, order):
+    """markov_blankets with each blanket encoded as a bitset over order."""
+    bit = {node_id: 1 << index for index, node_id in enumerate(order)}
+
+    def bits_of(ids):
+        value = 0
+        for i in ids:
+            value |= bit[i]
+        return value
+
+    parent_bits = {node_id: bits_of(ids)
+                   for node_id, ids in parent_map.items()}
+    result = {}
+    for node_id in node_ids:
+        child_ids = child_map.get(node_id, ())
+        blanket = bits_of(child_ids) | parent_bits.get(node_id, 0)
+        for c in child_ids:
+            blanket |= parent_bits[c]
+        result[node_id] = blanket & ~bit[node_id]
+    return result
+
+
+@graph_stats.timed('graph_util.d_separated')
+def d_separated(graph, xs, ys, given=()):
+    """Returns True if two sets of nodes are d-separated given a third.
+
+    In a Bayesian network, d-separated sets of variables are conditionally
+    independent given the evidence. Uses the Bayes-ball reachability
+    algorithm, which runs in O(N+E) instead of enumerating paths.
+
+    :param graph: a graph_types.GraphType representing a directed acyclic
+    graph.
+    :param xs: iterable of node ids.
+    :param ys: iterable of node ids.
+    :param given: optional iterable of the node ids of the evidence.
+    :return: True if every path between a node in xs and a node in ys is
+    blocked by the evidence.
+    """
+    return d_separated_queries(graph, [(xs, ys)], given)[0]
+
+
+@graph_stats.timed('graph_util.d_separated_queries')
+def d_separated_queries(graph, queries, given=()):
+    """Answers many d-separation queries that share one evidence set.
+
+    The parent and child indexes and the ancestors of the evidence are built
+    once, and the nodes d-connected to each node in an xs set are computed
+    once and reused by every query containing it.
+
+    :param graph: a graph_types.GraphType representing a directed acyclic
+    graph.
+    :param queries: iterable of (xs, ys) pairs of iterables of node ids.
+    :param given: optional iterable of the node ids of the evidence.
+    :return: a list with d_separated(graph, xs, ys, given) for each query.
+    """
+    child_map = _neighbor_map(graph, True)
+    parent_map = _parent_map(graph)
+    given = set(given)
+
+    # The evidence and its ancestors. A path through a collider is active
+    # only if the collider is in this set.
+    evidence_ancestors = set(given)
+    stack = list(given)
+    while stack:
+        for parent_id in parent_map.get(stack.pop(), ()):
+            if parent_id not in evidence_ancestors:
+                evidence_ancestors.add(parent_id)
+                stack.append(parent_id)
+
+    connected = {}
+    result = []
+    for xs, ys in queries:
+        ys = set(ys)
+        separated = True
+        for x in xs:
+            if x not in connected:
+                connected[x] = _d_connected(x, child_map, parent_map, given,
+                                            evidence_ancestors)
+            if not ys.isdisjoint(connected[x]):
+                separated = False
+                break
+        result.append(separated)
+    return result
+
+
+def _d_connected(start_id, child_map, parent_map, given, evidence_ancestors):
+    """Returns the ids of the unobserved nodes d-connected to start_id.
+
+    Traverses (node, direction) states, where the direction records whether
+    the node was entered from a child or from a parent, so each state is
+    visited once.
+    """
+    result = set()
+    visited = set()
+    stack = [(start_id, True)]
+    while stack:
+        state = stack.pop()
+        if state in visited:
+            continue
+        visited.add(state)
+        node_id, from_child = state
+        observed = node_id in given
+        if not observed:
+            result.add(node_id)
+
+        if from_child:
+            # An unobserved node passes the ball to its parents and children.
+            if not observed:
+                stack.extend((p, True) for p in parent_map.get(node_id, ()))
+                stack.extend((c, False) for c in child_map.get(node_id, ()))
+        else:
+            # Chains continue through unobserved nodes. Colliders bounce the
+            # ball back up if they or one of their descendants is observed.
+            if not observed:
+                stack.extend((c, False) for c in child_map.get(node_id, ()))
+            if node_id in evidence_ancestors:
+                stack.extend((p, True) for p in parent_map.get(node_id, ()))
+
+    if graph_stats.enabled:
+        graph_stats.count('nodes_visited', len(visited))
+    return result
+
+
+@graph_stats.timed('graph_util.neighbor_map')
 def neighbor_map(graph, directed=True):
     """Construct and return dictionary mapping nodes to a list of its neighbors.
 
@@ -94,6 +379,36 @@ def neighbor_map(graph, directed=True):
     edges should be treated as directed or bi-directional.
     :return: a dictionary mapping a node id to a list of neighboring node ids.
     """
+    return {node_id: list(neighbors) for node_id, neighbors
+            in _neighbor_map(graph, directed).items()}
+
+
+def _neighbor_map(graph, directed):
+    """Returns the cached neighbor_map of graph (read-only)."""
+    return graph_cache.get(graph, ('neighbor_map', directed),
+                           lambda: _build_neighbor_map(graph, directed))
+
+
+def _parent_map(graph):
+    """Returns the cached map of node id to its parent ids (read-only)."""
+    return graph_cache.get(graph, 'parent_map',
+                           lambda: _build_parent_map(graph))
+
+
+def _build_parent_map(graph):
+    result = {}
+    for from_id, to_ids in _neighbor_map(graph, True).items():
+        for to_id in to_ids:
+            result.setdefault(to_id, []).append(from_id)
+    return result
+
+
+def _build_neighbor_map(graph, directed):
+    if isinstance(graph, graph_types.IndexedGraphType):
+        return _indexed_neighbor_map(graph, directed)
+
+    if graph_stats.enabled:
+        graph_stats.count('edges_scanned', len(graph.edges()))
     result = {}
     for e in graph.edges():
         nodes = e.nodes()
@@ -112,9 +427,136 @@ def neighbor_map(graph, directed=True):
     return result
 
 
+def _indexed_neighbor_map(graph, directed):
+    """neighbor_map for a graph_types.IndexedGraphType in O(N+E)."""
+    if graph_stats.enabled:
+        graph_stats.count('edges_scanned', len(graph.edges()))
+    result = {}
+    for n in graph.nodes():
+        node_id = n.id()
+        neighbors = graph.child_ids(node_id)
+        if not directed:
+            neighbors.extend(p for p in graph.parent_ids(node_id)
+                             if p != node_id)
+        if neighbors:
+            result[node_id] = neighbors
+    return result
+
+
+def neighbor_function(graph, directed=True, reverse=False):
+    """Returns a function mapping a node id to a sequence of neighbor ids.
+
+    Unlike neighbor_map, nothing is copied. Indexed graphs are expanded one
+    node at a time through their adjacency indexes. Other graphs have no
+    per-node index, so they are expanded through a neighbor map cached in
+    graph_cache, and the returned sequences must not be modified.
+    :param graph: a graph_types.GraphType to fetch neighbors from.
+    :param directed: optional argument (default True) that specifies whether
+    edges should be treated as directed or bi-directional.
+    :param reverse: optional argument (default False). If True and directed
+    is True, the function returns the parents of a node instead of its
+    children.
+    :return: a function taking a node id and returning its neighbor ids.
+    """
+    if isinstance(graph, graph_types.IndexedGraphType):
+        if not directed:
+            return lambda node_id: (
+                graph.child_ids(node_id) +
+                [p for p in graph.parent_ids(node_id) if p != node_id])
+        return graph.parent_ids if reverse else graph.child_ids
+
+    if directed and reverse:
+        neighbors = _parent_map(graph)
+    else:
+        neighbors = _neighbor_map(graph, directed)
+    return lambda node_id: neighbors.get(node_id, ())
+
+
+def bfs(graph, start_id, directed=True, max_depth=None, predicate=None):
+    """Yields the ids of the nodes reachable from start_id, breadth first.
+
+    Neighbors of a node are looked up only when the iteration reaches it, so
+    stopping the iteration early skips the rest of the graph.
+
+    :param graph: a graph_types.GraphType to traverse.
+    :param start_id: id of the node to start from. It is always yielded first.
+    :param directed: optional argument (default True) that specifies whether
+    edges should be treated as directed or bi-directional.
+    :param max_depth: optional maximum number of edges between start_id and a
+    yielded node. If None, the depth is not limited.
+    :param predicate: optional function taking a node id. Nodes for which it
+    returns False are neither yielded nor expanded.
+    :return: a generator of node ids.
+    """
+    neighbors_of = neighbor_function(graph, directed)
+    visited = set([start_id])
+    frontier = [start_id]
+    depth = 0
+    yield start_id
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_frontier = []
+        for node_id in frontier:
+            for neighbor_id in neighbors_of(node_id):
+                if neighbor_id in visited:
+                    continue
+                visited.add(neighbor_id)
+                if predicate is not None and not predicate(neighbor_id):
+                    continue
+                next_frontier.append(neighbor_id)
+                yield neighbor_id
+        frontier = next_frontier
+
+
+def dfs(graph, start_id, directed=True, max_depth=None, predicate=None):
+    """Yields the ids of the nodes reachable from start_id, depth first.
+
+    Nodes are yielded in preorder without recursion. Neighbors of a node are
+    looked up only when the iteration reaches it, so stopping the iteration
+    early skips the rest of the graph.
+
+    :param graph: a graph_types.GraphType to traverse.
+    :param start_id: id of the node to start from. It is always yielded first.
+    :param directed: optional argument (default True) that specifies whether
+    edges should be treated as directed or bi-directional.
+    :param max_depth: optional maximum depth of a yielded node in the
+    depth-first search tree. If None, the depth is not limited.
+    :param predicate: optional function taking a node id. Nodes for which it
+    returns False are neither yielded nor expanded.
+    :return: a generator of node ids.
+    """
+    neighbors_of = neighbor_function(graph, directed)
+    visited = set([start_id])
+    yield start_id
+    if max_depth is not None and max_depth < 1:
+        return
+
+    # stack[i] iterates over the neighbors of the node at depth i.
+    stack = [iter(neighbors_of(start_id))]
+    while stack:
+        for neighbor_id in stack[-1]:
+            if neighbor_id in visited:
+                continue
+            visited.add(neighbor_id)
+            if predicate is not None and not predicate(neighbor_id):
+                continue
+            yield neighbor_id
+            if max_depth is None or len(stack) < max_depth:
+                stack.append(iter(neighbors_of(neighbor_id)))
+            break
+        else:
+            stack.pop()
+
+
+@graph_stats.timed('graph_util.is_connected')
 def is_connected(graph, start_id, end_id, directed=True):
     """Returns True if a path exists between the start and end node ids.
 
+    Searches forward from start_id and backward from end_id at the same time,
+    always expanding the smaller frontier, and stops as soon as the two
+    searches meet. A path must have at least one edge, so a node is connected
+    to itself only if it is on a cycle.
+
     :param graph: a graph_types.GraphType containing information about the
     graph.
     :param start_id: starting node id.
@@ -124,20 +566,380 @@ def is_connected(graph, start_id, end_id, directed=True):
 
     :return: True if a path exists between start_id and end_id in the graph.
     """
-    neighbors = neighbor_map(graph, directed=directed)
-    id_queue = [start_id]
-    visited = {}
-    while id_queue:
-        node_id = id_queue.pop()
-        if node_id in visited:
+    forward_of = neighbor_function(graph, directed)
+    backward_of = neighbor_function(graph, directed, reverse=True)
+
+    # Nodes reachable from start_id by at least one edge, and nodes from
+    # which end_id is reachable.
+    forward = set(forward_of(start_id))
+    backward = set([end_id])
+    forward_frontier = list(forward)
+    backward_frontier = [end_id]
+    found = end_id in forward
+    while not found and forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, found = _expand_frontier(
+                forward_frontier, forward_of, forward, backward)
+        else:
+            backward_frontier, found = _expand_frontier(
+                backward_frontier, backward_of, backward, forward)
+
+    if graph_stats.enabled:
+        graph_stats.count('nodes_visited', len(forward) + len(backward))
+    return found
+
+
+def _expand_frontier(frontier, neighbors_of, visited, targets):
+    """Expands a search frontier by one level.
+
+    :return: a (next frontier, found) pair where found is True if a node in
+    targets was reached.
+    """
+    next_frontier = []
+    for node_id in frontier:
+        for neighbor_id in neighbors_of(node_id):
+            if neighbor_id in visited:
+                continue
+            if neighbor_id in targets:
+                return next_frontier, True
+            visited.add(neighbor_id)
+            next_frontier.append(neighbor_id)
+    return next_frontier, False
+
+
+@graph_stats.timed('graph_util.shortest_paths')
+def shortest_paths(graph, sources, previous=False):
+    """Returns the length of the shortest path from a set of nodes to others.
+
+    Edge weights of a graph_types.WeightedGraphType are summed with
+    Dijkstra's algorithm over a binary heap. Other graphs are unweighted, so
+    a breadth-first search counts the edges instead.
+
+    :param graph: a graph_types.GraphType to search.
+    :param sources: iterable of the ids of the nodes to start from. The
+    length of a path to a node is measured from the closest source.
+    :param previous: optional argument (default False). If True, a map of
+    each reached node to the node before it on a shortest path is also
+    returned. Sources are not in the map.
+    :return: a dictionary mapping the id of each node reachable from a source
+    to the length of its shortest path. Sources map to 0. If previous is
+    True, a (lengths, previous map) pair.
+    :raises ValueError: if a reachable edge has a negative weight.
+    """
+    if isinstance(graph, graph_types.WeightedGraphType):
+        lengths, previous_map = _dijkstra(graph, sources)
+    else:
+        lengths, previous_map = _bfs_lengths(graph, sources)
+
+    if graph_stats.enabled:
+        graph_stats.count('nodes_visited', len(lengths))
+    if previous:
+        return lengths, previous_map
+    return lengths
+
+
+def _dijkstra(graph, sources):
+    lengths = {}
+    previous_map = {}
+    heap = []
+    for source_id in sources:
+        lengths[source_id] = 0
+        heap.append((0, source_id))
+    heapq.heapify(heap)
+
+    done = set()
+    while heap:
+        length, node_id = heapq.heappop(heap)
+        if node_id in done:
             continue
-        visited[node_id] = True
+        done.add(node_id)
+        for child_id, weight in graph.weighted_child_ids(node_id):
+            if weight < 0:
+                raise ValueError('Edge %s->%s has negative weight %s.' % (
+                    node_id, child_id, weight))
+            child_length = length + weight
+            if child_length < lengths.get(child_id, child_length + 1):
+                lengths[child_id] = child_length
+                previous_map[child_id] = node_id
+                heapq.heappush(heap, (child_length, child_id))
+    return lengths, previous_map
+
+
+def _bfs_lengths(graph, sources):
+    neighbors_of = neighbor_function(graph, True)
+    lengths = {}
+    previous_map = {}
+    frontier = []
+    for source_id in sources:
+        if source_id not in lengths:
+            lengths[source_id] = 0
+            frontier.append(source_id)
+
+    length = 0
+    while frontier:
+        length += 1
+        next_frontier = []
+        for node_id in frontier:
+            for neighbor_id in neighbors_of(node_id):
+                if neighbor_id not in lengths:
+                    lengths[neighbor_id] = length
+                    previous_map[neighbor_id] = node_id
+                    next_frontier.append(neighbor_id)
+        frontier = next_frontier
+    return lengths, previous_map
+
+
+@graph_stats.timed('graph_util.connected_components')
+def connected_components(graph, directed=False):
+    """Labels each node with the id of its connected component.
+
+    :param graph: a graph_types.GraphType to find the components of.
+    :param directed: optional argument (default False) that specifies whether
+    edges should be treated as directed. If True, the strongly connected
+    components are returned (see strongly_connected_components). Otherwise
+    the components ignoring edge direction are found with union-find.
+    :return: a dictionary mapping each node id to a component id. Component
+    ids are consecutive integers starting at 0.
+    """
+    if directed:
+        return strongly_connected_components(graph)
+
+    # Union-find with union by size and path halving.
+    parent = {}
+    size = {}
+    for n in graph.nodes():
+        parent[n.id()] = n.id()
+        size[n.id()] = 1
+
+    def find(node_id):
+        while parent[node_id] != node_id:
+            parent[node_id] = parent[parent[node_id]]
+            node_id = parent[node_id]
+        return node_id
+
+    for from_id, to_ids in _neighbor_map(graph, True).items():
+        for to_id in to_ids:
+            a = find(from_id)
+            b = find(to_id)
+            if a == b:
+                continue
+            if size[a] < size[b]:
+                a, b = b, a
+            parent[b] = a
+            size[a] += size[b]
+
+    if graph_stats.enabled:
+        graph_stats.count('nodes_visited', len(parent))
+    root_labels = {}
+    result = {}
+    for node_id in parent:
+        root = find(node_id)
+        if root not in root_labels:
+            root_labels[root] = len(root_labels)
+        result[node_id] = root_labels[root]
+    return result
 
-        if node_id not in neighbors:
+
+@graph_stats.timed('graph_util.strongly_connected_components')
+def strongly_connected_components(graph):
+    """Labels each node with the id of its strongly connected component.
+
+    Two nodes are in the same strongly connected component if each is
+    reachable from the other. Runs in O(N+E) without recursion.
+
+    :param graph: a graph_types.GraphType to find the components of.
+    :return: a dictionary mapping each node id to a component id. Component
+    ids are consecutive integers starting at 0, in reverse topological order:
+    every edge between two components goes from a higher id to a lower one.
+    """
+    components = _strongly_connected_components(
+        [n.id() for n in graph.nodes()], _neighbor_map(graph, True))
+    result = {}
+    for component_id, members in enumerate(components):
+        for node_id in members:
+            result[node_id] = component_id
+    return result
+
+
+def _strongly_connected_components(node_ids, neighbors):
+    """Returns the strongly connected components of a graph.
+
+    Uses an iterative version of Tarjan's algorithm so deep graphs do not hit
+    the recursion limit.
+
+    :param node_ids: iterable of the node ids of the graph.
+    :param neighbors: a neighbor_map of the graph.
+    :return: a list of components, each a list of node ids. Components are
+    listed in reverse topological order: no component has an edge to a
+    component listed after it.
+    """
+    if graph_stats.enabled:
+        graph_stats.count('nodes_visited', len(node_ids))
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    result = []
+
+    for root_id in node_ids:
+        if root_id in index:
             continue
 
-        if end_id in neighbors[node_id]:
-            return True
-        id_queue.extend(neighbors[node_id])
+        index[root_id] = lowlink[root_id] = len(index)
+        stack.append(root_id)
+        on_stack.add(root_id)
+        work = [(root_id, iter(neighbors.get(root_id, ())))]
+        while work:
+            node_id, neighbor_iter = work[-1]
+            for neighbor_id in neighbor_iter:
+                if neighbor_id not in index:
+                    index[neighbor_id] = lowlink[neighbor_id] = len(index)
+                    stack.append(neighbor_id)
+                    on_stack.add(neighbor_id)
+                    work.append(
+                        (neighbor_id, iter(neighbors.get(neighbor_id, ()))))
+                    break
+                if neighbor_id in on_stack:
+                    lowlink[node_id] = min(lowlink[node_id],
+                                           index[neighbor_id])
+            else:
+                work.pop()
+                if work:
+                    parent_id = work[-1][0]
+                    lowlink[parent_id] = min(lowlink[parent_id],
+                                             lowlink[node_id])
+                if lowlink[node_id] == index[node_id]:
+                    component = []
+                    while True:
+                        member_id = stack.pop()
+                        on_stack.discard(member_id)
+                        component.append(member_id)
+                        if member_id == node_id:
+                            break
+                    result.append(component)
+    return result
+
+
+def _components(graph):
+    """Returns the cached _strongly_connected_components of graph."""
+    return graph_cache.get(
+        graph, 'components',
+        lambda: _strongly_connected_components([n.id() for n in graph.nodes()],
+                                               _neighbor_map(graph, True)))
+
+
+@graph_stats.timed('graph_util.topological_sort')
+def topological_sort(graph):
+    """Returns the node ids of a directed acyclic graph in topological order.
+
+    :param graph: a graph_types.GraphType without cycles.
+    :return: a list of node ids where every edge goes from an earlier node to
+    a later node.
+    :raises ValueError: if the graph has a cycle.
+    """
+    neighbors = _neighbor_map(graph, True)
+    result = []
+    for members in reversed(_components(graph)):
+        node_id = members[0]
+        if len(members) > 1 or node_id in neighbors.get(node_id, ()):
+            raise ValueError('Graph has a cycle through %s.' % node_id)
+        result.append(node_id)
+    return result
+
+
+@graph_stats.timed('graph_util.ancestors')
+def ancestors(graph, node_id):
+    """Returns the ids of the nodes from which a node is reachable.
 
-    return False
\ No newline at end of file
+    The ancestors of every node are computed together on the first call
+    and cached as bitsets, so later calls on the same graph decode a bitset
+    instead of traversing the graph.
+
+    :param graph: a graph_types.GraphType the node is in.
+    :param node_id: id of the node to get ancestors of.
+    :return: a list of node ids in ascending order, excluding node_id.
+    """
+    return _closure_ids(graph, node_id, True)
+
+
+@graph_stats.timed('graph_util.descendants')
+def descendants(graph, node_id):
+    """Returns the ids of the nodes reachable from a node.
+
+    The descendants of every node are computed together on the first call
+    and cached as bitsets, so later calls on the same graph decode a bitset
+    instead of traversing the graph.
+
+    :param graph: a graph_types.GraphType the node is in.
+    :param node_id: id of the node to get descendants of.
+    :return: a list of node ids in ascending order, excluding node_id.
+    """
+    return _closure_ids(graph, node_id, False)
+
+
+def _closure_ids(graph, node_id, reverse):
+    key = 'ancestor_bits' if reverse else 'descendant_bits'
+    closure = graph_cache.get(graph, key,
+                              lambda: _build_closure(graph, reverse))
+    bits = closure.get(node_id, 0)
+    if bits:
+        bits &= ~(1 << _sorted_index_map(graph)[node_id])
+    return _bits_to_ids(bits, _sorted_ids(graph))
+
+
+def _build_closure(graph, reverse):
+    """Returns a map of node id to the bitset of the nodes it reaches.
+
+    Bit i corresponds to the i-th node of _sorted_ids(graph). Strongly
+    connected components are labeled in topological order of the edges
+    followed, so the bitsets of the components an edge leads to are complete
+    before they are merged. Members of a component share one bitset.
+
+    :param reverse: if True, edges are followed backwards and the bitsets
+    hold ancestors instead of descendants.
+    """
+    components = _components(graph)
+    if reverse:
+        neighbors = _parent_map(graph)
+        components = reversed(components)
+    else:
+        neighbors = _neighbor_map(graph, True)
+    bit = {node_id: 1 << index
+           for node_id, index in _sorted_index_map(graph).items()}
+
+    result = {}
+    for members in components:
+        reach = 0
+        for member_id in members:
+            for neighbor_id in neighbors.get(member_id, ()):
+                reach |= bit[neighbor_id] | result.get(neighbor_id, 0)
+        if len(members) > 1:
+            for member_id in members:
+                reach |= bit[member_id]
+        for member_id in members:
+            result[member_id] = reach
+    return result
+
+
+def _bits_to_ids(bits, ids):
+    """Returns the ids[i] for every bit i set in bits, in order of i."""
+    return [ids[i] for i in set_bits(bits)]
+
+
+def set_bits(bits):
+    """Returns the positions of the set bits of a bitset in ascending order.
+
+    Decodes the rows of adjacency_matrix(format='bits') and the bitsets of
+    markov_blankets. The bits are scanned as one binary string, which is
+    faster in Python than isolating the set bits one at a time with integer
+    operations, since each of those copies the whole bitset.
+    :param bits: a non-negative int.
+    :return: a list of the indexes i for which bit i of bits is set.
+    """
+    binary = bin(bits)[:1:-1]
+    result = []
+    index = binary.find('1')
+    while index >= 0:
+        result.append(index)
+        index = binary.find('1', index + 1)
+    return result
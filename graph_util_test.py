@@ -1,7 +1,11 @@
 import basic_graph
 import graph
+import graph_cache
 import graph_util
+import indexed_graph
+import random
 import unittest
+import weighted_graph
 
 
 class GraphUtilTest(unittest.TestCase):
@@ -45,6 +49,40 @@ class GraphUtilTest(unittest.TestCase):
         ]
         self.assertEqual(expected_adj, adj)
 
+    def test_adjacency_matrix_formats(self):
+        factory = basic_graph.Factory()
+        g = graph.from_string(factory, 'A->B->C->A, A->C, D')
+
+        data, indices, indptr = graph_util.adjacency_matrix(g, format='csr')
+        self.assertEqual([1, 1, 1, 1], data)
+        self.assertEqual([1, 2, 2, 0], indices)
+        self.assertEqual([0, 2, 3, 4, 4], indptr)
+
+        data, row, col = graph_util.adjacency_matrix(g, format='coo')
+        self.assertEqual([1, 1, 1, 1], data)
+        self.assertEqual([0, 0, 1, 2], row)
+        self.assertEqual([1, 2, 2, 0], col)
+
+        self.assertEqual([0b110, 0b100, 0b001, 0],
+                         graph_util.adjacency_matrix(g, format='bits'))
+
+        order = ['D', 'C', 'B', 'A']
+        self.assertEqual([0, 0b1000, 0b0010, 0b0110],
+                         graph_util.adjacency_matrix(g, order=order,
+                                                     format='bits'))
+        self.assertRaises(ValueError, graph_util.adjacency_matrix, g,
+                          format='unknown')
+
+    @unittest.skipIf(graph_util.numpy is None, 'numpy is not installed.')
+    def test_adjacency_matrix_numpy(self):
+        factory = basic_graph.Factory()
+        g = graph.from_string(factory, 'A->B->C->A, A->C, D')
+        order = ['D', 'C', 'B', 'A']
+        adj = graph_util.adjacency_matrix(g, order=order, format='numpy')
+        self.assertEqual((4, 4), adj.shape)
+        self.assertEqual(graph_util.adjacency_matrix(g, order=order),
+                         adj.tolist())
+
     def test_parents(self):
         factory = basic_graph.Factory()
         g = graph.from_string(factory, 'A->A, B->B, C->C, E->E, A->E, F')
@@ -69,6 +107,90 @@ class GraphUtilTest(unittest.TestCase):
         self.assertEqual(['x1', 'x2', 'x3', 'x5', 'x6', 'x7'],
                          sorted(graph_util.markov_blanket(g, 'x4')))
 
+    def test_markov_blankets(self):
+        factory = basic_graph.Factory()
+        specs = ['A->A, B->B, C->C, E->E, A->E, F->E',
+                 'x1->x8, x1->x4, x2->x4, x3->x4, x4->x5, x4->x6, x7->x6']
+        for spec in specs:
+            g = graph.from_string(factory, spec)
+            node_ids = [n.id() for n in g.nodes()]
+            blankets = graph_util.markov_blankets(g)
+            self.assertEqual(sorted(node_ids), sorted(blankets))
+            for node_id in node_ids:
+                self.assertEqual(
+                    sorted(graph_util.markov_blanket(g, node_id)),
+                    sorted(blankets[node_id]))
+
+        blankets = graph_util.markov_blankets(g, ['x4', 'x8'])
+        self.assertEqual(['x4', 'x8'], sorted(blankets))
+        self.assertEqual(['x1'], blankets['x8'])
+
+        # Bit i corresponds to x(i + 1).
+        blankets = graph_util.markov_blankets(g, ['x4', 'x8'], bitsets=True)
+        self.assertEqual({'x4': 0b1110111, 'x8': 0b1}, blankets)
+
+        order = ['x8', 'x7', 'x6', 'x5', 'x4', 'x3', 'x2', 'x1']
+        blankets = graph_util.markov_blankets(g, ['x4'], bitsets=True,
+                                              order=order)
+        self.assertEqual({'x4': 0b11101110}, blankets)
+
+    def test_d_separated(self):
+        factory = basic_graph.Factory()
+        # Chain, fork and collider.
+        g = graph.from_string(factory, 'A->B->C, D->E, D->F, G->H, I->H->J')
+        self.assertFalse(graph_util.d_separated(g, ['A'], ['C']))
+        self.assertTrue(graph_util.d_separated(g, ['A'], ['C'], ['B']))
+        self.assertFalse(graph_util.d_separated(g, ['E'], ['F']))
+        self.assertTrue(graph_util.d_separated(g, ['E'], ['F'], ['D']))
+        self.assertTrue(graph_util.d_separated(g, ['G'], ['I']))
+        self.assertFalse(graph_util.d_separated(g, ['G'], ['I'], ['H']))
+        self.assertFalse(graph_util.d_separated(g, ['G'], ['I'], ['J']))
+        self.assertTrue(graph_util.d_separated(g, ['A', 'E'], ['G']))
+        self.assertFalse(graph_util.d_separated(g, ['A', 'E'], ['G', 'C']))
+
+        self.assertEqual(
+            [True, False, True, True],
+            graph_util.d_separated_queries(
+                g, [(['A'], ['C']), (['G'], ['I']), (['E'], ['F']),
+                    (['A'], ['J'])], ['B', 'D', 'J']))
+
+    def assert_d_separation_matches_moral_graph(self, g, xs, ys, given):
+        """Checks d_separated against the moralized ancestral graph test."""
+        relevant = set(xs) | set(ys) | set(given)
+        for node_id in list(relevant):
+            relevant.update(graph_util.ancestors(g, node_id))
+        moral = {node_id: set() for node_id in relevant}
+        for node_id in relevant:
+            parent_ids = graph_util.parents(g, node_id)
+            for p in parent_ids:
+                moral[p].add(node_id)
+                moral[node_id].add(p)
+                for q in parent_ids:
+                    if p != q:
+                        moral[p].add(q)
+        reached = set(x for x in xs if x not in given)
+        stack = list(reached)
+        while stack:
+            for neighbor_id in moral[stack.pop()]:
+                if neighbor_id not in reached and neighbor_id not in given:
+                    reached.add(neighbor_id)
+                    stack.append(neighbor_id)
+        self.assertEqual(reached.isdisjoint(ys),
+                         graph_util.d_separated(g, xs, ys, given),
+                         msg='%s, %s given %s' % (xs, ys, given))
+
+    def test_d_separated_random(self):
+        rng = random.Random(1)
+        builder = graph.Builder(basic_graph.Factory())
+        builder.add_nodes(range(12))
+        builder.add_edges((i, j) for i in range(12) for j in range(i + 1, 12)
+                          if rng.random() < 0.2)
+        g = builder.build()
+        for _ in range(200):
+            nodes = rng.sample(range(12), 5)
+            self.assert_d_separation_matches_moral_graph(
+                g, nodes[:1], nodes[1:2], nodes[2:2 + rng.randrange(4)])
+
     def test_neighbor_map(self):
         factory = basic_graph.Factory()
         g = graph.from_string(factory, 'A->A, B->B, C->C, E->E, A->E, F->E')
@@ -91,6 +213,26 @@ class GraphUtilTest(unittest.TestCase):
         self.assert_maps_equal(expected_map, graph_util.neighbor_map(
             g, directed=False))
 
+    def test_neighbor_function(self):
+        spec = 'A->A, B->B, C->C, E->E, A->E, F->E'
+        for factory in [basic_graph.Factory(), indexed_graph.Factory()]:
+            g = graph.from_string(factory, spec)
+            for directed in [True, False]:
+                neighbors_of = graph_util.neighbor_function(g, directed)
+                expected = graph_util.neighbor_map(g, directed=directed)
+                self.assert_maps_equal(
+                    expected, {node_id: list(neighbors_of(node_id))
+                               for node_id in expected})
+            parents_of = graph_util.neighbor_function(g, reverse=True)
+            self.assertEqual(['A', 'E', 'F'], sorted(parents_of('E')))
+            self.assertEqual([], list(parents_of('F')))
+
+    def test_set_bits(self):
+        self.assertEqual([], graph_util.set_bits(0))
+        self.assertEqual([0, 2, 3], graph_util.set_bits(13))
+        self.assertEqual([5, 70, 4000], graph_util.set_bits(
+            (1 << 4000) | (1 << 70) | (1 << 5)))
+
     def test_is_connected(self):
         factory = basic_graph.Factory()
         g = graph.from_string(factory, 'A->A, B->E, C->C, E->E, E->C, F->E')
@@ -106,6 +248,234 @@ class GraphUtilTest(unittest.TestCase):
         self.assertFalse(graph_util.is_connected(g, 'C', 'B'))
         self.assertTrue(graph_util.is_connected(g, 'C', 'B', directed=False))
 
+    def test_is_connected_bidirectional(self):
+        for factory in [basic_graph.Factory(), indexed_graph.Factory()]:
+            g = graph.from_string(factory, 'A->B->C->D->E, F->D, E->B, G')
+            self.assertTrue(graph_util.is_connected(g, 'A', 'E'))
+            self.assertTrue(graph_util.is_connected(g, 'F', 'C'))
+            self.assertTrue(graph_util.is_connected(g, 'D', 'D'))
+            self.assertFalse(graph_util.is_connected(g, 'A', 'A'))
+            self.assertFalse(graph_util.is_connected(g, 'E', 'F'))
+            self.assertFalse(graph_util.is_connected(g, 'G', 'G'))
+            self.assertFalse(graph_util.is_connected(g, 'A', 'missing'))
+            self.assertTrue(graph_util.is_connected(g, 'E', 'F',
+                                                    directed=False))
+            self.assertTrue(graph_util.is_connected(g, 'A', 'A',
+                                                    directed=False))
+            self.assertFalse(graph_util.is_connected(g, 'G', 'A',
+                                                     directed=False))
+
+    def test_bfs(self):
+        for factory in [basic_graph.Factory(), indexed_graph.Factory()]:
+            g = graph.from_string(factory, 'A->B->D->E, A->C->D, C->F, G->A')
+            order = list(graph_util.bfs(g, 'A'))
+            self.assertEqual('A', order[0])
+            self.assertEqual(['B', 'C'], sorted(order[1:3]))
+            self.assertEqual(['D', 'F'], sorted(order[3:5]))
+            self.assertEqual(['E'], order[5:])
+
+            self.assertEqual(['A', 'B', 'C'],
+                             sorted(graph_util.bfs(g, 'A', max_depth=1)))
+            self.assertEqual(['A'], list(graph_util.bfs(g, 'A', max_depth=0)))
+            self.assertEqual(['A', 'B', 'D', 'E'], sorted(graph_util.bfs(
+                g, 'A', predicate=lambda node_id: node_id != 'C')))
+            self.assertEqual(['D', 'E'], sorted(graph_util.bfs(g, 'D')))
+            self.assertEqual(['A', 'B', 'C', 'D', 'E', 'F'], sorted(
+                graph_util.bfs(g, 'D', directed=False, max_depth=2)))
+
+    def test_dfs(self):
+        for factory in [basic_graph.Factory(), indexed_graph.Factory()]:
+            g = graph.from_string(factory, 'A->B->C->D, B->E, A->F')
+            order = list(graph_util.dfs(g, 'A'))
+            self.assertEqual(['A', 'B', 'C', 'D', 'E', 'F'], sorted(order))
+            self.assertEqual('A', order[0])
+            # Each subtree is finished before its sibling starts.
+            position = {node_id: i for i, node_id in enumerate(order)}
+            if position['B'] < position['F']:
+                self.assertTrue(position['D'] < position['F'])
+                self.assertTrue(position['E'] < position['F'])
+            else:
+                self.assertTrue(position['F'] < position['B'])
+
+            self.assertEqual(['A', 'B', 'C', 'E', 'F'],
+                             sorted(graph_util.dfs(g, 'A', max_depth=2)))
+            self.assertEqual(['A'], list(graph_util.dfs(g, 'A', max_depth=0)))
+            self.assertEqual(['A', 'B', 'E', 'F'], sorted(graph_util.dfs(
+                g, 'A', predicate=lambda node_id: node_id != 'C')))
+            self.assertEqual(['A', 'B', 'C', 'D', 'E', 'F'], sorted(
+                graph_util.dfs(g, 'D', directed=False)))
+
+    def test_traversal_is_lazy(self):
+        builder = graph.Builder(indexed_graph.Factory())
+        builder.add_edges((i, i + 1) for i in range(100000))
+        g = builder.build()
+        nodes = graph_util.dfs(g, 0)
+        self.assertEqual([0, 1, 2], [next(nodes) for _ in range(3)])
+        self.assertTrue(graph_util.is_connected(g, 0, 100000))
+
+    def test_shortest_paths(self):
+        g = graph.from_string(weighted_graph.Factory(),
+                              'A-1->B-2->D, A-4->C-1->D-5->E, F-0->A, G',
+                              weighted=True)
+        self.assertEqual({'A': 0, 'B': 1, 'C': 4, 'D': 3, 'E': 8},
+                         graph_util.shortest_paths(g, ['A']))
+        lengths, previous = graph_util.shortest_paths(g, ['C', 'F'],
+                                                      previous=True)
+        self.assertEqual({'A': 0, 'B': 1, 'C': 0, 'D': 1, 'E': 6, 'F': 0},
+                         lengths)
+        self.assertEqual({'A': 'F', 'B': 'A', 'D': 'C', 'E': 'D'}, previous)
+        self.assertEqual({'G': 0}, graph_util.shortest_paths(g, ['G']))
+        self.assertEqual({}, graph_util.shortest_paths(g, []))
+
+        g = weighted_graph.from_edges([], [('A', 'B', -1)])
+        self.assertRaises(ValueError, graph_util.shortest_paths, g, ['A'])
+
+    def test_shortest_paths_unweighted(self):
+        for factory in [basic_graph.Factory(), indexed_graph.Factory()]:
+            g = graph.from_string(factory, 'A->B->D, A->C->D->E, F->A, G')
+            self.assertEqual({'A': 0, 'B': 1, 'C': 1, 'D': 2, 'E': 3},
+                             graph_util.shortest_paths(g, ['A']))
+            lengths, previous = graph_util.shortest_paths(g, ['D', 'F'],
+                                                          previous=True)
+            self.assertEqual({'A': 1, 'B': 2, 'C': 2, 'D': 0, 'E': 1,
+                              'F': 0}, lengths)
+            self.assertEqual('A', previous['B'])
+            self.assertEqual('D', previous['E'])
+
+    def assert_partition(self, expected_groups, labels):
+        """Asserts labels assigns ids 0..k-1 grouping nodes as expected."""
+        self.assertEqual(sorted(sum(expected_groups, [])), sorted(labels))
+        self.assertEqual(list(range(len(expected_groups))),
+                         sorted(set(labels.values())))
+        for group in expected_groups:
+            self.assertEqual(1, len(set(labels[n] for n in group)),
+                             msg='%s not in one component' % group)
+
+    def test_connected_components(self):
+        factory = basic_graph.Factory()
+        g = graph.from_string(factory, 'A->B, C->B, D->E->D, F->F, G')
+        self.assert_partition([['A', 'B', 'C'], ['D', 'E'], ['F'], ['G']],
+                              graph_util.connected_components(g))
+        self.assert_partition([['A'], ['B'], ['C'], ['D', 'E'], ['F'], ['G']],
+                              graph_util.connected_components(g,
+                                                              directed=True))
+
+    def test_strongly_connected_components(self):
+        factory = basic_graph.Factory()
+        g = graph.from_string(factory,
+                              'A->B->C->A, C->D->E->D, E->F, G, H->G, H->H')
+        labels = graph_util.strongly_connected_components(g)
+        self.assert_partition([['A', 'B', 'C'], ['D', 'E'], ['F'], ['G'],
+                               ['H']], labels)
+
+        # Edges between components go from higher to lower ids.
+        for e in g.edges():
+            from_id, to_id = [n.id() for n in e.nodes()]
+            self.assertTrue(labels[from_id] >= labels[to_id])
+
+    def test_topological_sort(self):
+        factory = basic_graph.Factory()
+        g = graph.from_string(factory, 'D->B->A, D->C->A, E->C, F')
+        order = graph_util.topological_sort(g)
+        self.assertEqual(['A', 'B', 'C', 'D', 'E', 'F'], sorted(order))
+        position = {node_id: i for i, node_id in enumerate(order)}
+        for e in g.edges():
+            from_id, to_id = [n.id() for n in e.nodes()]
+            self.assertTrue(position[from_id] < position[to_id])
+
+        self.assertRaises(ValueError, graph_util.topological_sort,
+                          graph.from_string(factory, 'A->B->C->A'))
+        self.assertRaises(ValueError, graph_util.topological_sort,
+                          graph.from_string(factory, 'A->B->B'))
+
+    def test_ancestors_and_descendants(self):
+        for factory in [basic_graph.Factory(), indexed_graph.Factory()]:
+            g = graph.from_string(factory, 'D->B->A, D->C->A, E->C, F')
+            self.assertEqual(['B', 'C', 'D', 'E'],
+                             graph_util.ancestors(g, 'A'))
+            self.assertEqual(['D', 'E'], graph_util.ancestors(g, 'C'))
+            self.assertEqual([], graph_util.ancestors(g, 'D'))
+            self.assertEqual(['A', 'B', 'C'], graph_util.descendants(g, 'D'))
+            self.assertEqual(['A', 'C'], graph_util.descendants(g, 'E'))
+            self.assertEqual([], graph_util.descendants(g, 'F'))
+            self.assertEqual([], graph_util.descendants(g, 'missing'))
+
+            # Nodes on a cycle reach each other but exclude themselves.
+            g = graph.from_string(factory, 'A->B->C->B, C->D, E->E')
+            self.assertEqual(['B', 'C', 'D'], graph_util.descendants(g, 'A'))
+            self.assertEqual(['C', 'D'], graph_util.descendants(g, 'B'))
+            self.assertEqual(['A', 'B'], graph_util.ancestors(g, 'C'))
+            self.assertEqual([], graph_util.ancestors(g, 'E'))
+
+    def test_closure_matches_traversal(self):
+        builder = graph.Builder(basic_graph.Factory())
+        builder.add_edges((i, (i * 7 + 3) % 50) for i in range(50))
+        builder.add_edges((i, (i * i) % 50) for i in range(0, 50, 3))
+        g = builder.build()
+        for node_id in range(50):
+            self.assertEqual(
+                sorted(set(graph_util.bfs(g, node_id)) - set([node_id])),
+                graph_util.descendants(g, node_id))
+            self.assertEqual(
+                sorted(n for n in range(50)
+                       if n != node_id
+                       and graph_util.is_connected(g, n, node_id)),
+                graph_util.ancestors(g, node_id))
+
+    def test_components_deep_graph(self):
+        builder = graph.Builder(basic_graph.Factory())
+        builder.add_edges((i, i + 1) for i in range(20000))
+        builder.edge(20000, 0)
+        g = builder.build()
+        self.assertEqual(set([0]), set(
+            graph_util.strongly_connected_components(g).values()))
+        self.assertEqual(set([0]), set(
+            graph_util.connected_components(g).values()))
+
+    def test_cached_results(self):
+        factory = basic_graph.Factory()
+        g = graph.from_string(factory, 'A->B, B->C')
+        self.assertEqual(['A', 'B', 'C'], graph_util._sorted_ids(g))
+        self.assertTrue(graph_util._sorted_ids(g) is
+                        graph_util._sorted_ids(g))
+
+        # Callers may modify returned neighbor maps.
+        neighbors = graph_util.neighbor_map(g)
+        neighbors['A'].append('C')
+        neighbors['C'] = ['A']
+        self.assert_maps_equal({'A': ['B'], 'B': ['C']},
+                               graph_util.neighbor_map(g))
+
+        # Mutating a graph requires invalidating its cached structures.
+        g.edges().add(basic_graph.Edge(basic_graph.Node('C'),
+                                       basic_graph.Node('A')))
+        self.assertFalse(graph_util.is_connected(g, 'C', 'B'))
+        graph_cache.invalidate(g)
+        self.assertTrue(graph_util.is_connected(g, 'C', 'B'))
+        self.assert_maps_equal({'A': ['B'], 'B': ['C'], 'C': ['A']},
+                               graph_util.neighbor_map(g))
+
+    def test_indexed_graph(self):
+        specs = ['A->A, B->B, C->C, E->E, A->E, F->E',
+                 'A->B, B->A, B->C, D',
+                 'x1->x8, x1->x4, x2->x4, x3->x4, x4->x5, x4->x6, x7->x6']
+        for spec in specs:
+            g = graph.from_string(basic_graph.Factory(), spec)
+            ig = graph.from_string(indexed_graph.Factory(), spec)
+            for n in g.nodes():
+                node_id = n.id()
+                self.assertEqual(sorted(graph_util.parents(g, node_id)),
+                                 sorted(graph_util.parents(ig, node_id)))
+                self.assertEqual(sorted(graph_util.children(g, node_id)),
+                                 sorted(graph_util.children(ig, node_id)))
+                self.assertEqual(
+                    sorted(graph_util.markov_blanket(g, node_id)),
+                    sorted(graph_util.markov_blanket(ig, node_id)))
+            for directed in [True, False]:
+                self.assert_maps_equal(
+                    graph_util.neighbor_map(g, directed=directed),
+                    graph_util.neighbor_map(ig, directed=directed))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,157 @@
+"""Graph algorithms computed as batched operations on an adjacency matrix.
+
+Every function takes the adjacency matrix of a graph as returned by
+graph_util.adjacency_matrix, in either of two formats:
+  'numpy': a square numpy.ndarray. Results are computed with whole-array
+    operations and matrix products and returned as numpy arrays.
+  'bits': a list of ints where bit j of row i is set if an edge exists from
+    node i to node j. Each row is processed as one integer, so an operation
+    on a row handles all of its columns at once. Results are lists.
+Row and column i of every result correspond to row i of the matrix.
+"""
+import graph_util
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _is_numpy(matrix):
+    return numpy is not None and isinstance(matrix, numpy.ndarray)
+
+
+def _popcount(value):
+    return bin(value).count('1')
+
+
+def degrees(matrix):
+    """Returns the in-degree and out-degree of every node.
+
+    :param matrix: adjacency matrix in 'numpy' or 'bits' format.
+    :return: an (in_degrees, out_degrees) pair of vectors where element i is
+    the number of edges ending or starting at node i.
+    """
+    if _is_numpy(matrix):
+        adjacency = matrix != 0
+        return adjacency.sum(axis=0), adjacency.sum(axis=1)
+
+    in_degrees = [0]*len(matrix)
+    for row in matrix:
+        for j in graph_util.set_bits(row):
+            in_degrees[j] += 1
+    return in_degrees, [_popcount(row) for row in matrix]
+
+
+def _product(left, right):
+    """Returns the boolean product of two matrices in the same format.
+
+    Element (i, j) of the result is set if some k has (i, k) set in left and
+    (k, j) set in right.
+    """
+    if _is_numpy(left):
+        # Products of 0/1 float32 matrices are exact and use BLAS.
+        return numpy.dot(left.astype(numpy.float32),
+                         right.astype(numpy.float32)) > 0
+
+    result = []
+    for row in left:
+        value = 0
+        for k in graph_util.set_bits(row):
+            value |= right[k]
+        result.append(value)
+    return result
+
+
+def _union(left, right):
+    if _is_numpy(left):
+        return left | right
+    return [a | b for a, b in zip(left, right)]
+
+
+def _as_bool(matrix):
+    if _is_numpy(matrix):
+        return matrix != 0
+    return list(matrix)
+
+
+def k_hop_reachability(matrix, k):
+    """Returns which nodes are reachable from each node in at most k edges.
+
+    Uses O(log k) boolean matrix products: the reachability within a + b
+    edges combines the reachability within a and within b edges.
+
+    :param matrix: adjacency matrix in 'numpy' or 'bits' format.
+    :param k: maximum number of edges of a path. Must be at least 1.
+    :return: a matrix in the same format (of dtype bool for 'numpy') where
+    (i, j) is set if a path from node i to node j has between 1 and k edges.
+    """
+    if k < 1:
+        raise ValueError('k must be at least 1: %s' % k)
+
+    power = _as_bool(matrix)
+    result = None
+    while True:
+        if k & 1:
+            if result is None:
+                result = power
+            else:
+                result = _union(_union(result, power),
+                                _product(result, power))
+        k >>= 1
+        if not k:
+            return result
+        power = _union(power, _product(power, power))
+
+
+def transitive_closure(matrix):
+    """Returns which nodes are reachable from each node.
+
+    Squares the reachability matrix until it stops changing, which takes
+    O(log N) boolean matrix products.
+
+    :param matrix: adjacency matrix in 'numpy' or 'bits' format.
+    :return: a matrix in the same format (of dtype bool for 'numpy') where
+    (i, j) is set if a path with at least one edge leads from node i to node
+    j.
+    """
+    result = _as_bool(matrix)
+    while True:
+        squared = _union(result, _product(result, result))
+        if _is_numpy(result):
+            if numpy.array_equal(squared, result):
+                return result
+        elif squared == result:
+            return result
+        result = squared
+
+
+def common_neighbors(matrix, directed=True):
+    """Returns the number of neighbors each pair of nodes has in common.
+
+    :param matrix: adjacency matrix in 'numpy' or 'bits' format.
+    :param directed: optional argument (default True) that specifies whether
+    edges should be treated as directed, in which case the children of the
+    nodes are compared, or as bi-directional.
+    :return: a symmetric matrix of counts (a numpy.ndarray of int64 or a
+    list of lists) where (i, j) is the number of neighbors of both node i and
+    node j. Element (i, i) is the number of neighbors of node i.
+    """
+    if _is_numpy(matrix):
+        adjacency = matrix != 0
+        if not directed:
+            adjacency = adjacency | adjacency.T
+        adjacency = adjacency.astype(numpy.float64)
+        return numpy.rint(numpy.dot(adjacency, adjacency.T)).astype(
+            numpy.int64)
+
+    rows = list(matrix)
+    if not directed:
+        for i, row in enumerate(matrix):
+            for j in graph_util.set_bits(row):
+                rows[j] |= 1 << i
+    result = [[0]*len(rows) for _ in rows]
+    for i, row in enumerate(rows):
+        for j in range(i, len(rows)):
+            result[i][j] = result[j][i] = _popcount(row & rows[j])
+    return result
@@ -0,0 +1,98 @@
+import unittest
+import basic_graph
+import graph
+import graph_generators
+import graph_util
+import graph_vectorized
+
+
+class GraphVectorizedTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = graph_generators.erdos_renyi(basic_graph.Factory(), 40,
+                                                  0.04, seed=3)
+        self.order = graph_util._sorted_ids(self.graph)
+
+    def matrices(self):
+        """Returns the adjacency matrix of self.graph in each format."""
+        result = [graph_util.adjacency_matrix(self.graph, format='bits')]
+        if graph_vectorized.numpy is not None:
+            result.append(graph_util.adjacency_matrix(self.graph,
+                                                      format='numpy'))
+        return result
+
+    def as_sets(self, matrix):
+        """Returns the set of (i, j) pairs set in a reachability matrix."""
+        if isinstance(matrix, list):
+            return set((i, j) for i, row in enumerate(matrix)
+                       for j in range(len(matrix)) if row >> j & 1)
+        return set(zip(*[indices.tolist() for indices in matrix.nonzero()]))
+
+    def test_degrees(self):
+        expected_in = [len(graph_util.parents(self.graph, node_id))
+                       for node_id in self.order]
+        expected_out = [len(graph_util.children(self.graph, node_id))
+                        for node_id in self.order]
+        for matrix in self.matrices():
+            in_degrees, out_degrees = graph_vectorized.degrees(matrix)
+            self.assertEqual(expected_in, list(in_degrees))
+            self.assertEqual(expected_out, list(out_degrees))
+
+    def test_k_hop_reachability(self):
+        index = {node_id: i for i, node_id in enumerate(self.order)}
+        for k in [1, 2, 3, 6, 7]:
+            expected = set()
+            for i, node_id in enumerate(self.order):
+                # Nodes within k edges, plus node_id itself if it is on a
+                # cycle of at most k edges.
+                reached = set(graph_util.bfs(self.graph, node_id,
+                                             max_depth=k))
+                reached.discard(node_id)
+                for p in graph_util.bfs(self.graph, node_id,
+                                        max_depth=k - 1):
+                    if node_id in graph_util.children(self.graph, p):
+                        reached.add(node_id)
+                expected.update((i, index[n]) for n in reached)
+            for matrix in self.matrices():
+                self.assertEqual(expected, self.as_sets(
+                    graph_vectorized.k_hop_reachability(matrix, k)),
+                    msg='k=%d' % k)
+        self.assertRaises(ValueError, graph_vectorized.k_hop_reachability,
+                          self.matrices()[0], 0)
+
+    def test_transitive_closure(self):
+        expected = set()
+        for i, node_id in enumerate(self.order):
+            for j, other_id in enumerate(self.order):
+                if graph_util.is_connected(self.graph, node_id, other_id):
+                    expected.add((i, j))
+        for matrix in self.matrices():
+            self.assertEqual(expected, self.as_sets(
+                graph_vectorized.transitive_closure(matrix)))
+
+    def test_common_neighbors(self):
+        g = graph.from_string(basic_graph.Factory(),
+                              'A->C, A->D, B->C, B->D, B->E, E->A')
+        expected = [[2, 2, 0, 0, 0],
+                    [2, 3, 0, 0, 0],
+                    [0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 1]]
+        undirected = [[3, 3, 0, 0, 0],
+                      [3, 3, 0, 0, 0],
+                      [0, 0, 2, 2, 2],
+                      [0, 0, 2, 2, 2],
+                      [0, 0, 2, 2, 2]]
+        matrices = [graph_util.adjacency_matrix(g, format='bits')]
+        if graph_vectorized.numpy is not None:
+            matrices.append(graph_util.adjacency_matrix(g, format='numpy'))
+        for matrix in matrices:
+            self.assertEqual(expected, [
+                list(row) for row in graph_vectorized.common_neighbors(
+                    matrix)])
+            self.assertEqual(undirected, [
+                list(row) for row in graph_vectorized.common_neighbors(
+                    matrix, directed=False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,242 @@
+"""Defines read-only views that transform a graph without copying it.
+
+A view implements graph_types.IndexedGraphType over the storage of the graph
+it was created from, filtering or flipping nodes and edges as they are read,
+so every graph_util function accepts it. Adjacency is read through the
+indexes of indexed graphs, or through graph_util's cached neighbor maps of
+other graphs. Node and edge objects are created when the view is iterated.
+
+The viewed graph must not change while a view of it is in use.
+"""
+import basic_graph
+import graph_types
+import graph_util
+
+
+class _Collection(object):
+    """Lazy, read-only collection of the nodes or edges of a view."""
+
+    def __init__(self, iterate, contains, size=None):
+        """Construct a collection.
+
+        :param iterate: function with no arguments returning an iterator.
+        :param contains: function returning whether an item is in the view.
+        :param size: optional function with no arguments returning the
+        number of items. If None, the items are counted.
+        """
+        self._iterate = iterate
+        self._contains = contains
+        self._size = size
+
+    def __len__(self):
+        if self._size is not None:
+            return self._size()
+        return sum(1 for _ in self._iterate())
+
+    def __iter__(self):
+        return self._iterate()
+
+    def __contains__(self, item):
+        return self._contains(item)
+
+
+def _reversed_edge(edge):
+    nodes = edge.nodes()
+    return basic_graph.Edge(nodes[-1], nodes[0])
+
+
+class _GraphView(graph_types.IndexedGraphType):
+    """Base class of views reading the adjacency of a graph."""
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._children = None
+        self._parents = None
+        self._num_edges = None
+
+    def _edge_count(self):
+        """Returns the number of edges of the view, counting them once."""
+        if self._num_edges is None:
+            self._num_edges = sum(len(self.child_ids(n.id()))
+                                  for n in self.nodes())
+        return self._num_edges
+
+    def _children_of(self, node_id):
+        """Returns the child ids of node_id in the viewed graph."""
+        if self._children is None:
+            self._children = graph_util.neighbor_function(self._graph, True)
+        return self._children(node_id)
+
+    def _parents_of(self, node_id):
+        """Returns the parent ids of node_id in the viewed graph."""
+        if self._parents is None:
+            self._parents = graph_util.neighbor_function(self._graph, True,
+                                                         reverse=True)
+        return self._parents(node_id)
+
+
+class InducedSubgraph(_GraphView):
+    """View of a set of nodes of a graph and the edges between them."""
+
+    def __init__(self, graph, node_ids):
+        """Construct a view of the subgraph induced by node_ids.
+
+        :param graph: a graph_types.GraphType to view.
+        :param node_ids: iterable of node ids. Ids of nodes that are not in
+        graph are ignored.
+        """
+        _GraphView.__init__(self, graph)
+        graph_nodes = graph.nodes()
+        self._ids = set(node_id for node_id in node_ids
+                        if basic_graph.Node(node_id) in graph_nodes)
+
+    # @Override
+    def nodes(self):
+        return _Collection(
+            lambda: (basic_graph.Node(node_id) for node_id in self._ids),
+            lambda node: node.id() in self._ids,
+            lambda: len(self._ids))
+
+    # @Override
+    def edges(self):
+        return _Collection(self._iterate_edges, self._has_edge,
+                           self._edge_count)
+
+    # @Override
+    def parent_ids(self, node_id):
+        if node_id not in self._ids:
+            return []
+        return [p for p in self._parents_of(node_id) if p in self._ids]
+
+    # @Override
+    def child_ids(self, node_id):
+        if node_id not in self._ids:
+            return []
+        return [c for c in self._children_of(node_id) if c in self._ids]
+
+    def _iterate_edges(self):
+        nodes = {node_id: basic_graph.Node(node_id) for node_id in self._ids}
+        for node_id, node in nodes.items():
+            for child_id in self._children_of(node_id):
+                child = nodes.get(child_id)
+                if child is not None:
+                    yield basic_graph.Edge(node, child)
+
+    def _has_edge(self, edge):
+        nodes = edge.nodes()
+        return (nodes[0].id() in self._ids and nodes[-1].id() in self._ids
+                and edge in self._graph.edges())
+
+
+class ReverseGraph(_GraphView):
+    """View of a graph with the direction of every edge flipped."""
+
+    def __init__(self, graph):
+        """Construct a view of graph with reversed edges.
+
+        :param graph: a graph_types.GraphType to view.
+        """
+        _GraphView.__init__(self, graph)
+
+    # @Override
+    def nodes(self):
+        return self._graph.nodes()
+
+    # @Override
+    def edges(self):
+        edges = self._graph.edges()
+        return _Collection(
+            lambda: (_reversed_edge(e) for e in edges),
+            lambda edge: _reversed_edge(edge) in edges,
+            lambda: len(edges))
+
+    # @Override
+    def parent_ids(self, node_id):
+        return list(self._children_of(node_id))
+
+    # @Override
+    def child_ids(self, node_id):
+        return list(self._parents_of(node_id))
+
+
+class UndirectedGraph(_GraphView):
+    """View of a graph with an edge in each direction for every edge.
+
+    Each edge of the graph is seen together with its reverse. An edge and its
+    reverse are listed once each, even if both are in the graph.
+    """
+
+    def __init__(self, graph):
+        """Construct an undirected view of graph.
+
+        :param graph: a graph_types.GraphType to view.
+        """
+        _GraphView.__init__(self, graph)
+
+    # @Override
+    def nodes(self):
+        return self._graph.nodes()
+
+    # @Override
+    def edges(self):
+        return _Collection(self._iterate_edges, self._has_edge,
+                           self._edge_count)
+
+    # @Override
+    def parent_ids(self, node_id):
+        return self._neighbor_ids(node_id)
+
+    # @Override
+    def child_ids(self, node_id):
+        return self._neighbor_ids(node_id)
+
+    def _neighbor_ids(self, node_id):
+        result = list(self._children_of(node_id))
+        children = set(result)
+        result.extend(p for p in self._parents_of(node_id)
+                      if p not in children)
+        return result
+
+    def _iterate_edges(self):
+        edges = self._graph.edges()
+        for e in edges:
+            yield e
+            nodes = e.nodes()
+            if nodes[0].id() != nodes[-1].id():
+                reverse = _reversed_edge(e)
+                if reverse not in edges:
+                    yield reverse
+
+    def _has_edge(self, edge):
+        edges = self._graph.edges()
+        return edge in edges or _reversed_edge(edge) in edges
+
+
+def induced_subgraph(graph, node_ids):
+    """Returns a view of the subgraph induced by a set of nodes.
+
+    :param graph: a graph_types.GraphType to view.
+    :param node_ids: iterable of the ids of the nodes to keep. Ids of nodes
+    that are not in graph are ignored.
+    :return: an InducedSubgraph with the kept nodes and the edges of graph
+    between them.
+    """
+    return InducedSubgraph(graph, node_ids)
+
+
+def reverse(graph):
+    """Returns a view of a graph with the direction of every edge flipped.
+
+    :param graph: a graph_types.GraphType to view.
+    :return: a ReverseGraph.
+    """
+    return ReverseGraph(graph)
+
+
+def undirected(graph):
+    """Returns a view of a graph that has both directions of every edge.
+
+    :param graph: a graph_types.GraphType to view.
+    :return: an UndirectedGraph.
+    """
+    return UndirectedGraph(graph)
@@ -0,0 +1,120 @@
+import unittest
+import basic_graph
+import csr_graph
+import graph
+import graph_util
+import graph_views
+import indexed_graph
+
+SPEC = 'A->B->C->A, C->D, D->E, E->D, F->F, G, B->F'
+
+FACTORIES = [basic_graph.Factory(), indexed_graph.Factory(),
+             csr_graph.Factory()]
+
+
+def partition(labels):
+    """Returns the groups of node ids with the same label, sorted."""
+    groups = {}
+    for node_id, label in labels.items():
+        groups.setdefault(label, []).append(node_id)
+    return sorted(sorted(group) for group in groups.values())
+
+
+class GraphViewsTest(unittest.TestCase):
+
+    def assert_same_results(self, expected, view):
+        """Checks graph_util gives the same results for view and expected."""
+        self.assertEqual(expected, view)
+        self.assertEqual(view, expected)
+        self.assertEqual(len(expected.edges()), len(view.edges()))
+        self.assertEqual(graph_util.adjacency_matrix(expected),
+                         graph_util.adjacency_matrix(view))
+        node_ids = [n.id() for n in expected.nodes()]
+        for node_id in node_ids:
+            self.assertEqual(sorted(graph_util.parents(expected, node_id)),
+                             sorted(graph_util.parents(view, node_id)))
+            self.assertEqual(sorted(graph_util.children(expected, node_id)),
+                             sorted(graph_util.children(view, node_id)))
+            self.assertEqual(
+                sorted(graph_util.markov_blanket(expected, node_id)),
+                sorted(graph_util.markov_blanket(view, node_id)))
+            self.assertEqual(graph_util.descendants(expected, node_id),
+                             graph_util.descendants(view, node_id))
+            for end_id in node_ids:
+                self.assertEqual(
+                    graph_util.is_connected(expected, node_id, end_id),
+                    graph_util.is_connected(view, node_id, end_id))
+        self.assertEqual(
+            partition(graph_util.strongly_connected_components(expected)),
+            partition(graph_util.strongly_connected_components(view)))
+
+    def test_induced_subgraph(self):
+        for factory in FACTORIES:
+            g = graph.from_string(factory, SPEC)
+            view = graph_views.induced_subgraph(
+                g, ['A', 'B', 'C', 'D', 'E', 'G', 'missing'])
+            expected = graph.from_string(basic_graph.Factory(),
+                                         'A->B->C->A, C->D, D->E, E->D, G')
+            self.assert_same_results(expected, view)
+            self.assertEqual(6, len(view.nodes()))
+            self.assertFalse(basic_graph.Node('F') in view.nodes())
+            self.assertTrue(basic_graph.Node('G') in view.nodes())
+            self.assertFalse(basic_graph.Edge(
+                basic_graph.Node('B'), basic_graph.Node('F')) in view.edges())
+            self.assertTrue(basic_graph.Edge(
+                basic_graph.Node('C'), basic_graph.Node('D')) in view.edges())
+
+            # Views of views.
+            view = graph_views.induced_subgraph(view, ['A', 'B', 'D', 'E',
+                                                       'G'])
+            self.assert_same_results(
+                graph.from_string(basic_graph.Factory(),
+                                  'A->B, D->E, E->D, G'), view)
+
+    def test_reverse(self):
+        expected = graph.from_string(
+            basic_graph.Factory(), 'A->C->B->A, D->C, E->D, D->E, F->F, G, '
+                                   'F->B')
+        for factory in FACTORIES:
+            g = graph.from_string(factory, SPEC)
+            view = graph_views.reverse(g)
+            self.assert_same_results(expected, view)
+            self.assertEqual(g, graph_views.reverse(view))
+            self.assertTrue(basic_graph.Edge(
+                basic_graph.Node('D'), basic_graph.Node('C')) in view.edges())
+            self.assertFalse(basic_graph.Edge(
+                basic_graph.Node('C'), basic_graph.Node('D')) in view.edges())
+
+    def test_undirected(self):
+        expected = graph.from_string(
+            basic_graph.Factory(), 'A->B->C->A, C->D, D->E, E->D, F->F, G, '
+                                   'B->F, A->C->B->A, D->C, F->B')
+        for factory in FACTORIES:
+            g = graph.from_string(factory, SPEC)
+            view = graph_views.undirected(g)
+            self.assert_same_results(expected, view)
+            self.assertEqual(
+                partition(graph_util.connected_components(g)),
+                partition(graph_util.connected_components(view,
+                                                          directed=True)))
+            self.assertEqual(['B', 'C'],
+                             sorted(graph_util.children(view, 'A')))
+            self.assertEqual(['B', 'F'],
+                             sorted(graph_util.children(view, 'F')))
+            self.assertEqual(['A', 'C', 'F'],
+                             sorted(graph_util.children(view, 'B')))
+
+    def test_edge_count(self):
+        g = graph.from_string(csr_graph.Factory(), SPEC)
+        views = [graph_views.induced_subgraph(g, ['A', 'B', 'C', 'F']),
+                 graph_views.undirected(g)]
+        expected = [5, 13]
+        for view, count in zip(views, expected):
+            self.assertEqual(count, len(list(view.edges())))
+            # The count comes from adjacency, not from creating edges.
+            view._iterate_edges = None
+            self.assertEqual(count, len(view.edges()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""Defines a graph that keeps forward and reverse adjacency indexes."""
+import basic_graph
+import graph_types
+
+
+class Graph(basic_graph.Graph, graph_types.IndexedGraphType):
+
+    def __init__(self, nodes, edges):
+        basic_graph.Graph.__init__(self, nodes, edges)
+        self._children = {}
+        self._parents = {}
+        for e in self._edges:
+            nodes = e.nodes()
+            from_id = nodes[0].id()
+            to_id = nodes[-1].id()
+            self._children.setdefault(from_id, []).append(to_id)
+            self._parents.setdefault(to_id, []).append(from_id)
+
+    @classmethod
+    def from_indexes(cls, nodes, edges, children, parents):
+        """Construct a graph from prebuilt structures without copying them.
+
+        The caller must not modify the structures afterwards.
+        :param nodes: set of nodes in graph.
+        :param edges: set of edges in graph.
+        :param children: dictionary mapping node id to a collection of child
+        ids.
+        :param parents: dictionary mapping node id to a collection of parent
+        ids.
+        :return: an indexed_graph.Graph sharing the specified structures.
+        """
+        graph = cls.__new__(cls)
+        graph._nodes = nodes
+        graph._edges = edges
+        graph._children = children
+        graph._parents = parents
+        return graph
+
+    # @Override
+    def parent_ids(self, node_id):
+        return list(self._parents.get(node_id, ()))
+
+    # @Override
+    def child_ids(self, node_id):
+        return list(self._children.get(node_id, ()))
+
+
+class Factory(basic_graph.Factory):
+
+    # @Override
+    def create_graph(self, nodes, edges):
+        return Graph(nodes, edges)
@@ -0,0 +1,44 @@
+import unittest
+import basic_graph
+import graph
+import indexed_graph
+
+
+class IndexedGraphTest(unittest.TestCase):
+    def test_graph(self):
+        factory = indexed_graph.Factory()
+        g = graph.from_string(factory, 'A->B->C, A->C, C->C, D')
+
+        self.assertEqual([], g.parent_ids('A'))
+        self.assertEqual(['A'], g.parent_ids('B'))
+        self.assertEqual(['A', 'B', 'C'], sorted(g.parent_ids('C')))
+        self.assertEqual(['B', 'C'], sorted(g.child_ids('A')))
+        self.assertEqual(['C'], g.child_ids('C'))
+        self.assertEqual([], g.child_ids('D'))
+        self.assertEqual([], g.child_ids('missing'))
+
+        # Returned lists are copies of the index.
+        g.child_ids('C').append('X')
+        self.assertEqual(['C'], g.child_ids('C'))
+
+    def test_factory(self):
+        factory = indexed_graph.Factory()
+        node = factory.create_node(1)
+        edge = factory.create_edge(node, node)
+        g = factory.create_graph([node, node], [edge, edge])
+
+        self.assertIsInstance(node, basic_graph.Node)
+        self.assertIsInstance(edge, basic_graph.Edge)
+        self.assertIsInstance(g, indexed_graph.Graph)
+        self.assertEqual([node], list(g.nodes()))
+        self.assertEqual([edge], list(g.edges()))
+        self.assertEqual([1], g.child_ids(1))
+
+    def test_equals_basic_graph(self):
+        spec = 'x1->x8, x1->x4, x2->x4, x3->x4, x4->x5, x4->x6, x7->x6'
+        self.assertEqual(graph.from_string(basic_graph.Factory(), spec),
+                         graph.from_string(indexed_graph.Factory(), spec))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,266 @@
+"""Defines a graph that can be modified after construction.
+
+A MutableGraph keeps forward and reverse adjacency sets and notifies
+registered views (e.g. a neighbor map or adjacency matrix derived from the
+graph) of every change, so they are updated incrementally instead of being
+recomputed.
+"""
+import basic_graph
+import graph_cache
+import graph_types
+import graph_util
+import indexed_graph
+
+
+class ViewType(object):
+    """Interface for a structure kept up to date by a MutableGraph."""
+
+    def on_add_node(self, node_id):
+        """Called after a node is added to the graph."""
+        pass
+
+    def on_remove_node(self, node_id):
+        """Called after a node (and all of its edges) is removed."""
+        pass
+
+    def on_add_edge(self, start_id, end_id):
+        """Called after an edge is added to the graph."""
+        pass
+
+    def on_remove_edge(self, start_id, end_id):
+        """Called after an edge is removed from the graph."""
+        pass
+
+
+class NeighborMapView(ViewType):
+    """graph_util.neighbor_map of a MutableGraph, updated on every change.
+
+    Additions take O(1); edge removals take O(degree).
+    """
+
+    def __init__(self, graph, directed=True):
+        self._directed = directed
+        self._map = graph_util.neighbor_map(graph, directed=directed)
+
+    def neighbor_map(self):
+        """Returns the neighbor map (read-only)."""
+        return self._map
+
+    # @Override
+    def on_add_edge(self, start_id, end_id):
+        self._map.setdefault(start_id, []).append(end_id)
+        if not self._directed and start_id != end_id:
+            self._map.setdefault(end_id, []).append(start_id)
+
+    # @Override
+    def on_remove_edge(self, start_id, end_id):
+        self._discard(start_id, end_id)
+        if not self._directed and start_id != end_id:
+            self._discard(end_id, start_id)
+
+    def _discard(self, node_id, neighbor_id):
+        neighbors = self._map[node_id]
+        neighbors.remove(neighbor_id)
+        if not neighbors:
+            del self._map[node_id]
+
+
+class AdjacencyMatrixView(ViewType):
+    """graph_util.adjacency_matrix of a MutableGraph, updated on every change.
+
+    Edge changes take O(1). Added nodes are appended to the order and take
+    O(N); removed nodes are dropped from it and take O(N) row operations.
+    """
+
+    def __init__(self, graph, order=None):
+        if order is None:
+            order = [n.id() for n in sorted(graph.nodes())]
+        self._order = list(order)
+        self._index_map = {node_id: index
+                           for index, node_id in enumerate(self._order)}
+        self._matrix = graph_util.adjacency_matrix(graph, order=self._order)
+
+    def adjacency_matrix(self):
+        """Returns the adjacency matrix (read-only)."""
+        return self._matrix
+
+    def order(self):
+        """Returns the node id of each row and column (read-only)."""
+        return self._order
+
+    # @Override
+    def on_add_node(self, node_id):
+        self._index_map[node_id] = len(self._order)
+        self._order.append(node_id)
+        for row in self._matrix:
+            row.append(0)
+        self._matrix.append([0]*len(self._order))
+
+    # @Override
+    def on_remove_node(self, node_id):
+        index = self._index_map.pop(node_id)
+        del self._order[index]
+        del self._matrix[index]
+        for row in self._matrix:
+            del row[index]
+        for i in range(index, len(self._order)):
+            self._index_map[self._order[i]] = i
+
+    # @Override
+    def on_add_edge(self, start_id, end_id):
+        self._matrix[self._index_map[start_id]][self._index_map[end_id]] = 1
+
+    # @Override
+    def on_remove_edge(self, start_id, end_id):
+        self._matrix[self._index_map[start_id]][self._index_map[end_id]] = 0
+
+
+class MutableGraph(graph_types.IndexedGraphType):
+
+    # Graph contents change, so the graph cannot be a dictionary key.
+    __hash__ = None
+
+    def __init__(self, factory=None):
+        """Construct an empty mutable graph.
+
+        :param factory: Factory instance used to create nodes and edges.
+        (default basic_graph.Factory())
+        """
+        self._factory = factory or basic_graph.Factory()
+        self._node_map = {}
+        self._edge_map = {}
+        self._nodes = set()
+        self._edges = set()
+        self._children = {}
+        self._parents = {}
+        self._views = []
+        self._snapshot = None
+
+    # @Override
+    def nodes(self):
+        return self._nodes
+
+    # @Override
+    def edges(self):
+        return self._edges
+
+    # @Override
+    def parent_ids(self, node_id):
+        return list(self._parents.get(node_id, ()))
+
+    # @Override
+    def child_ids(self, node_id):
+        return list(self._children.get(node_id, ()))
+
+    def in_degree(self, node_id):
+        """Returns the number of edges ending at node_id."""
+        return len(self._parents.get(node_id, ()))
+
+    def out_degree(self, node_id):
+        """Returns the number of edges starting at node_id."""
+        return len(self._children.get(node_id, ()))
+
+    def register_view(self, view):
+        """Registers a ViewType to notify of changes and returns it."""
+        self._views.append(view)
+        return view
+
+    def unregister_view(self, view):
+        """Stops notifying a previously registered view of changes."""
+        self._views.remove(view)
+
+    def add_node(self, node_id):
+        """Returns the node with the specified id, adding it if needed."""
+        node = self._node_map.get(node_id)
+        if node is not None:
+            return node
+
+        self._before_change()
+        node = self._factory.create_node(node_id)
+        self._node_map[node_id] = node
+        self._nodes.add(node)
+        self._children[node_id] = set()
+        self._parents[node_id] = set()
+        for view in self._views:
+            view.on_add_node(node_id)
+        return node
+
+    def add_edge(self, start_id, end_id):
+        """Returns the edge from start_id to end_id, adding it if needed.
+
+        Nodes that are not in the graph yet are added.
+        """
+        key = (start_id, end_id)
+        edge = self._edge_map.get(key)
+        if edge is not None:
+            return edge
+
+        start_node = self.add_node(start_id)
+        end_node = self.add_node(end_id)
+        self._before_change()
+        edge = self._factory.create_edge(start_node, end_node)
+        self._edge_map[key] = edge
+        self._edges.add(edge)
+        self._children[start_id].add(end_id)
+        self._parents[end_id].add(start_id)
+        for view in self._views:
+            view.on_add_edge(start_id, end_id)
+        return edge
+
+    def remove_edge(self, start_id, end_id):
+        """Removes the edge from start_id to end_id.
+
+        :raises KeyError: if the graph has no such edge.
+        """
+        key = (start_id, end_id)
+        edge = self._edge_map[key]
+        self._before_change()
+        del self._edge_map[key]
+        self._edges.discard(edge)
+        self._children[start_id].discard(end_id)
+        self._parents[end_id].discard(start_id)
+        for view in self._views:
+            view.on_remove_edge(start_id, end_id)
+
+    def remove_node(self, node_id):
+        """Removes a node and every edge starting or ending at it.
+
+        :raises KeyError: if the graph has no such node.
+        """
+        node = self._node_map[node_id]
+        for child_id in list(self._children[node_id]):
+            self.remove_edge(node_id, child_id)
+        for parent_id in list(self._parents[node_id]):
+            self.remove_edge(parent_id, node_id)
+
+        self._before_change()
+        del self._node_map[node_id]
+        self._nodes.discard(node)
+        del self._children[node_id]
+        del self._parents[node_id]
+        for view in self._views:
+            view.on_remove_node(node_id)
+
+    def freeze(self):
+        """Returns an immutable snapshot of the graph.
+
+        The snapshot shares this graph's storage, so freezing takes O(1).
+        The storage is copied on the next change to this graph instead.
+        :return: an indexed_graph.Graph equal to this graph.
+        """
+        if self._snapshot is None:
+            self._snapshot = indexed_graph.Graph.from_indexes(
+                self._nodes, self._edges, self._children, self._parents)
+        return self._snapshot
+
+    def _before_change(self):
+        graph_cache.invalidate(self)
+        if self._snapshot is None:
+            return
+
+        # Copy the storage shared with the last snapshot.
+        self._snapshot = None
+        self._nodes = set(self._nodes)
+        self._edges = set(self._edges)
+        self._children = {k: set(v) for k, v in self._children.items()}
+        self._parents = {k: set(v) for k, v in self._parents.items()}
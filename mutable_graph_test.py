@@ -0,0 +1,103 @@
+import unittest
+import basic_graph
+import graph
+import graph_util
+import indexed_graph
+import mutable_graph
+
+
+class MutableGraphTest(unittest.TestCase):
+    def assert_same_graph(self, spec, g):
+        expected = graph.from_string(basic_graph.Factory(), spec)
+        self.assertEqual(expected, g)
+        for n in expected.nodes():
+            self.assertEqual(sorted(graph_util.parents(expected, n.id())),
+                             sorted(g.parent_ids(n.id())))
+            self.assertEqual(sorted(graph_util.children(expected, n.id())),
+                             sorted(g.child_ids(n.id())))
+
+    def test_add_remove(self):
+        g = mutable_graph.MutableGraph()
+        g.add_edge('A', 'B')
+        g.add_edge('B', 'C')
+        g.add_edge('A', 'C')
+        g.add_node('D')
+        self.assertTrue(g.add_edge('A', 'B') is g.add_edge('A', 'B'))
+        self.assert_same_graph('A->B->C, A->C, D', g)
+        self.assertEqual(2, g.out_degree('A'))
+        self.assertEqual(2, g.in_degree('C'))
+        self.assertEqual(0, g.in_degree('missing'))
+
+        g.remove_edge('A', 'C')
+        self.assert_same_graph('A->B->C, D', g)
+        self.assertRaises(KeyError, g.remove_edge, 'A', 'C')
+
+        g.remove_node('B')
+        self.assert_same_graph('A, C, D', g)
+        self.assertRaises(KeyError, g.remove_node, 'B')
+        self.assertEqual(0, g.out_degree('A'))
+
+    def test_cached_results_invalidated(self):
+        g = mutable_graph.MutableGraph()
+        g.add_edge('A', 'B')
+        self.assertFalse(graph_util.is_connected(g, 'A', 'C'))
+        digest = g.digest()
+        g.add_edge('B', 'C')
+        self.assertTrue(graph_util.is_connected(g, 'A', 'C'))
+        self.assertNotEqual(digest, g.digest())
+        self.assertRaises(TypeError, hash, g)
+
+    def test_freeze(self):
+        g = mutable_graph.MutableGraph()
+        g.add_edge('A', 'B')
+        snapshot = g.freeze()
+        self.assertIsInstance(snapshot, indexed_graph.Graph)
+        self.assertTrue(snapshot is g.freeze())
+        self.assert_same_graph('A->B', snapshot)
+
+        g.add_edge('B', 'C')
+        g.remove_edge('A', 'B')
+        self.assert_same_graph('A->B', snapshot)
+        self.assert_same_graph('A, B->C', g)
+        self.assert_same_graph('A, B->C', g.freeze())
+
+    def test_views(self):
+        g = mutable_graph.MutableGraph()
+        g.add_edge('A', 'B')
+        g.add_edge('B', 'A')
+        views = [
+            g.register_view(mutable_graph.NeighborMapView(g)),
+            g.register_view(mutable_graph.NeighborMapView(g, directed=False)),
+        ]
+        matrix = g.register_view(mutable_graph.AdjacencyMatrixView(g))
+
+        def check():
+            for view, directed in zip(views, [True, False]):
+                expected = graph_util.neighbor_map(g, directed=directed)
+                actual = view.neighbor_map()
+                self.assertEqual(sorted(expected), sorted(actual))
+                for node_id in expected:
+                    self.assertEqual(sorted(expected[node_id]),
+                                     sorted(actual[node_id]))
+            self.assertEqual(
+                graph_util.adjacency_matrix(g, order=matrix.order()),
+                matrix.adjacency_matrix())
+
+        check()
+        g.add_edge('C', 'C')
+        check()
+        g.add_edge('B', 'C')
+        check()
+        g.remove_edge('A', 'B')
+        check()
+        g.remove_node('B')
+        check()
+        self.assertEqual(['A', 'C'], matrix.order())
+
+        g.unregister_view(matrix)
+        g.add_node('D')
+        self.assertEqual(['A', 'C'], matrix.order())
+
+
+if __name__ == '__main__':
+    unittest.main()
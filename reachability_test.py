@@ -0,0 +1,131 @@
+import unittest
+import basic_graph
+import csr_graph
+import graph
+import graph_generators
+import graph_util
+import reachability
+
+
+class ReachabilityIndexTest(unittest.TestCase):
+    def assert_matches_is_connected(self, g, directed):
+        index = reachability.ReachabilityIndex(g, directed=directed)
+        node_ids = [n.id() for n in g.nodes()] + ['missing']
+        for start_id in node_ids:
+            for end_id in node_ids:
+                self.assertEqual(
+                    graph_util.is_connected(g, start_id, end_id,
+                                            directed=directed),
+                    index.is_connected(start_id, end_id),
+                    msg='%s -> %s (directed=%s)' % (start_id, end_id,
+                                                    directed))
+
+    def test_is_connected(self):
+        factory = basic_graph.Factory()
+        g = graph.from_string(factory, 'A->A, B->E, C->C, E->E, E->C, F->E')
+        index = reachability.ReachabilityIndex(g)
+        self.assertTrue(index.is_connected('A', 'A'))
+        self.assertTrue(index.is_connected('B', 'C'))
+        self.assertFalse(index.is_connected('B', 'B'))
+        self.assertFalse(index.is_connected('C', 'B'))
+        self.assertFalse(index.is_connected('A', 'missing'))
+
+        index = reachability.ReachabilityIndex(g, directed=False)
+        self.assertTrue(index.is_connected('C', 'B'))
+        self.assertFalse(index.is_connected('A', 'B'))
+
+    def test_matches_is_connected(self):
+        factory = basic_graph.Factory()
+        specs = ['A->A, B->E, C->C, E->E, E->C, F->E',
+                 'A->B->C->A, C->D->E->D, E->F, G, H->G',
+                 'x1->x8, x1->x4, x2->x4, x3->x4, x4->x5, x4->x6, x7->x6']
+        for spec in specs:
+            g = graph.from_string(factory, spec)
+            self.assert_matches_is_connected(g, directed=True)
+            self.assert_matches_is_connected(g, directed=False)
+
+    def test_deep_graph(self):
+        factory = basic_graph.Factory()
+        builder = graph.Builder(factory)
+        for i in range(5000):
+            builder.edge(i, i + 1)
+        index = reachability.ReachabilityIndex(builder.build())
+        self.assertTrue(index.is_connected(0, 5000))
+        self.assertFalse(index.is_connected(5000, 0))
+
+
+class ApproxReachCountsTest(unittest.TestCase):
+    def mean_error(self, g, counts, reverse=False):
+        """Mean relative error of counts of nodes reaching 50+ nodes."""
+        closure = graph_util.ancestors if reverse else graph_util.descendants
+        errors = []
+        for n in g.nodes():
+            exact = len(closure(g, n.id()))
+            if exact >= 50:
+                errors.append(abs(counts[n.id()] - exact) / float(exact))
+        self.assertTrue(errors)
+        return sum(errors) / len(errors)
+
+    def test_small_graphs(self):
+        factory = basic_graph.Factory()
+        specs = ['A->A, B->E, C->C, E->E, E->C, F->E',
+                 'A->B->C->A, C->D->E->D, E->F, G, H->G',
+                 'x1->x8, x1->x4, x2->x4, x3->x4, x4->x5, x4->x6, x7->x6']
+        for spec in specs:
+            g = graph.from_string(factory, spec)
+            for reverse in [False, True]:
+                closure = (graph_util.ancestors if reverse
+                           else graph_util.descendants)
+                counts = reachability.approx_reach_counts(
+                    g, precision=16, reverse=reverse)
+                self.assertEqual(len(g.nodes()), len(counts))
+                for n in g.nodes():
+                    # Registers of two nodes collide with low probability.
+                    self.assertTrue(
+                        abs(len(closure(g, n.id())) - counts[n.id()]) <= 1)
+
+    def test_accuracy(self):
+        g = graph_generators.random_dag(csr_graph.Factory(), 2000, 6000,
+                                        seed=1)
+        errors = {}
+        for precision in [6, 10, 14]:
+            errors[precision] = self.mean_error(
+                g, reachability.approx_reach_counts(g, precision=precision))
+        # The standard error of precision 10 is about 3%.
+        self.assertTrue(errors[10] < 0.06, msg=errors)
+        self.assertTrue(errors[14] < errors[6], msg=errors)
+        self.assertTrue(self.mean_error(
+            g, reachability.approx_reach_counts(g, reverse=True),
+            reverse=True) < 0.06)
+
+    @unittest.skipIf(reachability.numpy is None, 'numpy is not installed')
+    def test_without_numpy(self):
+        g = graph_generators.power_law(basic_graph.Factory(), 1000, 2,
+                                       seed=2)
+        expected = reachability.approx_reach_counts(g)
+        numpy = reachability.numpy
+        reachability.numpy = None
+        try:
+            counts = reachability.approx_reach_counts(g)
+        finally:
+            reachability.numpy = numpy
+        for node_id, count in expected.items():
+            self.assertTrue(abs(count - counts[node_id]) <= 1)
+
+    def test_deep_graph(self):
+        g = graph_generators.chain(csr_graph.Factory(), 5000)
+        counts = reachability.approx_reach_counts(g)
+        self.assertEqual(0, counts['n4999'])
+        self.assertTrue(abs(counts['n0'] - 4999) < 4999 * 0.1)
+        self.assertTrue(self.mean_error(g, counts) < 0.06)
+
+    def test_invalid_precision(self):
+        g = graph.from_string(basic_graph.Factory(), 'A->B')
+        self.assertRaises(ValueError, reachability.approx_reach_counts, g,
+                          precision=3)
+        self.assertRaises(ValueError, reachability.approx_reach_counts, g,
+                          precision=17)
+
+
+if __name__ == '__main__':
+    unittest.main()
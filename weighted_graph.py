@@ -0,0 +1,195 @@
+"""Defines a compressed sparse row graph with a numeric weight on each edge.
+
+Weights are stored in arrays of doubles parallel to the targets and sources
+arrays of csr_graph.Graph rather than on edge objects. Edges materialized by
+iterating edges() carry their weight. As with other graph_types.GraphType
+implementations, weights do not take part in graph equality.
+"""
+import array
+import basic_graph
+import csr_graph
+import graph_types
+
+# Typecode of the weight arrays (64-bit float).
+WEIGHT_TYPECODE = 'd'
+
+# Weight of edges created without one.
+DEFAULT_WEIGHT = 1.0
+
+
+class Edge(basic_graph.Edge):
+    """Edge carrying the weight it has in a weighted graph."""
+
+    def __init__(self, start_node, end_node, weight=DEFAULT_WEIGHT):
+        basic_graph.Edge.__init__(self, start_node, end_node)
+        self._weight = weight
+
+    def weight(self):
+        """Returns the weight of the edge."""
+        return self._weight
+
+
+class _EdgeView(csr_graph._EdgeView):
+    """Lazy collection of the edges of a weighted_graph.Graph."""
+
+    # @Override
+    def __iter__(self):
+        ids = self._graph.ids()
+        offsets, targets = self._graph.csr()
+        weights = self._graph.weights()
+        nodes = {}
+        for i in range(len(ids)):
+            start, end = offsets[i], offsets[i + 1]
+            if start == end:
+                continue
+            start_node = basic_graph.Node(ids[i])
+            for k in range(start, end):
+                j = targets[k]
+                end_node = nodes.get(j)
+                if end_node is None:
+                    end_node = basic_graph.Node(ids[j])
+                    nodes[j] = end_node
+                yield Edge(start_node, end_node, weights[k])
+
+
+class Graph(csr_graph.Graph, graph_types.WeightedGraphType):
+
+    def __init__(self, ids, offsets, targets, weights, reverse_offsets,
+                 sources, reverse_weights):
+        """Construct a graph from interned ids and weighted CSR arrays.
+
+        :param ids: sequence mapping node index to node id, sorted ascending.
+        :param offsets: len(ids) + 1 row offsets into targets.
+        :param targets: end node index of each edge, grouped by start node.
+        :param weights: weight of each edge, parallel to targets.
+        :param reverse_offsets: len(ids) + 1 row offsets into sources.
+        :param sources: start node index of each edge, grouped by end node.
+        :param reverse_weights: weight of each edge, parallel to sources.
+        """
+        csr_graph.Graph.__init__(self, ids, offsets, targets,
+                                 reverse_offsets, sources)
+        self._weights = weights
+        self._reverse_weights = reverse_weights
+
+    # @Override
+    def edges(self):
+        return _EdgeView(self)
+
+    # @Override
+    def weight(self, start_id, end_id):
+        i = self.index(start_id)
+        j = self.index(end_id)
+        if i >= 0 and j >= 0:
+            start, end = self._offsets[i], self._offsets[i + 1]
+            for k in range(start, end):
+                if self._targets[k] == j:
+                    return self._weights[k]
+        raise KeyError((start_id, end_id))
+
+    # @Override
+    def weighted_child_ids(self, node_id):
+        i = self.index(node_id)
+        if i < 0:
+            return []
+        start, end = self._offsets[i], self._offsets[i + 1]
+        return [(self._ids[j], w) for j, w in zip(self._targets[start:end],
+                                                  self._weights[start:end])]
+
+    # @Override
+    def weighted_parent_ids(self, node_id):
+        i = self.index(node_id)
+        if i < 0:
+            return []
+        start, end = self._reverse_offsets[i], self._reverse_offsets[i + 1]
+        return [(self._ids[j], w)
+                for j, w in zip(self._sources[start:end],
+                                self._reverse_weights[start:end])]
+
+    def child_weights(self, i):
+        """Returns the weights of the edges from the node at index i.
+
+        The weights are parallel to child_indices(i).
+        """
+        if i < 0:
+            return ()
+        return self._weights[self._offsets[i]:self._offsets[i + 1]]
+
+    def parent_weights(self, i):
+        """Returns the weights of the edges into the node at index i.
+
+        The weights are parallel to parent_indices(i).
+        """
+        if i < 0:
+            return ()
+        return self._reverse_weights[self._reverse_offsets[i]:
+                                     self._reverse_offsets[i + 1]]
+
+    def weights(self):
+        """Returns the weights array, parallel to the targets of csr()."""
+        return self._weights
+
+    def reverse_weights(self):
+        """Returns the weights array, parallel to reverse_csr() sources."""
+        return self._reverse_weights
+
+
+def from_edges(node_ids, weighted_edges):
+    """Construct a weighted_graph.Graph from node ids and weighted edges.
+
+    :param node_ids: iterable of node ids. Nodes of weighted_edges are added.
+    :param weighted_edges: iterable of (start_id, end_id, weight) triples. If
+    an edge is listed more than once, its last weight is used.
+    :return: a weighted_graph.Graph.
+    """
+    edge_weights = {}
+    for start_id, end_id, weight in weighted_edges:
+        edge_weights[(start_id, end_id)] = weight
+    ids = set(node_ids)
+    for start_id, end_id in edge_weights:
+        ids.add(start_id)
+        ids.add(end_id)
+    ids = sorted(ids)
+
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    encoded = sorted((index[s], index[e], w)
+                     for (s, e), w in edge_weights.items())
+    offsets, targets = csr_graph._compress(
+        len(ids), ((i, j) for i, j, _ in encoded))
+    weights = array.array(WEIGHT_TYPECODE, [w for _, _, w in encoded])
+    encoded.sort(key=lambda triple: (triple[1], triple[0]))
+    reverse_offsets, sources = csr_graph._compress(
+        len(ids), ((j, i) for i, j, _ in encoded))
+    reverse_weights = array.array(WEIGHT_TYPECODE,
+                                  [w for _, _, w in encoded])
+
+    g = Graph(ids, offsets, targets, weights, reverse_offsets, sources,
+              reverse_weights)
+    g._index = index
+    return g
+
+
+class Factory(basic_graph.Factory, graph_types.WeightedFactoryType):
+
+    # @Override
+    def create_graph(self, nodes, edges, weights=None):
+        """Create a weighted graph with the specified nodes and edges.
+
+        :param nodes: set of nodes in graph.
+        :param edges: set of edges in graph.
+        :param weights: optional dictionary mapping (start_id, end_id) to the
+        weight of the edge. Edges not in it keep the weight they carry, or
+        get DEFAULT_WEIGHT.
+        :return: a weighted_graph.Graph.
+        """
+        weights = weights or {}
+        weighted_edges = []
+        for e in edges:
+            edge_nodes = e.nodes()
+            key = (edge_nodes[0].id(), edge_nodes[-1].id())
+            weight = weights.get(key)
+            if weight is None and isinstance(e, Edge):
+                weight = e.weight()
+            if weight is None:
+                weight = DEFAULT_WEIGHT
+            weighted_edges.append(key + (float(weight),))
+        return from_edges([n.id() for n in nodes], weighted_edges)
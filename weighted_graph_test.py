@@ -0,0 +1,52 @@
+import unittest
+import basic_graph
+import graph
+import graph_util
+import weighted_graph
+
+
+class WeightedGraphTest(unittest.TestCase):
+    def test_from_edges(self):
+        g = weighted_graph.from_edges(['D'], [('C', 'B', 1.5), ('A', 'B', 2),
+                                              ('A', 'C', 3), ('A', 'B', 4)])
+        self.assertEqual(['A', 'B', 'C', 'D'], list(g.ids()))
+        self.assertEqual([1, 2], list(g.child_indices(0)))
+        self.assertEqual([4.0, 3.0], list(g.child_weights(0)))
+        self.assertEqual([0, 2], list(g.parent_indices(1)))
+        self.assertEqual([4.0, 1.5], list(g.parent_weights(1)))
+        self.assertEqual([4.0, 3.0, 1.5], list(g.weights()))
+        self.assertEqual([4.0, 1.5, 3.0], list(g.reverse_weights()))
+
+        self.assertEqual(4.0, g.weight('A', 'B'))
+        self.assertRaises(KeyError, g.weight, 'B', 'A')
+        self.assertRaises(KeyError, g.weight, 'A', 'missing')
+        self.assertEqual([('B', 4.0), ('C', 3.0)], g.weighted_child_ids('A'))
+        self.assertEqual([('A', 4.0), ('C', 1.5)], g.weighted_parent_ids('B'))
+        self.assertEqual([], g.weighted_child_ids('missing'))
+        self.assertEqual(['B', 'C'], g.child_ids('A'))
+
+    def test_edges(self):
+        g = weighted_graph.from_edges([], [('A', 'B', 2), ('B', 'B', 0.5)])
+        self.assertEqual([('A', 'B', 2.0), ('B', 'B', 0.5)],
+                         sorted((e.nodes()[0].id(), e.nodes()[1].id(),
+                                 e.weight()) for e in g.edges()))
+
+        # Weights are kept when the edges are used to build another graph,
+        # and ignored by equality.
+        copy = weighted_graph.Factory().create_graph(g.nodes(), g.edges())
+        self.assertEqual(0.5, copy.weight('B', 'B'))
+        self.assertEqual(graph.from_string(basic_graph.Factory(), 'A->B->B'),
+                         g)
+
+    def test_factory(self):
+        spec = 'x1->x8, x1->x4, x2->x4, x3->x4, x4->x5, x4->x6, x7->x6, x9'
+        g = graph.from_string(weighted_graph.Factory(), spec)
+        self.assertIsInstance(g, weighted_graph.Graph)
+        self.assertEqual(graph.from_string(basic_graph.Factory(), spec), g)
+        self.assertEqual(weighted_graph.DEFAULT_WEIGHT, g.weight('x1', 'x8'))
+        self.assertEqual(['x1', 'x2', 'x3', 'x5', 'x6', 'x7'],
+                         sorted(graph_util.markov_blanket(g, 'x4')))
+
+
+if __name__ == '__main__':
+    unittest.main()